@@ -0,0 +1,145 @@
+"""
+Nightly archival: move old documents from MongoDB to Parquet files on disk.
+
+    cd backend
+    MONGO_URL=... DB_NAME=... python archive_old_data.py [--days 30] [--archive-dir archive] [--dry-run]
+
+    # crontab, 03:15 every night
+    15 3 * * * cd /srv/kiosk/backend && python archive_old_data.py >> logs/archive.log 2>&1
+
+For sessions, scans, payments and interactions, documents with created_at older
+than --days are streamed in created_at order and written, --batch documents at a
+time, as zstd-compressed Parquet files partitioned by collection and day:
+
+    archive/scans/day=2026-01-31/part-<first id>.parquet
+
+Each batch is deleted from MongoDB only after its files are written. File names
+come from the first document of the batch, so re-running after a crash rewrites
+the same files instead of duplicating rows. Nested fields are flattened
+(dims_cm.length, ...); lists and irregular sub-documents are stored as JSON text.
+
+The archive reads back with pandas:
+
+    from archive_old_data import read_archive
+    scans = read_archive("scans", since="2026-01-01", until="2026-02-01")
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+COLLECTIONS = ("sessions", "scans", "payments", "interactions")
+DEFAULT_ARCHIVE_DIR = Path(__file__).resolve().parent / "archive"
+
+
+def to_frame(docs):
+    rows = []
+    for doc in docs:
+        row = dict(doc)
+        row["id"] = str(row.pop("_id"))
+        rows.append(row)
+    frame = pd.json_normalize(rows, sep=".")
+    for column in frame.columns[frame.dtypes == object]:
+        if frame[column].map(lambda v: isinstance(v, (dict, list))).any():
+            frame[column] = frame[column].map(
+                lambda v: v if v is None or isinstance(v, float) else json.dumps(v, default=str))
+    return frame
+
+
+def write_batch(archive_dir, collection, docs):
+    """Write one batch as one file per day; returns the files written."""
+    frame = to_frame(docs)
+    days = frame["created_at"].map(lambda t: t.date().isoformat())
+    written = []
+    for day, part in frame.groupby(days, sort=False):
+        target = Path(archive_dir) / collection / f"day={day}"
+        target.mkdir(parents=True, exist_ok=True)
+        path = target / f"part-{part['id'].iloc[0]}.parquet"
+        tmp = path.with_suffix(".tmp")
+        part.to_parquet(tmp, engine="pyarrow", compression="zstd", index=False)
+        os.replace(tmp, path)
+        written.append(path)
+    return written
+
+
+async def archive_collection(db, archive_dir, collection, cutoff, batch_size, dry_run):
+    coll = db[collection]
+    moved, files = 0, 0
+    cursor = coll.find({"created_at": {"$lt": cutoff}}).sort([("created_at", 1), ("_id", 1)]).batch_size(batch_size)
+    batch = []
+
+    async def flush():
+        nonlocal moved, files
+        moved += len(batch)
+        if dry_run:
+            return
+        files += len(write_batch(archive_dir, collection, batch))
+        await coll.delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+
+    async for doc in cursor:
+        if not isinstance(doc.get("created_at"), datetime):
+            continue  # not migrated by migrate_schema.py yet
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await flush()
+            batch = []
+    if batch:
+        await flush()
+    return moved, files
+
+
+def read_archive(collection, since=None, until=None, archive_dir=DEFAULT_ARCHIVE_DIR, columns=None):
+    """Archived documents of one collection as a DataFrame, optionally for days in [since, until).
+
+    Files are read one by one and concatenated: batches written months apart
+    may not have the same columns or types (a field that was always null).
+    """
+    frames = []
+    for day_dir in sorted((Path(archive_dir) / collection).glob("day=*")):
+        day = day_dir.name[len("day="):]
+        if (since and day < str(since)) or (until and day >= str(until)):
+            continue
+        for path in sorted(day_dir.glob("*.parquet")):
+            present = [c for c in columns if c in pq.read_schema(path).names] if columns else None
+            frame = pq.read_table(path, columns=present).to_pandas()
+            frame["day"] = day
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=list(columns or []) + ["day"])
+    return pd.concat(frames, ignore_index=True)
+
+
+async def main(args):
+    import server
+    from storage import require_mongo
+
+    require_mongo(server.client)
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=args.days)
+    print(f"archiving documents created before {cutoff.isoformat()}" + (" (dry run)" if args.dry_run else ""))
+    for collection in args.collections:
+        t0 = time.perf_counter()
+        moved, files = await archive_collection(server.db, args.archive_dir, collection, cutoff,
+                                                args.batch, args.dry_run)
+        print(f"  {collection:<13} {moved:>9} documents {files:>6} files  {time.perf_counter() - t0:6.1f}s")
+
+    server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Move old documents to partitioned Parquet files")
+    parser.add_argument("--days", type=int, default=30, help="archive documents older than this")
+    parser.add_argument("--archive-dir", type=Path, default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--collections", nargs="+", default=list(COLLECTIONS), choices=COLLECTIONS)
+    parser.add_argument("--batch", type=int, default=20000)
+    parser.add_argument("--dry-run", action="store_true", help="count only")
+    asyncio.run(main(parser.parse_args()))
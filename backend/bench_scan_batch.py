@@ -0,0 +1,83 @@
+"""
+Benchmark: N bags through POST /api/scan one at a time vs POST /api/scan/batch.
+
+    cd backend
+    MONGO_URL=mongodb://localhost:27017 python bench_scan_batch.py --scans 5000 --batch-size 500
+
+Runs against its own database (--db, default "kiosk_bench_batch") through the
+ASGI app in-process. Sessions are created through the API first, so both runs
+see the same rules snapshots; the session cache is cleared before each run.
+The database is dropped at the end. With STORAGE=memory instead of MONGO_URL
+it measures the API alone on the in-memory store.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+
+
+def requests_for(session_ids, n):
+    return [{
+        "session_id": session_ids[i % len(session_ids)],
+        "weight_kg": round(random.uniform(6, 16), 1),
+        "dims_cm": {"length": round(random.uniform(45, 70), 1), "width": round(random.uniform(25, 45), 1),
+                    "height": round(random.uniform(18, 35), 1)},
+    } for i in range(n)]
+
+
+async def one_by_one(http, items):
+    for item in items:
+        (await http.post("/api/scan", json=item)).raise_for_status()
+
+
+async def batched(http, items, size):
+    for i in range(0, len(items), size):
+        resp = await http.post("/api/scan/batch", json={"items": items[i:i + size]})
+        resp.raise_for_status()
+        assert resp.json()["rejected"] == 0, resp.json()
+
+
+async def main(args):
+    os.environ["DB_NAME"] = args.db
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import httpx
+    import server
+
+    transport = httpx.ASGITransport(app=server.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        await server.ensure_indexes()
+        await server.seed_defaults()
+        session_ids = []
+        for _ in range(args.sessions):
+            resp = await http.post("/api/sessions", json={"airline_code": "JSM"})
+            session_ids.append(resp.json()["id"])
+        items = requests_for(session_ids, args.scans)
+
+        timings = {}
+        for label, run in (("one by one", lambda: one_by_one(http, items)),
+                           (f"batch of {args.batch_size}", lambda: batched(http, items, args.batch_size))):
+            server.live_sessions._items.clear()
+            t0 = time.perf_counter()
+            await run()
+            timings[label] = time.perf_counter() - t0
+
+    print(f"\n{args.scans} scans over {args.sessions} sessions")
+    for label, elapsed in timings.items():
+        print(f"{label:<16} {elapsed:8.2f} s {args.scans / elapsed:10.0f} scans/s")
+    slow, fast = timings.values()
+    print(f"speed-up: x{slow / fast:.1f}")
+
+    await server.interaction_writer.stop()
+    await server.client.drop_database(args.db)
+    server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="/scan one at a time vs /scan/batch")
+    parser.add_argument("--scans", type=int, default=5000)
+    parser.add_argument("--sessions", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--db", default="kiosk_bench_batch")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,220 @@
+"""
+Benchmark: the queries that depend on a secondary index in server.INDEXES,
+timed first without those indexes and then with them.
+
+    cd backend
+    MONGO_URL=mongodb://localhost:27017 python bench_scan_indexes.py --scans 1000000 --samples 100
+
+Lookups by `_id` are left out: MongoDB always indexes `_id`, so they are fast in
+both runs. The queries are issued with Motor directly, not through the API, so
+ConfigCache, ActiveSetupCache and the session LRU cannot answer them from
+memory. Each one is the query a route or script sends:
+
+    flight_stats key      GET /stats/flights and the $inc upsert after each scan
+    active setup          ActiveSetupCache.reconcile
+    activity window       GET /activity
+    status / dataset page keyset pages of GET /status and GET /dataset
+    scans / payments of a session   whatif_rules.py, archive_old_data.py
+
+Runs against its own database (--db, default "kiosk_bench"), seeded at the
+given volumes; timestamps stay inside the TTL windows so nothing expires
+mid-run. The run without indexes only reads, so dropping the unique indexes
+cannot let duplicates in; ensure_indexes() restores them before the second run.
+For each query the report shows latencies and, from explain(), the plan stage
+and the documents examined. The database is dropped at the end unless --keep is
+given (re-runs reuse an already seeded database).
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+FLIGHTS = [f"JA{100 + i}" for i in range(40)]
+GATES = [str(g) for g in range(1, 9)]
+KIOSKS = [f"k{i}" for i in range(20)]
+PAGE = 100
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+async def fill(coll, n: int, make, batch: int = 20000):
+    """Insert n documents from make(i), unless a previous --keep run already did."""
+    if await coll.estimated_document_count() >= n:
+        print(f"reusing {n} {coll.name}")
+        return
+    await coll.drop()
+    t0 = time.perf_counter()
+    for offset in range(0, n, batch):
+        await coll.insert_many([make(i) for i in range(offset, min(n, offset + batch))], ordered=False)
+        print(f"\rseeding {coll.name} {min(n, offset + batch)}/{n}", end="", flush=True)
+    print(f" ({time.perf_counter() - t0:.1f}s)")
+
+
+async def seed(db, args, now):
+    """Returns the session ids the scans and payments reference."""
+    rng = random.Random(1)
+    sessions = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(max(1, args.scans // 5))]
+    month = timedelta(days=30).total_seconds()
+    ago = lambda i, n, span=month: now - timedelta(seconds=span * (n - i) / n)  # noqa: E731
+
+    await fill(db.scans, args.scans, lambda i: {
+        "_id": uuid.uuid4(), "session_id": str(sessions[i % len(sessions)]), "weight_kg": 8.0,
+        "dims_cm": {"length": 50.0, "width": 30.0, "height": 20.0}, "compliant": True, "errors": [],
+        "created_at": ago(i, args.scans)})
+    n_payments = len(sessions) // 2
+    await fill(db.payments, n_payments, lambda i: {
+        "_id": uuid.uuid4(), "session_id": str(sessions[2 * i]), "total": 30.0, "method": "card",
+        "status": "approved", "created_at": ago(i, n_payments)})
+
+    keys = [(day, f, g) for day in range(args.days) for f in FLIGHTS for g in GATES]
+    await fill(db.flight_stats, len(keys), lambda i: {
+        "day": (now - timedelta(days=keys[i][0])).date().isoformat(), "flight_number": keys[i][1],
+        "gate": keys[i][2], "scans": 10, "compliant": 9, "non_compliant": 1})
+    # months of setups: only the latest one is active
+    await fill(db.kiosk_setup, 5000, lambda i: {
+        "_id": uuid.uuid4(), "operator_name": "bench", "gate": GATES[i % len(GATES)],
+        "flight_number": FLIGHTS[i % len(FLIGHTS)], "destination": "SCL", "is_international": False,
+        "active": i == 4999, "created_at": now - timedelta(hours=5000 - i)})
+
+    minutes = 7 * 24 * 60
+    await fill(db.activity_rollups, minutes * len(KIOSKS), lambda i: {
+        "res": "m", "kiosk_id": KIOSKS[i % len(KIOSKS)], "scans": 2, "scans_ok": 2,
+        "t": (now - timedelta(minutes=minutes - i // len(KIOSKS))).replace(second=0, microsecond=0)})
+    await fill(db.status_checks, args.pages, lambda i: {
+        "_id": uuid.uuid4(), "client_name": "bench", "timestamp": ago(i, args.pages)})
+    await fill(db.dataset, args.pages, lambda i: {
+        "_id": uuid.uuid4(), "label": "maleta", "file_name": f"{i}.jpg", "created_at": ago(i, args.pages)})
+    return sessions
+
+
+async def keyset_after(coll, field, rng, n):
+    """A `(field, _id) > last` filter as the paginated routes build it, from a random position"""
+    last = await coll.find({}, {field: 1}).sort([(field, 1), ("_id", 1)]).skip(rng.randrange(n)).limit(1).to_list(1)
+    key = last[0][field]
+    return {"$or": [{field: {"$gt": key}}, {field: key, "_id": {"$gt": last[0]["_id"]}}]}
+
+
+async def build_queries(db, args, sessions, now):
+    """label -> (collection, [(filter, sort, limit)]), the same list for both runs"""
+    rng = random.Random(2)
+    n = args.samples
+
+    def stats_key():
+        return {"day": (now - timedelta(days=rng.randrange(args.days))).date().isoformat(),
+                "flight_number": rng.choice(FLIGHTS), "gate": rng.choice(GATES)}
+
+    def window():
+        until = now - timedelta(minutes=rng.randrange(60, 7 * 24 * 60))
+        return {"res": "m", "kiosk_id": rng.choice(KIOSKS), "t": {"$gte": until - timedelta(hours=1), "$lt": until}}
+
+    by_time = [("timestamp", 1), ("_id", 1)]
+    by_created = [("created_at", 1), ("_id", 1)]
+    return {
+        "flight_stats key": ("flight_stats", [(stats_key(), None, 0) for _ in range(n)]),
+        "active setup": ("kiosk_setup", [({"active": True}, [("created_at", -1)], 1)] * n),
+        "activity window": ("activity_rollups", [(window(), None, 0) for _ in range(n)]),
+        "status page": ("status_checks", [(await keyset_after(db.status_checks, "timestamp", rng, args.pages),
+                                          by_time, PAGE) for _ in range(n)]),
+        "dataset page": ("dataset", [(await keyset_after(db.dataset, "created_at", rng, args.pages),
+                                      by_created, PAGE) for _ in range(n)]),
+        "scans of a session": ("scans", [({"session_id": str(rng.choice(sessions))}, None, 0) for _ in range(n)]),
+        "payments of a session": ("payments", [({"session_id": str(rng.choice(sessions))}, None, 0)
+                                               for _ in range(n)]),
+    }
+
+
+def cursor(coll, query):
+    flt, sort, limit = query
+    cur = coll.find(flt)
+    if sort:
+        cur = cur.sort(sort)
+    return cur.limit(limit) if limit else cur
+
+
+def plan_stage(plan):
+    """IXSCAN when the winning plan uses an index anywhere, else its leaf stage"""
+    stages = []
+    while plan:
+        stages.append(plan.get("stage"))
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return "IXSCAN" if "IXSCAN" in stages else (stages[-1] if stages else "?")
+
+
+async def measure(db, queries):
+    """label -> (latencies in ms, plan stage, docs examined by the first query)"""
+    out = {}
+    for label, (name, items) in queries.items():
+        coll = db[name]
+        explained = await cursor(coll, items[0]).explain()
+        stats = explained.get("executionStats", {})
+        stage = plan_stage(explained.get("queryPlanner", {}).get("winningPlan", {}))
+        await cursor(coll, items[0]).to_list(length=None)  # warm-up
+        latencies = []
+        for query in items:
+            t0 = time.perf_counter()
+            await cursor(coll, query).to_list(length=None)
+            latencies.append((time.perf_counter() - t0) * 1000.0)
+        out[label] = (latencies, stage, stats.get("totalDocsExamined", "?"))
+    return out
+
+
+def report(without, with_idx):
+    print(f"\n{'query':<23}{'run':<9}{'plan':>9}{'examined':>10}{'p50 ms':>10}{'p95 ms':>10}{'mean ms':>10}")
+    for label in without:
+        for run, (latencies, stage, examined) in (("without", without[label]), ("with", with_idx[label])):
+            print(f"{label:<23}{run:<9}{stage:>9}{examined:>10}{percentile(latencies, 50):>10.2f}"
+                  f"{percentile(latencies, 95):>10.2f}{statistics.mean(latencies):>10.2f}")
+        speedup = percentile(without[label][0], 50) / max(percentile(with_idx[label][0], 50), 1e-6)
+        print(f"{'':<23}p50 speed-up x{speedup:.1f}")
+
+
+async def main(args):
+    os.environ["DB_NAME"] = args.db
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import server
+    from storage import require_mongo
+
+    require_mongo(server.client)
+    db = server.db
+    now = datetime.now(timezone.utc)
+    sessions = await seed(db, args, now)
+    await server.ensure_indexes(db)  # the keyset positions are picked with an index
+    queries = await build_queries(db, args, sessions, now)
+
+    for name in {name for name, _ in queries.values()}:
+        await db[name].drop_indexes()
+    without = await measure(db, queries)
+
+    t0 = time.perf_counter()
+    index_report = await server.ensure_indexes(db)
+    print(f"index build: {time.perf_counter() - t0:.1f}s, missing after build: "
+          f"{ {k: v['missing'] for k, v in index_report.items() if v['missing']} or 'none'}")
+    with_idx = await measure(db, queries)
+
+    print(f"\n{args.scans} scans, {len(sessions) // 2} payments, {args.days} days of flight_stats, "
+          f"{args.pages} status checks and dataset items; {args.samples} queries each")
+    report(without, with_idx)
+
+    if not args.keep:
+        await server.client.drop_database(args.db)
+    server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Latency of index-backed queries with and without the indexes")
+    parser.add_argument("--scans", type=int, default=1_000_000, help="scans (one session per 5, a payment per 2)")
+    parser.add_argument("--days", type=int, default=180, help="days of flight_stats, 320 counters each")
+    parser.add_argument("--pages", type=int, default=500_000, help="status_checks and dataset documents")
+    parser.add_argument("--samples", type=int, default=100, help="queries timed per kind and run")
+    parser.add_argument("--db", default="kiosk_bench")
+    parser.add_argument("--keep", action="store_true", help="keep the seeded database for re-runs")
+    asyncio.run(main(parser.parse_args()))
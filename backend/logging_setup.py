@@ -0,0 +1,28 @@
+"""
+Structured logging for server.py, started by its startup handler.
+
+The queue, JSON-lines file, gzip rotation and rate limiting are the shared
+implementation in shared/logging_setup.py; this module only sets the server's
+file name and size.
+
+Maintenance scripts import server for its models and database handle and do
+not call setup_logging(), so they neither start the listener nor write to the
+server's log file.
+"""
+import logging
+import os
+import sys
+from logging.handlers import QueueListener
+from typing import Union
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)  # for shared/
+from shared import logging_setup as _shared  # noqa: E402
+from shared.logging_setup import JsonFormatter, RateLimitFilter, shutdown_logging  # noqa: E402,F401
+
+
+def setup_logging(log_dir: Union[str, os.PathLike], level: Union[int, str] = logging.INFO,
+                  filename: str = "server.jsonl", max_bytes: int = 10 * 1024 * 1024, **kwargs) -> QueueListener:
+    """Route the root logger through a queue to `filename` in `log_dir` (and stderr); returns the running listener."""
+    return _shared.setup_logging(log_dir, filename, level=level, max_bytes=max_bytes, **kwargs)
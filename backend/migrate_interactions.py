@@ -0,0 +1,188 @@
+"""
+Compact legacy interaction events in place, with a before/after report.
+
+    cd backend
+    MONGO_URL=... DB_NAME=... python migrate_interactions.py [--dry-run] [--batch 1000] [--bench 20000]
+
+Legacy "setup_saved", "scan_completed" and "payment_result" events carry a full
+copy of the setup/scan/payment in `payload`. They are replaced by
+server.InteractionEvent records that keep the same `id`, `created_at`,
+`session_id` and `setup_id` and only reference the document. An event is
+compacted only when the referenced document exists; otherwise its payload is
+kept. Events posted by clients through POST /interactions are left alone.
+Re-running the script is a no-op.
+
+Run it before migrate_schema.py (it also copes with documents already moved to
+binary `_id`s). The report shows collStats for `interactions` before and after,
+and a write benchmark (legacy vs compact scan events, insert_many into a scratch
+collection).
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import bson
+from pymongo import ReplaceOne
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import server  # noqa: E402
+from storage import require_mongo  # noqa: E402
+
+REF_FIELD = {"setup_saved": "setup_id", "scan_completed": "scan_id", "payment_result": "payment_id"}
+REF_COLLECTION = {"setup_saved": "kiosk_setup", "scan_completed": "scans", "payment_result": "payments"}
+
+
+def compact(doc, previous_setup=None):
+    payload = doc.get("payload") or {}
+    event = server.InteractionEvent(
+        id=doc.get("id", str(doc["_id"])),
+        ev=server.EVENT_CODES[doc["event"]],
+        session_id=doc.get("session_id"),
+        setup_id=doc.get("setup_id"),
+        created_at=doc["created_at"],
+    )
+    setattr(event, REF_FIELD[doc["event"]], payload["id"])
+    if doc["event"] == "setup_saved" and previous_setup is not None:
+        event.delta = {k: payload.get(k) for k in server.SETUP_FIELDS if previous_setup.get(k) != payload.get(k)}
+    out = event.to_doc()
+    out["_id"] = doc["_id"]  # _id is immutable; migrate_schema.py moves `id` into it
+    if "id" in doc:
+        out["id"] = doc["id"]
+    return out
+
+
+async def coll_stats(db, name):
+    try:
+        st = await db.command("collStats", name)
+    except Exception:
+        return {"count": 0, "size": 0, "storageSize": 0, "avgObjSize": 0}
+    return {k: st.get(k, 0) for k in ("count", "size", "storageSize", "avgObjSize")}
+
+
+async def existing_ids(db, event, ids):
+    if not ids:
+        return set()
+    uuids = [u for u in map(server.as_uuid, ids) if u]
+    docs = await db[REF_COLLECTION[event]].find(
+        {"$or": [{"id": {"$in": list(ids)}}, {"_id": {"$in": uuids}}]}, {"id": 1}).to_list(length=None)
+    return {server.from_mongo(d)["id"] for d in docs}
+
+
+async def migrate_batch(db, batch, dry_run, totals, previous_setups):
+    by_event = {}
+    for doc in batch:
+        by_event.setdefault(doc["event"], set()).add((doc.get("payload") or {}).get("id"))
+    present = {event: await existing_ids(db, event, ids - {None}) for event, ids in by_event.items()}
+
+    ops = []
+    for doc in batch:
+        ref = (doc.get("payload") or {}).get("id")
+        if ref not in present[doc["event"]]:
+            totals["kept"] += 1
+            continue
+        new = compact(doc, previous_setups.get(doc["_id"]))
+        totals["bytes_before"] += len(bson.encode(doc))
+        totals["bytes_after"] += len(bson.encode(new))
+        ops.append(ReplaceOne({"_id": doc["_id"]}, new))
+    totals["compacted"] += len(ops)
+    if ops and not dry_run:
+        await db.interactions.bulk_write(ops, ordered=False)
+
+
+async def previous_setup_payloads(db):
+    """setup_saved event _id -> payload of the setup saved before it
+
+    Events an interrupted run already compacted have no payload any more; the
+    setup they reference stands in for it, so a resumed run computes the same deltas.
+    """
+    previous, out = None, {}
+    query = {"$or": [{"event": "setup_saved", "payload": {"$exists": True}}, {"ev": server.EVENT_CODES["setup_saved"]}]}
+    cursor = db.interactions.find(query, {"payload": 1, "setup_id": 1}).sort("created_at", 1)
+    async for doc in cursor:
+        if "payload" in doc:
+            out[doc["_id"]] = previous
+            previous = doc["payload"] or {}
+        elif doc.get("setup_id"):
+            setup = await db.kiosk_setup.find_one({"$or": [{"id": doc["setup_id"]}, server.by_id(doc["setup_id"])]})
+            previous = server.from_mongo(setup) if setup else previous
+    return out
+
+
+async def migrate(db, batch_size=1000, dry_run=False, progress=None):
+    """Compact every legacy event still carrying a payload; returns the totals."""
+    totals = {"compacted": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+    previous_setups = await previous_setup_payloads(db)
+    cursor = db.interactions.find({"event": {"$in": list(server.EVENT_CODES)}, "payload": {"$exists": True}})
+    cursor.batch_size(batch_size)
+    batch = []
+    async for doc in cursor:
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await migrate_batch(db, batch, dry_run, totals, previous_setups)
+            batch = []
+            if progress:
+                progress(totals)
+    if batch:
+        await migrate_batch(db, batch, dry_run, totals, previous_setups)
+    return totals
+
+
+async def write_benchmark(db, n):
+    """docs/s and bytes/s of scan events in the legacy and the compact shape"""
+    scan = server.ScanResult(session_id=str(uuid.uuid4()), dims_cm={"length": 50.0, "width": 30.0, "height": 20.0},
+                             weight_kg=9.5, compliant=False, errors=["Excede largo 2.0 cm"], setup_id=str(uuid.uuid4()))
+    shapes = {
+        "legacy": lambda: server.Interaction(event="scan_completed", setup_id=scan.setup_id, session_id=scan.session_id,
+                                             payload=scan.model_dump(mode="json")).model_dump(mode="json"),
+        "compact": lambda: server.InteractionEvent(ev=server.EVENT_CODES["scan_completed"], setup_id=scan.setup_id,
+                                                   session_id=scan.session_id, scan_id=scan.id).to_doc(),
+    }
+    results = {}
+    for name, make in shapes.items():
+        scratch = db[f"_interactions_bench_{name}"]
+        await scratch.drop()
+        docs = [make() for _ in range(n)]
+        size = sum(len(bson.encode(d)) for d in docs)
+        t0 = time.perf_counter()
+        for i in range(0, n, 500):
+            await scratch.insert_many(docs[i:i + 500], ordered=False)
+        elapsed = time.perf_counter() - t0
+        results[name] = {"docs_per_s": n / elapsed, "mb_per_s": size / elapsed / 2 ** 20, "avg_bytes": size / n}
+        await scratch.drop()
+    return results
+
+
+async def main(args):
+    require_mongo(server.client)
+    db = server.db
+    before = await coll_stats(db, "interactions")
+    totals = await migrate(db, args.batch, args.dry_run, progress=lambda t: print(
+        f"\rcompacted {t['compacted']}, kept {t['kept']}", end="", flush=True))
+    print(f"\rcompacted {totals['compacted']}, kept {totals['kept']} (referenced document missing)")
+
+    after = await coll_stats(db, "interactions")
+    saved = totals["bytes_before"] - totals["bytes_after"]
+    print(f"\n{'interactions':<14}{'count':>12}{'size':>16}{'storageSize':>16}{'avgObjSize':>12}")
+    for label, st in (("before", before), ("after", after)):
+        print(f"{label:<14}{st['count']:>12}{st['size']:>16}{st['storageSize']:>16}{st['avgObjSize']:>12}")
+    print(f"migrated documents: {totals['bytes_before']} -> {totals['bytes_after']} bytes "
+          f"({saved} saved{', dry run' if args.dry_run else ''})")
+    print("storageSize only shrinks after the `compact` command or a resync.")
+
+    if args.bench:
+        print(f"\nwrite throughput, {args.bench} scan events:")
+        for name, r in (await write_benchmark(db, args.bench)).items():
+            print(f"  {name:<8} {r['docs_per_s']:>10.0f} docs/s {r['mb_per_s']:>8.2f} MB/s {r['avg_bytes']:>8.0f} B/doc")
+
+    server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compact legacy interaction events")
+    parser.add_argument("--dry-run", action="store_true", help="report only, do not rewrite")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--bench", type=int, default=20000, help="write benchmark size (0 to skip)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,173 @@
+"""
+Move stored documents to the current schema: the string `id` becomes a binary
+UUID `_id` and ISO-string timestamps become native BSON dates.
+
+    cd backend
+    MONGO_URL=... DB_NAME=... python migrate_schema.py [--dry-run] [--batch 1000] [--samples 200]
+
+Run it with the API stopped, after migrate_interactions.py. Each collection is
+streamed in batches: the converted copies are inserted, then the originals
+deleted (`_id` is immutable). Only documents that still have an `id` field are
+touched, so an interrupted run can simply be started again. Secondary indexes
+are dropped first (unique ones would reject the copies, `id_unique` is obsolete)
+and rebuilt with server.ensure_indexes() at the end.
+
+The report compares data/index sizes per collection and the latency of id
+lookups and a created_at range count on `sessions`, before and after.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+from pymongo.errors import BulkWriteError
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import server  # noqa: E402
+from storage import require_mongo  # noqa: E402
+
+COLLECTIONS = ("status_checks", "airlines", "rules", "sessions", "kiosk_setup", "scans",
+               "payments", "dataset", "trains", "interactions")
+DATE_FIELDS = ("created_at", "updated_at", "timestamp")
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    k = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[k]
+
+
+def convert_dates(doc):
+    for key, value in doc.items():
+        if key in DATE_FIELDS and isinstance(value, str):
+            try:
+                doc[key] = server._as_utc(datetime.fromisoformat(value))
+            except ValueError:
+                pass
+        elif isinstance(value, dict) and key != "payload":  # e.g. the session's rules snapshot
+            convert_dates(value)
+    return doc
+
+
+def convert(doc):
+    new = convert_dates(dict(doc))
+    del new["_id"]
+    new.update(server.by_id(new.pop("id")))
+    return new
+
+
+async def migrate_collection(coll, batch_size, dry_run):
+    moved = 0
+    batch = []
+
+    async def flush():
+        nonlocal moved
+        new_docs = [convert(d) for d in batch]
+        moved += len(new_docs)
+        if dry_run:
+            return
+        try:
+            await coll.insert_many(new_docs, ordered=False)
+        except BulkWriteError as e:
+            # duplicates are copies left by an interrupted run
+            if any(err["code"] != 11000 for err in e.details["writeErrors"]):
+                raise
+        await coll.delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+
+    async for doc in coll.find({"id": {"$exists": True}}).batch_size(batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            await flush()
+            batch = []
+            print(f"\r  {coll.name}: {moved}", end="", flush=True)
+    if batch:
+        await flush()
+    print(f"\r  {coll.name}: {moved} documents")
+    return moved
+
+
+async def sizes(db):
+    out = {}
+    for name in COLLECTIONS:
+        try:
+            st = await db.command("collStats", name)
+        except Exception:
+            st = {}
+        out[name] = {k: st.get(k, 0) for k in ("count", "size", "totalIndexSize")}
+    return out
+
+
+async def timings(db, ids, use_id_field, samples):
+    """ms per id lookup, and for a created_at range count over the last 30 days"""
+    lookups = []
+    for value in ids[:samples]:
+        query = {"id": value} if use_id_field else server.by_id(value)
+        t0 = time.perf_counter()
+        await db.sessions.find_one(query)
+        lookups.append((time.perf_counter() - t0) * 1000.0)
+    cutoff = datetime.now(timezone.utc) - timedelta(days=30)
+    cutoff = cutoff.isoformat() if use_id_field else cutoff
+    ranges = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        await db.sessions.count_documents({"created_at": {"$gte": cutoff}})
+        ranges.append((time.perf_counter() - t0) * 1000.0)
+    return lookups, ranges
+
+
+def report(before, after, t_before, t_after):
+    print(f"\n{'collection':<15}{'count':>10}{'size before':>14}{'size after':>14}"
+          f"{'index before':>14}{'index after':>14}")
+    for name in COLLECTIONS:
+        b, a = before[name], after[name]
+        if not (b["count"] or a["count"]):
+            continue
+        print(f"{name:<15}{a['count']:>10}{b['size']:>14}{a['size']:>14}"
+              f"{b['totalIndexSize']:>14}{a['totalIndexSize']:>14}")
+    print(f"{'total':<15}{'':>10}{sum(v['size'] for v in before.values()):>14}"
+          f"{sum(v['size'] for v in after.values()):>14}"
+          f"{sum(v['totalIndexSize'] for v in before.values()):>14}"
+          f"{sum(v['totalIndexSize'] for v in after.values()):>14}")
+
+    if t_before[0] and t_after[0]:
+        print("\nsessions latency (ms)      before      after")
+        for label, idx, pct in (("id lookup p50", 0, 50), ("id lookup p95", 0, 95), ("id lookup p99", 0, 99)):
+            print(f"  {label:<22}{percentile(t_before[idx], pct):>10.3f}{percentile(t_after[idx], pct):>11.3f}")
+        print(f"  {'created_at range':<22}{statistics.median(t_before[1]):>10.3f}{statistics.median(t_after[1]):>11.3f}")
+
+
+async def main(args):
+    require_mongo(server.client)
+    db = server.db
+    before = await sizes(db)
+    sample = await db.sessions.aggregate([{"$match": {"id": {"$exists": True}}}, {"$sample": {"size": args.samples}},
+                                          {"$project": {"id": 1}}]).to_list(length=args.samples)
+    ids = [d["id"] for d in sample]
+    t_before = await timings(db, ids, True, args.samples) if ids else ([], [])
+
+    print("migrating" + (" (dry run)" if args.dry_run else ""))
+    for name in COLLECTIONS:
+        if not args.dry_run:
+            await db[name].drop_indexes()
+        await migrate_collection(db[name], args.batch, args.dry_run)
+
+    if not args.dry_run:
+        index_report = await server.ensure_indexes(db)
+        problems = {k: v for k, v in index_report.items() if v["missing"] or v["redundant"]}
+        print(f"indexes rebuilt, problems: {problems or 'none'}")
+        after = await sizes(db)
+        t_after = await timings(db, ids, False, args.samples) if ids else ([], [])
+        report(before, after, t_before, t_after)
+
+    server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Binary UUID _id and native dates for stored documents")
+    parser.add_argument("--dry-run", action="store_true", help="count documents to migrate, change nothing")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--samples", type=int, default=200, help="session ids used for the latency report")
+    asyncio.run(main(parser.parse_args()))
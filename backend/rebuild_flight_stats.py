@@ -0,0 +1,123 @@
+"""
+Recompute the per flight/gate/day counters (`flight_stats`) from raw data.
+
+    cd backend
+    MONGO_URL=... DB_NAME=... python rebuild_flight_stats.py [--dry-run] [--batch 5000]
+
+Scans are keyed by the setup they reference and payments by the setup of their
+session, as the live routes do. Increments come from the same
+server.scan_increments/payment_increments the routes use. The result is written
+to a scratch collection and swapped in with renameCollection, so readers never
+see a half-built table; $inc updates that land during the rebuild are lost, so
+run it when the kiosks are quiet.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import server  # noqa: E402
+from storage import require_mongo  # noqa: E402
+
+
+def as_datetime(value):
+    if isinstance(value, str):  # documents not migrated by migrate_schema.py
+        value = datetime.fromisoformat(value)
+    return server._as_utc(value) if isinstance(value, datetime) else datetime.fromtimestamp(0, timezone.utc)
+
+
+def nested(inc):
+    """{"reasons.weight": 1} -> {"reasons": {"weight": 1}}"""
+    doc = {}
+    for path, value in inc.items():
+        target = doc
+        *parents, leaf = path.split(".")
+        for part in parents:
+            target = target.setdefault(part, {})
+        target[leaf] = value
+    return doc
+
+
+async def load_setups(db):
+    return {str(doc["_id"]): server.Setup(**server.from_mongo(doc)) async for doc in db.kiosk_setup.find()}
+
+
+async def add_scans(db, setups, updates, batch):
+    n = 0
+    projection = {"_id": 0, "setup_id": 1, "created_at": 1, "compliant": 1, "weight_kg": 1, "dims_cm": 1, "errors": 1}
+    async for doc in db.scans.find({}, projection).batch_size(batch):
+        result = server.ScanResult.model_construct(
+            compliant=doc.get("compliant", False), weight_kg=doc.get("weight_kg", 0.0),
+            dims_cm=doc.get("dims_cm") or {},
+        )
+        key = server.stats_key(setups.get(doc.get("setup_id")), as_datetime(doc.get("created_at")))
+        server.add_increments(updates, key, server.scan_increments(result, server.bag_reasons(doc.get("errors") or [])))
+        n += 1
+    return n
+
+
+async def add_payments(db, setups, updates, batch):
+    n = 0
+    pending = []
+
+    async def flush():
+        keys = {d["session_id"]: server.by_id(d["session_id"])["_id"] for d in pending}
+        sessions = await db.sessions.find({"_id": {"$in": list(keys.values())}}, {"setup_id": 1}).to_list(length=None)
+        setup_of = {doc["_id"]: doc.get("setup_id") for doc in sessions}
+        for d in pending:
+            payment = server.Payment.model_construct(status=d.get("status"), total=d.get("total", 0.0))
+            setup = setups.get(setup_of.get(keys[d["session_id"]]))
+            server.add_increments(updates, server.stats_key(setup, as_datetime(d.get("created_at"))),
+                                  server.payment_increments(payment))
+
+    projection = {"_id": 0, "session_id": 1, "status": 1, "total": 1, "created_at": 1}
+    async for doc in db.payments.find({}, projection).batch_size(batch):
+        pending.append(doc)
+        n += 1
+        if len(pending) >= batch:
+            await flush()
+            pending = []
+    if pending:
+        await flush()
+    return n
+
+
+async def recompute(db, batch):
+    """flight_stats documents from scans and payments, and how many of each were read"""
+    setups = await load_setups(db)
+    updates = {}
+    scans = await add_scans(db, setups, updates, batch)
+    payments = await add_payments(db, setups, updates, batch)
+    docs = [{**dict(zip(server.STATS_KEY, key)), **nested(inc)} for key, inc in updates.items()]
+    return docs, scans, payments
+
+
+async def main(args):
+    require_mongo(server.client)
+    db = server.db
+    t0 = time.perf_counter()
+    docs, scans, payments = await recompute(db, args.batch)
+    print(f"{scans} scans, {payments} payments -> {len(docs)} flight/gate/day counters "
+          f"({time.perf_counter() - t0:.1f}s)")
+
+    if not args.dry_run and docs:
+        scratch = db["flight_stats_rebuild"]
+        await scratch.drop()
+        for i in range(0, len(docs), args.batch):
+            await scratch.insert_many(docs[i:i + args.batch], ordered=False)
+        await scratch.create_indexes(server.INDEXES["flight_stats"])
+        await server.client.admin.command("renameCollection", f"{db.name}.flight_stats_rebuild",
+                                          to=f"{db.name}.flight_stats", dropTarget=True)
+        print("flight_stats replaced")
+
+    server.client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recompute flight_stats from scans and payments")
+    parser.add_argument("--dry-run", action="store_true", help="compute and report, do not replace")
+    parser.add_argument("--batch", type=int, default=5000)
+    asyncio.run(main(parser.parse_args()))
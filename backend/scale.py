@@ -0,0 +1,246 @@
+"""
+Serial scale hub for server.py: one background reader owns the scale and
+fans readings out to any number of subscribers.
+
+    SCALE_PORT=/dev/ttyUSB0 SCALE_BAUD=9600 uvicorn server:app
+
+The reader thread opens SCALE_PORT with pyserial and reads lines at the scale's
+native rate. Scales in continuous output mode send them unprompted; with
+SCALE_POLL_HZ > 0 the hub asks with READ_COMMAND at that rate instead (the
+protocol of pyqt_client's ScaleService). A line such as
+
+    ST,GS,+  12.50kg     US,NT,-0.015 kg     12.5 kg     12500 g
+
+becomes a reading in kg. ST/US mark it stable/unstable when the scale says
+so; otherwise it is stable once the last STABLE_WINDOW_S of readings stay
+within STABLE_TOLERANCE_KG. Tare and zero are written to the port (T / Z).
+A lost port is reopened every RECONNECT_S.
+
+Without SCALE_PORT, or without pyserial, the hub simulates a scale at
+SIMULATED_HZ: bags are put on and taken off, settle, and honour tare/zero.
+"""
+import asyncio
+import logging
+import math
+import random
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+READ_COMMAND = b"R\r\n"
+TARE_COMMAND = b"T\r\n"
+ZERO_COMMAND = b"Z\r\n"
+RECONNECT_S = 2.0
+SIMULATED_HZ = 10.0
+STABLE_WINDOW_S = 0.5
+STABLE_TOLERANCE_KG = 0.02
+UNITS_TO_KG = {"kg": 1.0, "g": 0.001, "lb": 0.45359237}
+
+_READING = re.compile(r"([+-]?)\s*(\d+(?:\.\d+)?)\s*(kg|g|lb)?", re.IGNORECASE)
+
+
+def parse_reading(line: str) -> Optional[Tuple[float, Optional[bool]]]:
+    """(weight_kg, stable flag or None when the scale does not say) of one line; None if unreadable."""
+    line = line.strip()
+    upper = line.upper()
+    if not line or upper.startswith("OL"):  # overload
+        return None
+    flag = True if upper.startswith("ST") else False if upper.startswith("US") else None
+    match = _READING.search(line.split(",")[-1] if "," in line else line)
+    if match is None:
+        return None
+    sign, number, unit = match.groups()
+    weight = float(number) * UNITS_TO_KG[(unit or "kg").lower()]
+    return (-weight if sign == "-" else weight), flag
+
+
+class StabilityDetector:
+    """Stable when every reading of the last `window` seconds is within `tolerance` kg."""
+
+    def __init__(self, window: float = STABLE_WINDOW_S, tolerance: float = STABLE_TOLERANCE_KG):
+        self.window = window
+        self.tolerance = tolerance
+        self._recent: Deque[Tuple[float, float]] = deque()
+
+    def add(self, t: float, weight: float) -> bool:
+        self._recent.append((t, weight))
+        while self._recent and t - self._recent[0][0] > self.window:
+            self._recent.popleft()
+        # need readings spanning most of the window before calling it stable
+        if t - self._recent[0][0] < self.window * 0.8:
+            return False
+        values = [w for _, w in self._recent]
+        return max(values) - min(values) <= self.tolerance
+
+
+class SimulatedScale:
+    """Stands in for the serial port: answers readline() with a plausible weight trace."""
+
+    def __init__(self, rate: float = SIMULATED_HZ, seed: Optional[int] = None):
+        self.rate = rate
+        self._rng = random.Random(seed)
+        self._load = 0.0  # what is on the platter
+        self._offset = 0.0  # tare
+        self._since = time.monotonic()
+        self._duration = 3.0
+
+    def readline(self) -> bytes:
+        time.sleep(1 / self.rate)
+        now = time.monotonic()
+        if now - self._since > self._duration:  # next passenger: put on or take off a bag
+            self._load = 0.0 if self._load else round(self._rng.uniform(4, 16), 2)
+            self._since, self._duration = now, self._rng.uniform(3, 8)
+        settling = math.exp(-(now - self._since) * 4)  # the platter rocks, then settles
+        gross = self._load * (1 + 0.08 * settling * math.sin((now - self._since) * 20))
+        weight = gross - self._offset + self._rng.gauss(0, 0.003)
+        status = "US" if settling > 0.02 else "ST"
+        return f"{status},GS,{weight:+.3f}kg\r\n".encode()
+
+    def write(self, data: bytes) -> None:
+        if data == TARE_COMMAND:
+            self._offset = self._load
+        elif data == ZERO_COMMAND:
+            self._offset = 0.0
+
+    def close(self) -> None:
+        pass
+
+
+class ScaleHub:
+    def __init__(self, port: Optional[str] = None, baudrate: int = 9600, poll_hz: float = 0.0,
+                 queue_size: int = 50):
+        self.port = port
+        self.baudrate = baudrate
+        self.poll_hz = poll_hz
+        self.queue_size = queue_size
+        self.simulated = False
+        self.connected = False
+        self.latest: Optional[Dict[str, Any]] = None
+        self.readings = 0
+        self._device = None
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._stability = StabilityDetector()
+
+    # -- device
+    def _open(self):
+        if not self.port:
+            self.simulated = True
+            return SimulatedScale()
+        try:
+            import serial
+        except ImportError:
+            logger.warning("pyserial not available, simulating the scale")
+            self.simulated = True
+            return SimulatedScale()
+        return serial.Serial(port=self.port, baudrate=self.baudrate, timeout=1)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self._device = self._open()
+                self.connected = True
+                logger.info("Scale reader started on %s", "simulator" if self.simulated else self.port)
+                self._read_loop()
+            except Exception as e:
+                logger.warning("Scale on %s unavailable: %s; retrying in %.0fs", self.port, e, RECONNECT_S)
+            finally:
+                self.connected = False
+                if self._device is not None:
+                    try:
+                        self._device.close()
+                    except Exception:
+                        pass
+                    self._device = None
+            self._stop.wait(RECONNECT_S)
+
+    def _read_loop(self) -> None:
+        while not self._stop.is_set():
+            if self.poll_hz > 0:
+                self._write(READ_COMMAND)
+            line = self._device.readline()
+            if self.poll_hz > 0:
+                self._stop.wait(1 / self.poll_hz)
+            if not line:
+                continue  # timeout: no output from the scale
+            parsed = parse_reading(line.decode("ascii", errors="replace"))
+            if parsed is None:
+                continue
+            weight, flag = parsed
+            t = time.monotonic()
+            detected = self._stability.add(t, weight)
+            reading = {"weight_kg": round(weight, 3), "stable": detected if flag is None else flag,
+                       "timestamp": datetime.now(timezone.utc).isoformat()}
+            if self._loop.is_closed():  # the app went away without stop()
+                self._stop.set()
+                return
+            self._loop.call_soon_threadsafe(self._publish, reading)
+
+    def _write(self, command: bytes) -> None:
+        with self._write_lock:
+            if self._device is None:
+                raise RuntimeError("scale not connected")
+            self._device.write(command)
+
+    # -- event loop side
+    def _publish(self, reading: Dict[str, Any]) -> None:
+        self.latest = reading
+        self.readings += 1
+        for queue in self._subscribers:
+            if queue.full():  # a slow client only needs the newest weights
+                queue.get_nowait()
+            queue.put_nowait(reading)
+
+    def start(self) -> None:
+        """Start the reader thread (idempotent); call from the event loop."""
+        if self._thread is None:
+            self._loop = asyncio.get_running_loop()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="scale-reader", daemon=True)
+            self._thread.start()
+
+    async def stop(self) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            await asyncio.to_thread(self._thread.join, 5)
+            self._thread = None
+        for queue in list(self._subscribers):
+            self.unsubscribe(queue)
+            # readings a slow client has not taken are stale now: make room for the end marker
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    def subscribe(self) -> asyncio.Queue:
+        self.start()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.discard(queue)
+
+    async def tare(self) -> None:
+        await asyncio.to_thread(self._write, TARE_COMMAND)
+
+    async def zero(self) -> None:
+        await asyncio.to_thread(self._write, ZERO_COMMAND)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "name": "Simulated scale" if self.simulated else "Serial scale",
+            "port": self.port,
+            "units": "kg",
+            "simulated": self.simulated,
+            "subscribers": len(self._subscribers),
+            "readings": self.readings,
+        }
@@ -1,22 +1,38 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, HTTPException, Query, Request
+from fastapi.responses import Response, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, CursorType, IndexModel, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
 import os
+import asyncio
+import gzip
+import hashlib
+import json
 import logging
+import time
+from collections import OrderedDict
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+import metrics
+from logging_setup import setup_logging, shutdown_logging
+from scale import ScaleHub
+from storage import create_client
+from pydantic import AfterValidator, BaseModel, Field, PlainSerializer, TypeAdapter, field_validator
+from typing import Annotated, List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Storage: MongoDB through Motor at MONGO_URL, or with STORAGE=memory the
+# in-process store of storage.py, which has the same collection API, for unit
+# tests, load tests and offline kiosks. Without MONGO_URL, and without
+# STORAGE=memory, importing this module raises instead of using an empty store.
+client = create_client(event_listeners=[metrics.MongoCommandTimer()])
+db = client[os.environ.get('DB_NAME', 'kiosk')]
 
 # Create the main app
 app = FastAPI()
@@ -26,19 +42,57 @@ api_router = APIRouter(prefix="/api")
 
 # Helpers for time and mongo serialization
 
-def now_iso() -> str:
-    return datetime.now(timezone.utc).isoformat()
-
-
 def uuid_str() -> str:
     return str(uuid.uuid4())
 
 
+def now_utc() -> datetime:
+    # BSON dates keep milliseconds; truncate so a re-read compares equal
+    now = datetime.now(timezone.utc)
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+# Native datetime in Python and BSON, the same ISO-8601 string as before in JSON
+UTCDateTime = Annotated[datetime, AfterValidator(_as_utc),
+                        PlainSerializer(lambda d: d.isoformat(), return_type=str, when_used="json")]
+
+
+def as_uuid(value: Any) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(str(value))
+    except ValueError:
+        return None
+
+
+# Documents use the model `id` as `_id`, stored as a binary UUID (16 bytes, one
+# unique index per collection); the API keeps exposing it as the `id` string.
+def by_id(value: str) -> Dict[str, Any]:
+    return {"_id": as_uuid(value) or value}
+
+
+def to_mongo(model: BaseModel, **dump_kwargs) -> Dict[str, Any]:
+    doc = model.model_dump(**dump_kwargs)
+    doc.update(by_id(doc.pop("id")))
+    return doc
+
+
+def from_mongo(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Document -> model fields. Documents not migrated yet still carry `id`."""
+    doc = dict(doc)
+    _id = doc.pop("_id", None)
+    doc.setdefault("id", str(_id))
+    return doc
+
+
 # Pydantic Models
 class StatusCheck(BaseModel):
     id: str = Field(default_factory=uuid_str)
     client_name: str
-    timestamp: str = Field(default_factory=now_iso)
+    timestamp: UTCDateTime = Field(default_factory=now_utc)
 
 
 class StatusCheckCreate(BaseModel):
@@ -62,20 +116,26 @@ class Rules(BaseModel):
     overweight_fee_per_kg: float = 15.0
     oversize_fee_flat: float = 30.0
     currency: str = "USD"
-    updated_at: str = Field(default_factory=now_iso)
+    updated_at: UTCDateTime = Field(default_factory=now_utc)
 
 
 class SessionCreate(BaseModel):
     airline_code: str
     language: str = "es"
+    kiosk_id: Optional[str] = None
 
 
 class Session(BaseModel):
     id: str = Field(default_factory=uuid_str)
     airline_code: str
     language: str = "es"
+    kiosk_id: Optional[str] = None
     state: str = "started"
-    created_at: str = Field(default_factory=now_iso)
+    # Snapshot taken at creation: the passenger is judged against these rules
+    rules: Optional[Rules] = None
+    rules_version: Optional[int] = None  # the airline's rules change counter, as in their ETag
+    setup_id: Optional[str] = None
+    created_at: UTCDateTime = Field(default_factory=now_utc)
 
 
 class Setup(BaseModel):
@@ -86,12 +146,30 @@ class Setup(BaseModel):
     destination: str
     is_international: bool = False
     active: bool = True
-    created_at: str = Field(default_factory=now_iso)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
+
+
+class KioskBootstrap(BaseModel):
+    kiosk_id: Optional[str] = None
+    airline: Airline
+    rules: Optional[Rules] = None
+    setup: Optional[Setup] = None
+    server_time: UTCDateTime
+    version: str  # changes when airline, rules or setup do
 
 
 class ScanRequest(BaseModel):
     session_id: str
     weight_kg: Optional[float] = None
+    # measured by the kiosk; simulated when absent
+    dims_cm: Optional[Dict[str, float]] = None
+
+    @field_validator("dims_cm")
+    @classmethod
+    def _has_all_dims(cls, value):
+        if value is not None and not {"length", "width", "height"} <= value.keys():
+            raise ValueError("dims_cm needs length, width and height")
+        return value
 
 
 class ScanResult(BaseModel):
@@ -102,7 +180,41 @@ class ScanResult(BaseModel):
     compliant: bool
     errors: List[str] = Field(default_factory=list)
     setup_id: Optional[str] = None
-    created_at: str = Field(default_factory=now_iso)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
+
+
+class FlightStats(BaseModel):
+    day: str
+    flight_number: Optional[str] = None
+    gate: Optional[str] = None
+    scans: int = 0
+    compliant: int = 0
+    non_compliant: int = 0
+    reasons: Dict[str, int] = Field(default_factory=dict)  # BAG_CHECKS code -> non-compliant scans
+    weight_kg_sum: float = 0.0
+    dims_cm_sum: Dict[str, float] = Field(default_factory=dict)
+    payments: Dict[str, int] = Field(default_factory=dict)  # status -> count
+    paid_total: float = 0.0
+
+
+SCAN_BATCH_MAX = 1000
+
+
+class ScanBatchRequest(BaseModel):
+    items: List[ScanRequest] = Field(min_length=1, max_length=SCAN_BATCH_MAX)
+
+
+class ScanBatchItem(BaseModel):
+    index: int
+    ok: bool
+    result: Optional[ScanResult] = None
+    error: Optional[str] = None
+
+
+class ScanBatchResponse(BaseModel):
+    items: List[ScanBatchItem]
+    accepted: int
+    rejected: int
 
 
 class PaymentRequest(BaseModel):
@@ -117,7 +229,7 @@ class Payment(BaseModel):
     total: float
     method: str
     status: str
-    created_at: str = Field(default_factory=now_iso)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
 
 
 class LoginRequest(BaseModel):
@@ -130,7 +242,7 @@ class DatasetImage(BaseModel):
     label: str  # maleta | mochila | bolso | otro
     file_name: str
     airline_code: Optional[str] = None
-    created_at: str = Field(default_factory=now_iso)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
 
 
 class TrainStartRequest(BaseModel):
@@ -141,7 +253,7 @@ class TrainStatus(BaseModel):
     id: str = Field(default_factory=uuid_str)
     airline_code: str
     status: str = "scheduled"  # scheduled | running | success | failed
-    created_at: str = Field(default_factory=now_iso)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
 
 
 class Interaction(BaseModel):
@@ -150,7 +262,720 @@ class Interaction(BaseModel):
     setup_id: Optional[str] = None
     session_id: Optional[str] = None
     payload: Dict[str, Any] = Field(default_factory=dict)
-    created_at: str = Field(default_factory=now_iso)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
+
+
+# Events recorded by the API itself are compact: a type code and the ids of the
+# scan/payment/setup they refer to, never a copy of those documents; `delta`
+# only carries what is not stored anywhere else.
+EVENT_CODES = {"setup_saved": 1, "scan_completed": 2, "payment_result": 3}
+EVENT_NAMES = {code: name for name, code in EVENT_CODES.items()}
+SETUP_FIELDS = ("operator_name", "gate", "flight_number", "destination", "is_international")
+
+
+class InteractionEvent(BaseModel):
+    id: str = Field(default_factory=uuid_str)
+    ev: int
+    session_id: Optional[str] = None
+    setup_id: Optional[str] = None
+    scan_id: Optional[str] = None
+    payment_id: Optional[str] = None
+    # for the activity rollups: kiosk, outcome (compliant / approved) and
+    # milliseconds since the session started
+    kiosk_id: Optional[str] = None
+    ok: Optional[bool] = None
+    ms: Optional[int] = None
+    delta: Dict[str, Any] = Field(default_factory=dict)
+    created_at: UTCDateTime = Field(default_factory=now_utc)
+
+    def to_doc(self) -> Dict[str, Any]:
+        doc = to_mongo(self, exclude_none=True)
+        if not doc["delta"]:
+            del doc["delta"]
+        return doc
+
+
+def elapsed_ms(session: Optional["Session"], at: datetime) -> Optional[int]:
+    if session is None:
+        return None
+    return int((at - session.created_at).total_seconds() * 1000)
+
+
+def setup_delta(previous: Optional["Setup"], setup: "Setup") -> Dict[str, Any]:
+    """Setup fields that changed since the previous active setup."""
+    if previous is None:
+        return {}
+    return {k: getattr(setup, k) for k in SETUP_FIELDS if getattr(previous, k) != getattr(setup, k)}
+
+
+AIRLINES_JSON = TypeAdapter(List[Airline])
+RULES_JSON = TypeAdapter(Rules)
+
+
+# Per-process cache of Rules/Airline. Writers $inc a version document in Mongo;
+# every worker re-reads that version at most every CONFIG_CACHE_TTL seconds, so
+# staleness across workers is bounded. The same document keeps a change counter
+# and time per resource ("airlines", "rules:<code>"): a worker drops only the
+# entries whose counter moved, and GET answers with them as ETag / Last-Modified.
+class ConfigCache:
+    VERSION_ID = "config"
+
+    def __init__(self, ttl: float = 5.0):
+        self.ttl = ttl
+        self.version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._rules: Dict[str, Rules] = {}
+        self._airlines: Optional[List[Airline]] = None
+        self._resources: Dict[str, Dict[str, Any]] = {}  # resource -> {"v": changes, "at": last change}
+        self._json: Dict[str, bytes] = {}  # resource -> serialized response body
+        self._generation = 0  # moves when everything is dropped
+
+    def _clear(self) -> None:
+        self._rules.clear()
+        self._airlines = None
+        self._json.clear()
+        self._generation += 1
+
+    def _drop(self, resource: str) -> None:
+        if resource == "airlines":
+            self._airlines = None
+        elif resource.startswith("rules:"):
+            self._rules.pop(resource[len("rules:"):], None)
+        self._json.pop(resource, None)
+
+    def _stamp(self, resource: str):
+        """Taken before a read and compared after it, so a read that raced a change is not stored."""
+        return self._generation, self._resources.get(resource, {}).get("v", 0)
+
+    def _apply(self, doc: Optional[Dict[str, Any]]) -> None:
+        version = doc.get("version", 0) if doc else 0
+        resources = doc.get("resources", {}) if doc else {}
+        if self.version is not None and version != self.version:
+            changed = [key for key in set(resources) | set(self._resources)
+                       if resources.get(key, {}).get("v") != self._resources.get(key, {}).get("v")]
+            if not changed:  # a bump() that named no resource
+                self._clear()
+            for key in changed:
+                self._drop(key)
+        self.version = version
+        self._resources = resources
+        self._checked_at = time.monotonic()
+
+    async def _sync(self) -> None:
+        if time.monotonic() - self._checked_at < self.ttl:
+            return
+        async with self._lock:
+            if time.monotonic() - self._checked_at < self.ttl:
+                return
+            self._apply(await db.meta.find_one({"_id": self.VERSION_ID}))
+
+    async def bump(self, *resources: str) -> int:
+        """Publish a change of `resources`: every worker drops those entries within `ttl`, this one now."""
+        update: Dict[str, Any] = {"$inc": {"version": 1, **{f"resources.{r}.v": 1 for r in resources}}}
+        if resources:
+            update["$set"] = {f"resources.{r}.at": now_utc() for r in resources}
+        doc = await db.meta.find_one_and_update(
+            {"_id": self.VERSION_ID}, update, upsert=True, return_document=ReturnDocument.AFTER,
+        )
+        self._apply(doc)
+        return self.version
+
+    def expire(self) -> None:
+        """Re-read the version document on the next access instead of after `ttl`."""
+        self._checked_at = 0.0
+
+    async def validators(self, resource: str):
+        """(ETag, Last-Modified or None) of a resource, from memory; Mongo at most once per `ttl`.
+
+        Take them before reading the data, so a change racing the read can only
+        make the tag older than the body, never newer.
+        """
+        await self._sync()
+        entry = self._resources.get(resource, {})
+        at = entry.get("at")
+        return f'"{resource}-{entry.get("v", 0)}"', _as_utc(at) if at else None
+
+    async def resource_version(self, resource: str) -> int:
+        """Change counter of `resource` (0 before its first change); like validators(), take it before the data."""
+        await self._sync()
+        return self._resources.get(resource, {}).get("v", 0)
+
+    def tracked(self, resource: str) -> bool:
+        """Whether `resource` was saved since versioning began, i.e. its validators prove it exists."""
+        return self._resources.get(resource, {}).get("v", 0) > 0
+
+    async def airlines_json(self) -> bytes:
+        airlines = await self.get_airlines()
+        body = self._json.get("airlines")
+        if body is None:
+            body = AIRLINES_JSON.dump_json(airlines)
+            if airlines is self._airlines:
+                self._json["airlines"] = body
+        return body
+
+    async def rules_json(self, airline_code: str) -> Optional[bytes]:
+        rules = await self.get_rules(airline_code)
+        if rules is None:
+            return None
+        key = f"rules:{airline_code}"
+        body = self._json.get(key)
+        if body is None:
+            body = RULES_JSON.dump_json(rules)
+            if self._rules.get(airline_code) is rules:
+                self._json[key] = body
+        return body
+
+    async def get_rules(self, airline_code: str) -> Optional[Rules]:
+        await self._sync()
+        rules = self._rules.get(airline_code)
+        if rules is not None:
+            self.hits += 1
+            return rules
+        self.misses += 1
+        stamp = self._stamp(f"rules:{airline_code}")
+        doc = await db.rules.find_one({"airline_code": airline_code})
+        if not doc:
+            return None
+        rules = Rules(**from_mongo(doc))
+        if stamp == self._stamp(f"rules:{airline_code}"):  # don't store a read that raced a bump
+            self._rules[airline_code] = rules
+        return rules
+
+    async def get_rules_many(self, airline_codes) -> Dict[str, Rules]:
+        """Rules for several airlines; the ones not cached are read with one $in query."""
+        await self._sync()
+        found = {code: self._rules[code] for code in airline_codes if code in self._rules}
+        self.hits += len(found)
+        missing = [code for code in airline_codes if code not in found]
+        if missing:
+            self.misses += len(missing)
+            stamps = {code: self._stamp(f"rules:{code}") for code in missing}
+            for doc in await db.rules.find({"airline_code": {"$in": missing}}).to_list(length=None):
+                rules = Rules(**from_mongo(doc))
+                found[rules.airline_code] = rules
+                if stamps[rules.airline_code] == self._stamp(f"rules:{rules.airline_code}"):
+                    self._rules[rules.airline_code] = rules
+        return found
+
+    async def get_airlines(self) -> List[Airline]:
+        await self._sync()
+        if self._airlines is not None:
+            self.hits += 1
+            return self._airlines
+        self.misses += 1
+        stamp = self._stamp("airlines")
+        items = await db.airlines.find().to_list(length=100)
+        airlines = [Airline(**from_mongo(it)) for it in items]
+        if stamp == self._stamp("airlines"):
+            self._airlines = airlines
+        return airlines
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "version": self.version,
+            "rules_cached": len(self._rules),
+            "airlines_cached": self._airlines is not None,
+            "ttl_s": self.ttl,
+        }
+
+
+config_cache = ConfigCache(ttl=float(os.environ.get("CONFIG_CACHE_TTL", "5")))
+
+
+# The active kiosk setup, kept in memory. POST /setup replaces it on the worker
+# that saved it; a background task reconciles every SETUP_RECONCILE_INTERVAL
+# seconds so the other workers follow.
+class ActiveSetupCache:
+    def __init__(self, interval: float = 10.0):
+        self.interval = interval
+        self.setup: Optional[Setup] = None
+        self.loaded = False
+        self._task: Optional[asyncio.Task] = None
+        # setups sessions still point to; flight and gate never change once saved
+        self._recent: "OrderedDict[str, Setup]" = OrderedDict()
+
+    async def get(self) -> Optional[Setup]:
+        if not self.loaded:
+            await self.reconcile()
+        return self.setup
+
+    def set(self, setup: Setup) -> None:
+        self.setup = setup
+        self.loaded = True
+        self._remember(setup)
+
+    def _remember(self, setup: Setup) -> None:
+        self._recent[setup.id] = setup
+        self._recent.move_to_end(setup.id)
+        while len(self._recent) > 64:
+            self._recent.popitem(last=False)
+
+    async def by_id(self, setup_id: Optional[str]) -> Optional[Setup]:
+        if setup_id is None:
+            return None
+        setup = self._recent.get(setup_id)
+        if setup is None:
+            doc = await db.kiosk_setup.find_one(by_id(setup_id))
+            if not doc:
+                return None
+            setup = Setup(**from_mongo(doc))
+            self._remember(setup)
+        return setup
+
+    async def reconcile(self) -> None:
+        doc = await db.kiosk_setup.find_one({"active": True}, sort=[("created_at", -1)])
+        if doc is None and self.setup is not None:
+            # nothing deactivates a setup without replacing it: this is a
+            # standalone swap in flight, keep the one we have
+            self.loaded = True
+            return
+        self.setup = Setup(**from_mongo(doc)) if doc else None
+        self.loaded = True
+        if self.setup is not None:
+            self._remember(self.setup)
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.reconcile()
+            except Exception:
+                logger.exception("Active setup reconciliation failed")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+active_setup = ActiveSetupCache(interval=float(os.environ.get("SETUP_RECONCILE_INTERVAL", "10")))
+
+
+# Push of configuration changes to kiosks (GET /kiosk/events). Writers insert
+# the change into the capped collection `config_events`; every worker tails it
+# and hands the events to its own subscribers, so a change saved on one worker
+# reaches kiosks connected to any of them. A received rules/airline event also
+# expires this worker's ConfigCache and a setup event reloads the active setup,
+# instead of waiting for CONFIG_CACHE_TTL / SETUP_RECONCILE_INTERVAL.
+CONFIG_EVENTS = "config_events"
+
+
+class ChangeFeed:
+    def __init__(self, capped_bytes: int = 1 << 20, capped_max: int = 1000, queue_size: int = 100,
+                 retry: float = 1.0):
+        self.capped_bytes = capped_bytes
+        self.capped_max = capped_max
+        self.queue_size = queue_size
+        self.retry = retry
+        self.published = 0
+        self.delivered = 0
+        self.resyncs = 0
+        self._subscribers: Dict[asyncio.Queue, tuple] = {}  # queue -> (airline_code, kiosk_id)
+        self._seen: "OrderedDict[Any, None]" = OrderedDict()  # event ids, against replays after a reconnect
+        self._task: Optional[asyncio.Task] = None
+
+    async def publish(self, kind: str, data: BaseModel, airline_code: Optional[str] = None,
+                      kiosk_id: Optional[str] = None) -> None:
+        """Announce a committed change; events without airline_code/kiosk_id go to every kiosk."""
+        doc = {"kind": kind, "airline_code": airline_code, "kiosk_id": kiosk_id,
+               "data": data.model_dump(mode="json"), "at": now_utc()}
+        try:
+            await db[CONFIG_EVENTS].insert_one(doc)
+            self.published += 1
+        except Exception:
+            # the change itself is saved; kiosks still get it on their next bootstrap
+            logger.exception("Config event %s not published", kind)
+
+    def subscribe(self, airline_code: str, kiosk_id: Optional[str]) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[queue] = (airline_code, kiosk_id)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        self._subscribers.pop(queue, None)
+
+    @staticmethod
+    def _close(queue: asyncio.Queue) -> None:
+        # None tells the stream to end; a kiosk behind by a full queue re-bootstraps
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(None)
+
+    async def _deliver(self, doc: Dict[str, Any]) -> None:
+        if doc["_id"] in self._seen:
+            return
+        self._seen[doc["_id"]] = None
+        while len(self._seen) > self.capped_max:
+            self._seen.popitem(last=False)
+        if doc["kind"] in ("rules", "airline"):
+            config_cache.expire()
+        elif doc["kind"] == "setup":
+            try:
+                await active_setup.reconcile()
+            except Exception:
+                logger.exception("Active setup reload after a setup event failed")
+        event = {"id": str(doc["_id"]), "kind": doc["kind"], "data": doc["data"]}
+        for queue, (airline_code, kiosk_id) in list(self._subscribers.items()):
+            if doc.get("airline_code") not in (None, airline_code) or doc.get("kiosk_id") not in (None, kiosk_id):
+                continue
+            try:
+                queue.put_nowait(event)
+                self.delivered += 1
+            except asyncio.QueueFull:
+                self.unsubscribe(queue)
+                self._close(queue)
+                self.resyncs += 1
+
+    async def _ensure_collection(self) -> None:
+        try:
+            await db.create_collection(CONFIG_EVENTS, capped=True, size=self.capped_bytes, max=self.capped_max)
+        except CollectionInvalid:
+            pass  # exists (another worker created it)
+
+    async def _tail(self) -> None:
+        # only events from now on; after a reconnect re-read a little and skip the ones seen
+        since = datetime.now(timezone.utc)
+        while True:
+            try:
+                await self._ensure_collection()
+                cursor = db[CONFIG_EVENTS].find({"_id": {"$gte": ObjectId.from_datetime(since)}},
+                                                cursor_type=CursorType.TAILABLE_AWAIT)
+                while cursor.alive:
+                    async for doc in cursor:
+                        since = doc["_id"].generation_time - timedelta(seconds=2)
+                        await self._deliver(doc)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Config event feed failed, retrying")
+            await asyncio.sleep(self.retry)  # dead cursor (empty collection) or error
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._tail())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        for queue in list(self._subscribers):
+            self.unsubscribe(queue)
+            self._close(queue)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"subscribers": len(self._subscribers), "published": self.published,
+                "delivered": self.delivered, "resyncs": self.resyncs}
+
+
+change_feed = ChangeFeed()
+
+
+# Recently created/used sessions, so /scan usually needs no read at all.
+class SessionLRU:
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[str, Session]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[Session]:
+        session = self._items.get(session_id)
+        if session is not None:
+            self._items.move_to_end(session_id)
+        return session
+
+    def put(self, session: Session) -> None:
+        self._items[session.id] = session
+        self._items.move_to_end(session.id)
+        while len(self._items) > self.maxsize:
+            self._items.popitem(last=False)
+
+
+live_sessions = SessionLRU(maxsize=int(os.environ.get("SESSION_LRU_SIZE", "4096")))
+
+
+# Activity rollups: every flushed batch of interaction events becomes $inc
+# upserts on minute and hour buckets per kiosk, plus an all-kiosks row
+# (kiosk_id None), so dashboards read a bounded number of buckets whatever the
+# history size. Minute buckets expire after ROLLUP_MINUTE_TTL_DAYS.
+ROLLUP_RESOLUTIONS = {"m": 60, "h": 3600}
+ROLLUP_MINUTE_TTL_DAYS = int(os.environ.get("ROLLUP_MINUTE_TTL_DAYS", "14"))
+ROLLUP_FIELDS = tuple(f"{kind}{suffix}" for kind in ("scans", "payments") for suffix in ("", "_ok", "_ms_sum", "_timed"))
+
+
+def _bucket_start(at: datetime, seconds: int) -> datetime:
+    at = _as_utc(at)
+    return datetime.fromtimestamp(int(at.timestamp()) // seconds * seconds, timezone.utc)
+
+
+def rollup_increments(events: List[Dict[str, Any]]) -> Dict[tuple, Dict[str, int]]:
+    """(res, kiosk_id, bucket start) -> $inc document for a batch of events."""
+    updates: Dict[tuple, Dict[str, int]] = {}
+    for event in events:
+        kind = {EVENT_CODES["scan_completed"]: "scans", EVENT_CODES["payment_result"]: "payments"}.get(event.get("ev"))
+        if kind is None or not isinstance(event.get("created_at"), datetime):
+            continue
+        inc = {kind: 1}
+        if event.get("ok"):
+            inc[f"{kind}_ok"] = 1
+        if event.get("ms") is not None:
+            inc[f"{kind}_ms_sum"] = event["ms"]
+            inc[f"{kind}_timed"] = 1
+        for res, seconds in ROLLUP_RESOLUTIONS.items():
+            t = _bucket_start(event["created_at"], seconds)
+            for kiosk in {event.get("kiosk_id"), None}:
+                target = updates.setdefault((res, kiosk, t), {})
+                for field, value in inc.items():
+                    target[field] = target.get(field, 0) + value
+    return updates
+
+
+async def bump_rollups(events: List[Dict[str, Any]]) -> None:
+    updates = rollup_increments(events)
+    if not updates:
+        return
+    ops = [UpdateOne({"res": res, "kiosk_id": kiosk, "t": t}, {"$inc": inc}, upsert=True)
+           for (res, kiosk, t), inc in updates.items()]
+    try:
+        await db.activity_rollups.bulk_write(ops, ordered=False)
+    except Exception:
+        logger.exception("Activity rollup update failed for %d buckets", len(ops))
+
+
+# Write-behind logger for interaction events: routes enqueue and return, a
+# background task flushes with insert_many(ordered=False) every
+# INTERACTIONS_BATCH_SIZE events or INTERACTIONS_FLUSH_INTERVAL seconds.
+# When the queue is full, events are dropped (default) or, with
+# INTERACTIONS_OVERFLOW=block, the request waits up to INTERACTIONS_BLOCK_TIMEOUT.
+# Should the task die, submit() writes inline and stop() flushes what it left.
+class InteractionWriter:
+    _STOP = object()
+
+    def __init__(self, maxsize: int = 10000, batch_size: int = 500, flush_interval: float = 0.5,
+                 overflow: str = "drop", block_timeout: float = 0.05):
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow = overflow
+        self.block_timeout = block_timeout
+        self.counters = {"enqueued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0, "inline": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._task = asyncio.create_task(self._run())
+
+    async def submit(self, doc: Dict[str, Any]) -> None:
+        if self._task is None or self._task.done():
+            # not running (scripts, shutdown) or the flush task died: write inline as before
+            self.counters["inline"] += 1
+            await db.interactions.insert_one(doc)
+            await bump_rollups([doc])
+            return
+        try:
+            self._queue.put_nowait(doc)
+        except asyncio.QueueFull:
+            if self.overflow != "block":
+                self.counters["dropped"] += 1
+                return
+            try:
+                await asyncio.wait_for(self._queue.put(doc), self.block_timeout)
+            except asyncio.TimeoutError:
+                self.counters["dropped"] += 1
+                return
+        self.counters["enqueued"] += 1
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is self._STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            await db.interactions.insert_many(batch, ordered=False)
+            self.counters["written"] += len(batch)
+        except BulkWriteError as e:
+            failed = len(e.details.get("writeErrors", []))
+            self.counters["written"] += len(batch) - failed
+            self.counters["failed"] += failed
+            logger.error("Interaction batch: %d of %d writes failed", failed, len(batch))
+        except Exception:
+            self.counters["failed"] += len(batch)
+            logger.exception("Interaction batch of %d lost", len(batch))
+        await bump_rollups(batch)
+        self.counters["batches"] += 1
+
+    async def stop(self) -> None:
+        """Flush everything queued so far, then stop."""
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        if task.done():
+            if not task.cancelled() and task.exception() is not None:
+                logger.error("Interaction writer had died: %r", task.exception())
+        else:
+            await self._queue.put(self._STOP)
+            await task
+        leftover = []
+        while not self._queue.empty():  # queued before the task died
+            item = self._queue.get_nowait()
+            if item is not self._STOP:
+                leftover.append(item)
+        if leftover:
+            await self._flush(leftover)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.counters, "queued": self._queue.qsize() if self._queue else 0, "maxsize": self.maxsize}
+
+
+interaction_writer = InteractionWriter(
+    maxsize=int(os.environ.get("INTERACTIONS_QUEUE_SIZE", "10000")),
+    batch_size=int(os.environ.get("INTERACTIONS_BATCH_SIZE", "500")),
+    flush_interval=float(os.environ.get("INTERACTIONS_FLUSH_INTERVAL", "0.5")),
+    overflow=os.environ.get("INTERACTIONS_OVERFLOW", "drop"),
+    block_timeout=float(os.environ.get("INTERACTIONS_BLOCK_TIMEOUT", "0.05")),
+)
+
+
+async def load_session(session_id: str) -> Optional[Session]:
+    session = live_sessions.get(session_id)
+    if session is None:
+        doc = await db.sessions.find_one(by_id(session_id))
+        if not doc:
+            return None
+        session = Session(**from_mongo(doc))
+        live_sessions.put(session)
+    return session
+
+
+# Per flight/gate/day counters, kept with $inc upserts by the scan and payment
+# routes so a summary is one indexed read. They are derived data: a failed
+# update is logged, not raised, and rebuild_flight_stats.py recomputes them.
+STATS_KEY = ("day", "flight_number", "gate")
+
+
+def stats_key(setup: Optional[Setup], at: datetime) -> tuple:
+    return (at.date().isoformat(), setup.flight_number if setup else None, setup.gate if setup else None)
+
+
+def scan_increments(result: ScanResult, reasons) -> Dict[str, float]:
+    inc = {"scans": 1, ("compliant" if result.compliant else "non_compliant"): 1, "weight_kg_sum": result.weight_kg}
+    for dim, value in result.dims_cm.items():
+        inc[f"dims_cm_sum.{dim}"] = value
+    for reason in reasons:
+        inc[f"reasons.{reason}"] = 1
+    return inc
+
+
+def payment_increments(payment: Payment) -> Dict[str, float]:
+    inc = {f"payments.{payment.status}": 1}
+    if payment.status == "approved":
+        inc["paid_total"] = payment.total
+    return inc
+
+
+def add_increments(updates: Dict[tuple, Dict[str, float]], key: tuple, inc: Dict[str, float]) -> None:
+    target = updates.setdefault(key, {})
+    for field, value in inc.items():
+        target[field] = target.get(field, 0) + value
+
+
+async def bump_flight_stats(updates: Dict[tuple, Dict[str, float]]) -> None:
+    ops = [UpdateOne(dict(zip(STATS_KEY, key)), {"$inc": inc}, upsert=True) for key, inc in updates.items()]
+    try:
+        await db.flight_stats.bulk_write(ops, ordered=False)
+    except Exception:
+        logger.exception("Flight stats update failed for %d keys", len(ops))
+
+
+# List endpoints page by keyset: documents sorted by (sort_field, _id), and
+# `after` is the id of the last item the client got. Documents go straight from
+# the cursor to JSON without building models; `format=ndjson` streams them one
+# per line as the cursor yields them, so memory does not grow with the result.
+MAX_PAGE = 1000
+
+
+def public_doc(doc: Dict[str, Any]) -> Dict[str, Any]:
+    doc = from_mongo(doc)
+    return {"id": doc.pop("id"), **{k: v.isoformat() if isinstance(v, datetime) else v for k, v in doc.items()}}
+
+
+async def list_documents(coll, model: type, sort_field: str, after: Optional[str], limit: Optional[int],
+                         fields: Optional[str], fmt: str, default_limit: int) -> Response:
+    wanted = set(model.model_fields)
+    if fields:
+        wanted = {f.strip() for f in fields.split(",") if f.strip()} | {"id"}
+        unknown = wanted - set(model.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    projection = {f: 1 for f in wanted | {sort_field} if f != "id"}
+
+    query: Dict[str, Any] = {}
+    if after:
+        last = await coll.find_one(by_id(after), {sort_field: 1})
+        if last is None:
+            raise HTTPException(status_code=400, detail="Unknown cursor")
+        key = last.get(sort_field)
+        query = {"$or": [{sort_field: {"$gt": key}}, {sort_field: key, "_id": {"$gt": last["_id"]}}]}
+
+    if fmt == "json":
+        limit = min(limit or default_limit, MAX_PAGE)
+    cursor = coll.find(query, projection).sort([(sort_field, ASCENDING), ("_id", ASCENDING)])
+    if limit:
+        cursor = cursor.limit(limit)
+    cursor = cursor.batch_size(min(limit or MAX_PAGE, MAX_PAGE))
+
+    def encode(doc: Dict[str, Any]) -> Dict[str, Any]:
+        item = public_doc(doc)
+        if sort_field not in wanted:
+            item.pop(sort_field, None)
+        return item
+
+    if fmt == "ndjson":
+        async def lines():
+            async for doc in cursor:
+                yield json.dumps(encode(doc), ensure_ascii=False) + "\n"
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+    items = [encode(doc) async for doc in cursor]
+    return Response(json.dumps(items, ensure_ascii=False), media_type="application/json")
 
 
 # Routes
@@ -159,161 +984,566 @@ async def root():
     return {"message": "Kiosk API ready"}
 
 
+@api_router.get("/cache/stats")
+async def cache_stats():
+    return {"config": config_cache.stats(), "events": change_feed.stats()}
+
+
 @api_router.post("/status", response_model=StatusCheck)
 async def create_status_check(input: StatusCheckCreate):
     status_obj = StatusCheck(client_name=input.client_name)
-    await db.status_checks.insert_one(status_obj.model_dump())
+    await db.status_checks.insert_one(to_mongo(status_obj))
     return status_obj
 
 
 @api_router.get("/status", response_model=List[StatusCheck])
-async def get_status_checks():
-    status_checks = await db.status_checks.find().to_list(length=1000)
-    return [StatusCheck(**sc) for sc in status_checks]
+async def get_status_checks(after: Optional[str] = None, limit: Optional[int] = Query(None, ge=1),
+                            fields: Optional[str] = None,
+                            fmt: str = Query("json", alias="format", pattern="^(json|ndjson)$")):
+    return await list_documents(db.status_checks, StatusCheck, "timestamp", after, limit, fields, fmt,
+                                default_limit=1000)
+
+
+# Conditional GET: config answers carry ETag/Last-Modified from ConfigCache and
+# a matching If-None-Match (or, without it, If-Modified-Since) gets a 304.
+def validator_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    return headers
+
+
+def not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+        return etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+    return False
+
+
+async def conditional_json(request: Request, resource: str, body):
+    """304 when the client's copy of `resource` is current, else the body from `await body()`.
+
+    The validators are compared first and the body is only loaded when they
+    differ; it comes from ConfigCache, serialized once per change. A resource
+    that was never saved through the API has no version to prove it exists, so
+    its body is loaded before answering 304. None means not found.
+    """
+    etag, last_modified = await config_cache.validators(resource)
+    headers = validator_headers(etag, last_modified)
+    if config_cache.tracked(resource) and not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    content = await body()
+    if content is None:
+        return None
+    if not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content, media_type="application/json", headers=headers)
 
 
 # Airline config
 @api_router.get("/config/airlines", response_model=List[Airline])
-async def list_airlines():
-    items = await db.airlines.find().to_list(length=100)
-    return [Airline(**it) for it in items]
+async def list_airlines(request: Request):
+    return await conditional_json(request, "airlines", config_cache.airlines_json)
 
 
 @api_router.post("/config/airlines", response_model=Airline)
 async def upsert_airline(airline: Airline):
-    await db.airlines.update_one({"code": airline.code}, {"$set": airline.model_dump()}, upsert=True)
-    return airline
+    doc = to_mongo(airline)
+    _id = doc.pop("_id")
+    # an existing airline keeps its _id; the response shows the stored one
+    stored = await db.airlines.find_one_and_update(
+        {"code": airline.code}, {"$set": doc, "$setOnInsert": {"_id": _id}},
+        upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    await config_cache.bump("airlines")
+    stored_airline = Airline(**from_mongo(stored))
+    await change_feed.publish("airline", stored_airline, airline_code=stored_airline.code)
+    return stored_airline
 
 
 @api_router.get("/rules/{airline_code}", response_model=Rules)
-async def get_rules(airline_code: str):
-    doc = await db.rules.find_one({"airline_code": airline_code})
-    if not doc:
+async def get_rules(airline_code: str, request: Request):
+    response = await conditional_json(request, f"rules:{airline_code}",
+                                      lambda: config_cache.rules_json(airline_code))
+    if response is None:
         raise HTTPException(status_code=404, detail="Rules not found")
-    return Rules(**doc)
+    return response
 
 
 @api_router.post("/rules", response_model=Rules)
 async def set_rules(rules: Rules):
-    await db.rules.update_one({"airline_code": rules.airline_code}, {"$set": rules.model_dump()}, upsert=True)
-    return rules
+    doc = to_mongo(rules)
+    _id = doc.pop("_id")
+    stored = await db.rules.find_one_and_update(
+        {"airline_code": rules.airline_code}, {"$set": doc, "$setOnInsert": {"_id": _id}},
+        upsert=True, return_document=ReturnDocument.AFTER,
+    )
+    await config_cache.bump(f"rules:{rules.airline_code}")
+    stored_rules = Rules(**from_mongo(stored))
+    await change_feed.publish("rules", stored_rules, airline_code=stored_rules.airline_code)
+    return stored_rules
 
 
 # Setup
 @api_router.get("/setup", response_model=Setup)
 async def get_active_setup():
-    doc = await db.kiosk_setup.find_one({"active": True}, sort=[("created_at", -1)])
-    if not doc:
+    setup = await active_setup.get()
+    if setup is None:
         raise HTTPException(status_code=404, detail="No active setup")
-    return Setup(**doc)
+    return setup
+
+
+async def _swap_active_setup(setup: Setup, session=None) -> None:
+    await db.kiosk_setup.update_many({"active": True}, {"$set": {"active": False}}, session=session)
+    await db.kiosk_setup.insert_one(to_mongo(setup), session=session)
+
+
+async def _swap_active_setup_standalone(setup: Setup) -> None:
+    """Without transactions: insert the setup inactive, then move the active flag to it.
+
+    A failed insert changes nothing. If activating it fails once the previous
+    setup is deactivated, the previous one is reactivated and the new one removed.
+    """
+    doc = to_mongo(setup)
+    doc["active"] = False
+    await db.kiosk_setup.insert_one(doc)
+    for attempt in range(3):
+        current = await db.kiosk_setup.find_one({"active": True, "_id": {"$ne": doc["_id"]}}, {"_id": 1})
+        try:
+            await db.kiosk_setup.update_many({"active": True, "_id": {"$ne": doc["_id"]}}, {"$set": {"active": False}})
+            await db.kiosk_setup.update_one({"_id": doc["_id"]}, {"$set": {"active": True}})
+            return
+        except Exception as e:
+            if isinstance(e, DuplicateKeyError) and attempt < 2:
+                continue  # a concurrent save activated its setup in between
+            if current is not None:
+                try:
+                    await db.kiosk_setup.update_one({"_id": current["_id"], "active": False},
+                                                    {"$set": {"active": True}})
+                except DuplicateKeyError:
+                    pass  # another save's setup is active by now
+            await db.kiosk_setup.delete_one({"_id": doc["_id"]})
+            raise
 
 
 @api_router.post("/setup", response_model=Setup)
 async def save_setup(setup: Setup):
-    # Deactivate previous
-    await db.kiosk_setup.update_many({"active": True}, {"$set": {"active": False}})
+    previous = await active_setup.get()
     setup.active = True
-    await db.kiosk_setup.insert_one(setup.model_dump())
+    # Deactivate previous + insert in one transaction when the server supports it.
+    # The partial unique index "single_active" guarantees a single active setup
+    # either way; on a standalone server a concurrent save just retries.
+    try:
+        async with await client.start_session() as s:
+            await s.with_transaction(lambda session: _swap_active_setup(setup, session))
+    except OperationFailure as e:
+        if e.code != 20:  # IllegalOperation: no transactions on a standalone server
+            raise
+        await _swap_active_setup_standalone(setup)
+    active_setup.set(setup)
+    await change_feed.publish("setup", setup)
     # Log interaction
-    await db.interactions.insert_one(Interaction(event="setup_saved", setup_id=setup.id, payload=setup.model_dump()).model_dump())
+    await interaction_writer.submit(InteractionEvent(
+        ev=EVENT_CODES["setup_saved"], setup_id=setup.id, delta=setup_delta(previous, setup)).to_doc())
     return setup
 
 
+# Everything a kiosk needs to come up, in one round trip. The parts are read
+# concurrently (from the caches when warm) and the answer is gzip-compressed
+# when the kiosk accepts it. ETag is the combined version: a kiosk restarting
+# with nothing changed gets a 304 and keeps its copy.
+BOOTSTRAP_GZIP_MIN_BYTES = 512
+
+
+@api_router.get("/kiosk/bootstrap", response_model=KioskBootstrap)
+async def kiosk_bootstrap(request: Request, airline: str, kiosk_id: Optional[str] = None):
+    # validators first, as in conditional_json: the tag is never newer than the parts
+    (airlines_tag, airlines_at), (rules_tag, rules_at) = await asyncio.gather(
+        config_cache.validators("airlines"), config_cache.validators(f"rules:{airline}"))
+    setup = await active_setup.get()
+    parts = "|".join((airline, airlines_tag, rules_tag, setup.id if setup else "-"))
+    etag = f'"boot-{hashlib.sha1(parts.encode()).hexdigest()[:16]}"'
+    changed = [t for t in (airlines_at, rules_at, setup.created_at if setup else None) if t is not None]
+    headers = {**validator_headers(etag, max(changed, default=None)), "Vary": "Accept-Encoding"}
+    # the tag names the airline and only a 200 hands it out, so a match needs no lookup
+    if not_modified(request, etag, None):
+        return Response(status_code=304, headers=headers)
+
+    airlines, rules = await asyncio.gather(config_cache.get_airlines(), config_cache.get_rules(airline))
+    match = next((a for a in airlines if a.code == airline), None)
+    if match is None:
+        raise HTTPException(status_code=404, detail="Airline not found")
+
+    body = KioskBootstrap(kiosk_id=kiosk_id, airline=match, rules=rules, setup=setup, server_time=now_utc(),
+                          version=etag.strip('"')).model_dump_json().encode()
+    if len(body) >= BOOTSTRAP_GZIP_MIN_BYTES and "gzip" in request.headers.get("accept-encoding", ""):
+        body = gzip.compress(body, compresslevel=6)
+        headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
+
+
+# Server-sent events with the changes that concern a kiosk: `rules` and
+# `airline` of its airline, `setup` for all; `data` is the saved resource as the
+# GET routes return it. Comments every KIOSK_EVENTS_HEARTBEAT seconds keep
+# proxies from closing an idle stream. There is no replay: after a reconnect
+# (or an `event: resync`, sent when the kiosk fell behind) it re-bootstraps,
+# which costs a 304 when nothing changed.
+KIOSK_EVENTS_HEARTBEAT = float(os.environ.get("KIOSK_EVENTS_HEARTBEAT", "15"))
+
+
+@api_router.get("/kiosk/events")
+async def kiosk_events(request: Request, airline: str, kiosk_id: Optional[str] = None):
+    queue = change_feed.subscribe(airline, kiosk_id)
+
+    async def stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), KIOSK_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": ping\n\n"
+                    continue
+                if event is None:
+                    yield "event: resync\ndata: {}\n\n"
+                    return
+                data = json.dumps(event["data"], ensure_ascii=False)
+                yield f"id: {event['id']}\nevent: {event['kind']}\ndata: {data}\n\n"
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 # Sessions
 @api_router.post("/sessions", response_model=Session)
 async def create_session(payload: SessionCreate):
-    session = Session(airline_code=payload.airline_code, language=payload.language)
-    await db.sessions.insert_one(session.model_dump())
+    rules_version = await config_cache.resource_version(f"rules:{payload.airline_code}")
+    rules = await config_cache.get_rules(payload.airline_code)
+    setup = await active_setup.get()
+    session = Session(
+        airline_code=payload.airline_code,
+        language=payload.language,
+        kiosk_id=payload.kiosk_id,
+        rules=rules,
+        rules_version=rules_version,
+        setup_id=setup.id if setup else None,
+    )
+    await db.sessions.insert_one(to_mongo(session))
+    live_sessions.put(session)
     return session
 
 
 # Scanning (simulated dimensions & validation)
-@api_router.post("/scan", response_model=ScanResult)
-async def scan(payload: ScanRequest):
-    # Load rules for session airline
-    session = await db.sessions.find_one({"id": payload.session_id})
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    rules_doc = await db.rules.find_one({"airline_code": session['airline_code']})
-    if not rules_doc:
-        raise HTTPException(status_code=404, detail="Rules not found")
-    rules = Rules(**rules_doc)
-
-    # Active setup
-    setup_doc = await db.kiosk_setup.find_one({"active": True}, sort=[("created_at", -1)])
-    setup_id = setup_doc.get("id") if setup_doc else None
-
-    # Simulate dimensions (cm)
+def measure_bag(req: ScanRequest):
+    """Dimensions (cm) and weight (kg) of the bag; simulated when the kiosk sent none."""
     import random
-    dims = {
+    dims = req.dims_cm or {
         "length": round(random.uniform(45, 70), 1),
         "width": round(random.uniform(25, 45), 1),
         "height": round(random.uniform(18, 35), 1),
     }
+    weight = req.weight_kg if req.weight_kg is not None else round(random.uniform(6, 16), 1)
+    return dims, weight
 
-    weight = payload.weight_kg if payload.weight_kg is not None else round(random.uniform(6, 16), 1)
 
-    errors: List[str] = []
-    compliant = True
+# reason code -> message prefix shown to the passenger
+BAG_CHECKS = {
+    "length": "Excede largo",
+    "width": "Excede ancho",
+    "height": "Excede alto",
+    "linear": "Excede suma lineal",
+    "weight": "Excede peso",
+}
+
+
+def check_bag(rules: Rules, dims: Dict[str, float], weight: float) -> Dict[str, str]:
+    """Failed checks as reason code -> message; empty when the bag complies."""
+    errors: Dict[str, str] = {}
 
     # Dimension checks
-    if dims["length"] > rules.dims_cm["length"]:
-        compliant = False
-        errors.append(f"Excede largo {round(dims['length'] - rules.dims_cm['length'], 1)} cm")
-    if dims["width"] > rules.dims_cm["width"]:
-        compliant = False
-        errors.append(f"Excede ancho {round(dims['width'] - rules.dims_cm['width'], 1)} cm")
-    if dims["height"] > rules.dims_cm["height"]:
-        compliant = False
-        errors.append(f"Excede alto {round(dims['height'] - rules.dims_cm['height'], 1)} cm")
+    for dim in ("length", "width", "height"):
+        if dims[dim] > rules.dims_cm[dim]:
+            errors[dim] = f"{BAG_CHECKS[dim]} {round(dims[dim] - rules.dims_cm[dim], 1)} cm"
 
     linear = dims["length"] + dims["width"] + dims["height"]
     if linear > rules.max_linear_cm:
-        compliant = False
-        errors.append(f"Excede suma lineal {round(linear - rules.max_linear_cm, 1)} cm")
+        errors["linear"] = f"{BAG_CHECKS['linear']} {round(linear - rules.max_linear_cm, 1)} cm"
 
     if weight > rules.max_weight_kg:
-        compliant = False
-        errors.append(f"Excede peso {round(weight - rules.max_weight_kg, 1)} kg")
+        errors["weight"] = f"{BAG_CHECKS['weight']} {round(weight - rules.max_weight_kg, 1)} kg"
+    return errors
+
+
+def bag_reasons(messages: List[str]) -> List[str]:
+    """Reason codes of stored ScanResult.errors."""
+    return [code for code, prefix in BAG_CHECKS.items() for m in messages if m.startswith(prefix + " ")]
 
+
+@api_router.post("/scan", response_model=ScanResult)
+async def scan(payload: ScanRequest):
+    # Rules and setup come from the session snapshot (one read, usually none)
+    session = await load_session(payload.session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    rules = session.rules
+    setup_id = session.setup_id
+    if rules is None:
+        # sessions created before snapshots existed, or before the airline had rules
+        rules = await config_cache.get_rules(session.airline_code)
+        if rules is None:
+            raise HTTPException(status_code=404, detail="Rules not found")
+        setup = await active_setup.get()
+        setup_id = setup.id if setup else None
+
+    dims, weight = measure_bag(payload)
+    errors = check_bag(rules, dims, weight)
     result = ScanResult(
         session_id=payload.session_id,
         dims_cm=dims,
         weight_kg=weight,
-        compliant=compliant,
-        errors=errors,
+        compliant=not errors,
+        errors=list(errors.values()),
         setup_id=setup_id,
     )
-    await db.scans.insert_one(result.model_dump())
+    await db.scans.insert_one(to_mongo(result))
+    setup = await active_setup.by_id(setup_id)
+    await bump_flight_stats({stats_key(setup, result.created_at): scan_increments(result, errors)})
     # Log interaction
-    await db.interactions.insert_one(Interaction(event="scan_completed", setup_id=setup_id, session_id=payload.session_id, payload=result.model_dump()).model_dump())
+    await interaction_writer.submit(InteractionEvent(
+        ev=EVENT_CODES["scan_completed"], setup_id=setup_id, session_id=payload.session_id, scan_id=result.id,
+        kiosk_id=session.kiosk_id, ok=result.compliant, ms=elapsed_ms(session, result.created_at)).to_doc())
     return result
 
 
+@api_router.post("/scan/batch", response_model=ScanBatchResponse)
+async def scan_batch(payload: ScanBatchRequest):
+    # Sessions not in memory: one $in read; rules for sessions without a
+    # snapshot: one $in read; all results: one insert_many.
+    keys = {sid: by_id(sid)["_id"] for sid in {it.session_id for it in payload.items}}
+    sessions = {sid: s for sid in keys if (s := live_sessions.get(sid)) is not None}
+    missing = [key for sid, key in keys.items() if sid not in sessions]
+    if missing:
+        loaded = {}
+        for doc in await db.sessions.find({"_id": {"$in": missing}}).to_list(length=None):
+            session = Session(**from_mongo(doc))
+            live_sessions.put(session)
+            loaded[doc["_id"]] = session
+        sessions.update({sid: loaded[key] for sid, key in keys.items() if key in loaded})
+
+    fallback_codes = {s.airline_code for s in sessions.values() if s.rules is None}
+    fallback_rules = await config_cache.get_rules_many(fallback_codes) if fallback_codes else {}
+    fallback_setup = await active_setup.get() if fallback_codes else None
+
+    items: List[ScanBatchItem] = []
+    results: List[ScanResult] = []
+    reasons: Dict[str, List[str]] = {}
+    for index, req in enumerate(payload.items):
+        session = sessions.get(req.session_id)
+        if session is None:
+            items.append(ScanBatchItem(index=index, ok=False, error="Session not found"))
+            continue
+        rules, setup_id = session.rules, session.setup_id
+        if rules is None:
+            rules = fallback_rules.get(session.airline_code)
+            setup_id = fallback_setup.id if fallback_setup else None
+            if rules is None:
+                items.append(ScanBatchItem(index=index, ok=False, error="Rules not found"))
+                continue
+        dims, weight = measure_bag(req)
+        errors = check_bag(rules, dims, weight)
+        result = ScanResult(session_id=req.session_id, dims_cm=dims, weight_kg=weight,
+                            compliant=not errors, errors=list(errors.values()), setup_id=setup_id)
+        results.append(result)
+        reasons[result.id] = list(errors)
+        items.append(ScanBatchItem(index=index, ok=True, result=result))
+
+    failed = set()
+    if results:
+        try:
+            await db.scans.insert_many([to_mongo(r) for r in results], ordered=False)
+        except BulkWriteError as e:
+            failed = {results[err["index"]].id for err in e.details.get("writeErrors", [])}
+            logger.error("Scan batch: %d of %d writes failed", len(failed), len(results))
+    stats: Dict[tuple, Dict[str, float]] = {}
+    for item in items:
+        if item.result is None:
+            continue
+        if item.result.id in failed:
+            item.ok, item.error, item.result = False, "Write failed", None
+            continue
+        setup = await active_setup.by_id(item.result.setup_id)
+        add_increments(stats, stats_key(setup, item.result.created_at),
+                       scan_increments(item.result, reasons[item.result.id]))
+        session = sessions[item.result.session_id]
+        await interaction_writer.submit(InteractionEvent(
+            ev=EVENT_CODES["scan_completed"], setup_id=item.result.setup_id,
+            session_id=item.result.session_id, scan_id=item.result.id, kiosk_id=session.kiosk_id,
+            ok=item.result.compliant, ms=elapsed_ms(session, item.result.created_at)).to_doc())
+    if stats:
+        await bump_flight_stats(stats)
+
+    accepted = sum(1 for item in items if item.ok)
+    return ScanBatchResponse(items=items, accepted=accepted, rejected=len(items) - accepted)
+
+
 # Payments (simulated)
 @api_router.post("/payments/simulate", response_model=Payment)
 async def simulate_payment(req: PaymentRequest):
     import random
     status = "approved" if random.random() >= 0.15 else "rejected"
     payment = Payment(session_id=req.session_id, total=req.total, method=req.method, status=status)
-    await db.payments.insert_one(payment.model_dump())
-    # Log
-    setup_doc = await db.kiosk_setup.find_one({"active": True}, sort=[("created_at", -1)])
-    setup_id = setup_doc.get("id") if setup_doc else None
-    await db.interactions.insert_one(Interaction(event="payment_result", setup_id=setup_id, session_id=req.session_id, payload=payment.model_dump()).model_dump())
+    await db.payments.insert_one(to_mongo(payment))
+    # Counted under the setup the session started with, as its scans are
+    session = await load_session(req.session_id)
+    setup = await active_setup.by_id(session.setup_id) if session else None
+    if setup is None:  # unknown session, or one created before sessions kept their setup
+        setup = await active_setup.get()
+    setup_id = setup.id if setup else None
+    await bump_flight_stats({stats_key(setup, payment.created_at): payment_increments(payment)})
+    await interaction_writer.submit(InteractionEvent(
+        ev=EVENT_CODES["payment_result"], setup_id=setup_id, session_id=req.session_id, payment_id=payment.id,
+        kiosk_id=session.kiosk_id if session else None, ok=payment.status == "approved",
+        ms=elapsed_ms(session, payment.created_at)).to_doc())
     return payment
 
 
-# Scale (demo)
+# Flight / gate summaries: counters for a day (default today, UTC); with
+# flight_number and gate given it is a single-key read
+@api_router.get("/stats/flights", response_model=List[FlightStats])
+async def flight_stats(day: Optional[date] = None, flight_number: Optional[str] = None, gate: Optional[str] = None):
+    query: Dict[str, Any] = {"day": (day or now_utc().date()).isoformat()}
+    if flight_number is not None:
+        query["flight_number"] = flight_number
+    if gate is not None:
+        query["gate"] = gate
+    docs = await db.flight_stats.find(query, {"_id": 0}).to_list(length=1000)
+    return [FlightStats(**doc) for doc in docs]
+
+
+# Kiosk activity for dashboards, downsampled on read from the rollup buckets:
+# hour buckets when `step` is a whole number of hours, minute buckets otherwise.
+ACTIVITY_MAX_POINTS = 2000
+
+
+@api_router.get("/activity")
+async def activity(kiosk_id: Optional[str] = None, since: Optional[datetime] = None, until: Optional[datetime] = None,
+                   step: int = Query(60, ge=60, multiple_of=60)):
+    until = _as_utc(until) if until else now_utc()
+    since = _as_utc(since) if since else until - timedelta(hours=1)
+    points = int((until - since).total_seconds() // step) + 1
+    if until <= since or points > ACTIVITY_MAX_POINTS:
+        raise HTTPException(status_code=400, detail=f"Range must be positive and at most {ACTIVITY_MAX_POINTS} steps")
+    res = "h" if step % 3600 == 0 else "m"
+    start = _bucket_start(since, ROLLUP_RESOLUTIONS[res])
+
+    windows: Dict[int, Dict[str, int]] = {}
+    query = {"res": res, "kiosk_id": kiosk_id, "t": {"$gte": start, "$lt": until}}
+    async for doc in db.activity_rollups.find(query, {"_id": 0, "t": 1, **{f: 1 for f in ROLLUP_FIELDS}}):
+        slot = int((_as_utc(doc["t"]) - start).total_seconds() // step)
+        window = windows.setdefault(slot, {})
+        for field in ROLLUP_FIELDS:
+            window[field] = window.get(field, 0) + doc.get(field, 0)
+
+    def ratio(a: int, b: int) -> Optional[float]:
+        return round(a / b, 4) if b else None
+
+    series = []
+    for slot in sorted(windows):
+        w = windows[slot]
+        series.append({
+            "t": (start + timedelta(seconds=slot * step)).isoformat(),
+            "scans": w.get("scans", 0),
+            "scans_per_min": round(w.get("scans", 0) * 60 / step, 3),
+            "compliance_rate": ratio(w.get("scans_ok", 0), w.get("scans", 0)),
+            "payments": w.get("payments", 0),
+            "approval_rate": ratio(w.get("payments_ok", 0), w.get("payments", 0)),
+            "avg_scan_s": ratio(w.get("scans_ms_sum", 0) / 1000, w.get("scans_timed", 0)),
+            "avg_payment_s": ratio(w.get("payments_ms_sum", 0) / 1000, w.get("payments_timed", 0)),
+        })
+    return {"kiosk_id": kiosk_id, "resolution": res, "step_s": step, "since": start.isoformat(),
+            "until": until.isoformat(), "points": series}
+
+
+# Scale: scale.py's hub reads SCALE_PORT (or a simulator) in a background thread
+# from the first request on. /scale/stream pushes every reading as server-sent
+# events; /scale/read stays for clients that poll.
+scale_hub = ScaleHub(port=os.environ.get("SCALE_PORT") or None, baudrate=int(os.environ.get("SCALE_BAUD", "9600")),
+                     poll_hz=float(os.environ.get("SCALE_POLL_HZ", "0")))
+
+
 @api_router.get("/scale/status")
 async def scale_status():
-    return {"connected": True, "name": "Demo Scale USB", "port": "ttyUSB0", "units": "kg"}
+    scale_hub.start()
+    return scale_hub.status()
 
 
 @api_router.get("/scale/read")
 async def scale_read():
-    import random
-    return {"connected": True, "weight_kg": round(random.uniform(0.2, 28.5), 1), "timestamp": now_iso()}
+    if scale_hub.latest is None:
+        queue = scale_hub.subscribe()
+        try:
+            await asyncio.wait_for(queue.get(), 2.0)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            scale_hub.unsubscribe(queue)
+    if scale_hub.latest is None:
+        raise HTTPException(status_code=503, detail="No reading from the scale")
+    return {"connected": scale_hub.connected, **scale_hub.latest}
+
+
+@api_router.get("/scale/stream")
+async def scale_stream(request: Request):
+    queue = scale_hub.subscribe()
+
+    async def stream():
+        try:
+            while True:
+                try:
+                    reading = await asyncio.wait_for(queue.get(), KIOSK_EVENTS_HEARTBEAT)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": ping\n\n"  # scale silent (disconnected)
+                    continue
+                if reading is None:
+                    return
+                yield f"event: weight\ndata: {json.dumps(reading)}\n\n"
+        finally:
+            scale_hub.unsubscribe(queue)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@api_router.post("/scale/tare")
+async def scale_tare():
+    try:
+        await scale_hub.tare()
+    except (RuntimeError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"Scale not available: {e}")
+    return {"ok": True}
+
+
+@api_router.post("/scale/zero")
+async def scale_zero():
+    try:
+        await scale_hub.zero()
+    except (RuntimeError, OSError) as e:
+        raise HTTPException(status_code=503, detail=f"Scale not available: {e}")
+    return {"ok": True}
 
 
 # Auth (simple PIN demo)
@@ -328,39 +1558,53 @@ async def login(req: LoginRequest):
 # Dataset & Training stubs
 @api_router.post("/dataset/images", response_model=DatasetImage)
 async def add_dataset_image(img: DatasetImage):
-    await db.dataset.insert_one(img.model_dump())
+    await db.dataset.insert_one(to_mongo(img))
     return img
 
 
 @api_router.get("/dataset/images", response_model=List[DatasetImage])
-async def list_dataset_images():
-    items = await db.dataset.find().to_list(length=200)
-    return [DatasetImage(**it) for it in items]
+async def list_dataset_images(after: Optional[str] = None, limit: Optional[int] = Query(None, ge=1),
+                              fields: Optional[str] = None,
+                              fmt: str = Query("json", alias="format", pattern="^(json|ndjson)$")):
+    return await list_documents(db.dataset, DatasetImage, "created_at", after, limit, fields, fmt,
+                                default_limit=200)
 
 
 @api_router.post("/train/start", response_model=TrainStatus)
 async def train_start(req: TrainStartRequest):
     ts = TrainStatus(airline_code=req.airline_code, status="scheduled")
-    await db.trains.insert_one(ts.model_dump())
+    await db.trains.insert_one(to_mongo(ts))
     return ts
 
 
 @api_router.get("/train/status/{airline_code}", response_model=List[TrainStatus])
 async def train_status(airline_code: str):
     items = await db.trains.find({"airline_code": airline_code}).to_list(length=20)
-    return [TrainStatus(**it) for it in items]
+    return [TrainStatus(**from_mongo(it)) for it in items]
 
 
 # Interactions (generic logger)
 @api_router.post("/interactions", response_model=Interaction)
 async def post_interaction(inter: Interaction):
-    await db.interactions.insert_one(inter.model_dump())
+    await interaction_writer.submit(to_mongo(inter))
     return inter
 
 
+@api_router.get("/interactions/stats")
+async def interaction_stats():
+    return interaction_writer.stats()
+
+
 # Include router
 app.include_router(api_router)
 
+
+# Prometheus scrape endpoint, outside /api: it is for the monitoring system, not the kiosks
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -368,34 +1612,165 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# outermost, so the time includes CORS and every other middleware
+app.add_middleware(metrics.LatencyMiddleware)
+
+# Logging (logging_setup.py) starts with the app rather than on import, so the
+# maintenance scripts that import this module don't write to server.jsonl.
+@app.on_event("startup")
+async def start_logging():
+    setup_logging(os.environ.get("LOG_DIR", ROOT_DIR / "logs"), os.environ.get("LOG_LEVEL", "INFO").upper())
+
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+# Retention: archive_old_data.py moves documents older than its --days (30 by
+# default) to Parquet every night; these TTL indexes only back it up, so keep
+# RETENTION_TTL_DAYS above the archival age (0 disables them). MongoDB does not
+# change expireAfterSeconds of an existing index: use collMod for that.
+RETENTION_TTL_DAYS = int(os.environ.get("RETENTION_TTL_DAYS", "45"))
+
+
+def _ttl(field: str = "created_at") -> List[IndexModel]:
+    if RETENTION_TTL_DAYS <= 0:
+        return []
+    return [IndexModel([(field, ASCENDING)], name=f"{field}_ttl", expireAfterSeconds=RETENTION_TTL_DAYS * 86400)]
+
+
+# Indexes for every query the routes issue. Names are explicit so the bootstrap
+# is idempotent and the report can tell declared indexes from stray ones.
+INDEXES: Dict[str, List[IndexModel]] = {
+    # lookups by id use the _id index every collection already has
+    "sessions": _ttl(),
+    "rules": [IndexModel([("airline_code", ASCENDING)], name="airline_code_unique", unique=True)],
+    "airlines": [IndexModel([("code", ASCENDING)], name="code_unique", unique=True)],
+    "kiosk_setup": [
+        IndexModel([("active", ASCENDING)], name="single_active", unique=True,
+                   partialFilterExpression={"active": True}),
+    ],
+    "scans": [IndexModel([("session_id", ASCENDING)], name="session_id"), *_ttl()],
+    "payments": [IndexModel([("session_id", ASCENDING)], name="session_id"), *_ttl()],
+    "interactions": _ttl(),
+    "flight_stats": [IndexModel([("day", ASCENDING), ("flight_number", ASCENDING), ("gate", ASCENDING)],
+                                name="day_flight_gate", unique=True)],
+    "activity_rollups": [
+        IndexModel([("res", ASCENDING), ("kiosk_id", ASCENDING), ("t", ASCENDING)], name="res_kiosk_t", unique=True),
+        IndexModel([("t", ASCENDING)], name="minute_ttl", expireAfterSeconds=ROLLUP_MINUTE_TTL_DAYS * 86400,
+                   partialFilterExpression={"res": "m"}),
+    ],
+    "trains": [IndexModel([("airline_code", ASCENDING), ("created_at", DESCENDING)], name="airline_code_created_at")],
+    "status_checks": [IndexModel([("timestamp", ASCENDING), ("_id", ASCENDING)], name="timestamp_id")],
+    "dataset": [IndexModel([("created_at", ASCENDING), ("_id", ASCENDING)], name="created_at_id")],
+}
+
+
+# an index with one of these does more than speed up reads by its keys
+INDEX_OPTIONS = ("unique", "expireAfterSeconds", "partialFilterExpression", "sparse")
+
+
+def _redundant_indexes(existing: Dict[str, Dict[str, Any]], declared: set) -> List[str]:
+    """Undeclared indexes, plus plain indexes whose keys prefix (or equal) those of another index.
+
+    Unique, TTL, partial and sparse indexes are never redundant themselves, and
+    partial or sparse ones do not cover the documents a plain index covers.
+    """
+    keys = {name: [tuple(k) for k in info["key"]] for name, info in existing.items() if name != "_id_"}
+    redundant = set(keys) - declared
+    plain = {name for name in keys if not any(existing[name].get(o) for o in INDEX_OPTIONS)}
+    covering = {name for name in keys if not (existing[name].get("partialFilterExpression")
+                                              or existing[name].get("sparse"))}
+    for name in plain:
+        key = keys[name]
+        for other in covering - {name}:
+            if keys[other][:len(key)] != key:
+                continue
+            # the same keys twice: keep the one with options, else the declared one, else the first name
+            longer, has_options = len(keys[other]) > len(key), other not in plain
+            if longer or has_options or (other in declared, name) > (name in declared, other):
+                redundant.add(name)
+    return sorted(redundant)
+
+
+async def ensure_indexes(database=None) -> Dict[str, Dict[str, List[str]]]:
+    """Create the declared indexes (no-op when present) and report missing/redundant ones."""
+    database = db if database is None else database
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for name, models in INDEXES.items():
+        coll = database[name]
+        try:
+            if models:
+                await coll.create_indexes(models)
+        except OperationFailure as e:
+            # e.g. duplicates blocking a unique index: keep serving, but say so
+            logger.error("Index bootstrap failed for %s: %s", name, e)
+        existing = await coll.index_information()
+        declared = {m.document["name"] for m in models}
+        report[name] = {
+            "missing": sorted(declared - set(existing)),
+            "redundant": _redundant_indexes(existing, declared),
+        }
+    problems = {k: v for k, v in report.items() if v["missing"] or v["redundant"]}
+    if problems:
+        logger.warning("Index report: %s", problems)
+    else:
+        logger.info("Indexes OK for %d collections", len(report))
+    return report
+
+
+@app.on_event("startup")
+async def bootstrap_indexes():
+    await ensure_indexes()
+
+
+@app.on_event("startup")
+async def start_setup_reconciler():
+    await active_setup.reconcile()
+    active_setup.start()
+
+
+@app.on_event("startup")
+async def start_interaction_writer():
+    interaction_writer.start()
+
+
+@app.on_event("startup")
+async def start_change_feed():
+    change_feed.start()
+
+
 @app.on_event("startup")
 async def seed_defaults():
+    seeded = []
     # Seed airline JetSMART if not exists
     existing = await db.airlines.find_one({"code": "JSM"})
     if not existing:
+        seeded.append("airlines")
         js = Airline(
             code="JSM",
             name="JetSMART",
             logo_url=None,
             palette={"primary": "#003595", "accent": "#E20C18", "bg": "#F7FAFF"},
         )
-        await db.airlines.insert_one(js.model_dump())
+        await db.airlines.insert_one(to_mongo(js))
     # Seed default rules for JetSMART
     rules = await db.rules.find_one({"airline_code": "JSM"})
     if not rules:
+        seeded.append("rules:JSM")
         r = Rules(airline_code="JSM", max_weight_kg=10.0,
                   dims_cm={"length": 55.0, "width": 35.0, "height": 25.0},
                   max_linear_cm=115.0,
                   overweight_fee_per_kg=15.0, oversize_fee_flat=30.0, currency="USD")
-        await db.rules.insert_one(r.model_dump())
+        await db.rules.insert_one(to_mongo(r))
+    if seeded:
+        await config_cache.bump(*seeded)
 
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    await active_setup.stop()
+    await change_feed.stop()
+    await scale_hub.stop()
+    await interaction_writer.stop()
+    client.close()
+    shutdown_logging()
\ No newline at end of file
@@ -0,0 +1,585 @@
+"""
+Storage backends for server.py.
+
+The routes talk to collections through the subset of Motor's API listed in
+`COLLECTION_API`: find/find_one with filters, projections and sort, inserts,
+updates with upsert, find_one_and_update, bulk_write, delete_many and index
+management. Two implementations provide it:
+
+* MongoDB through Motor (`AsyncIOMotorClient`), the default; it needs MONGO_URL;
+* `MemoryClient`, chosen explicitly with STORAGE=memory: an in-process store with the same semantics for that subset
+  (unique and partial unique indexes, upserts, $set/$setOnInsert/$inc/$unset,
+  BSON type ordering in sort), for unit tests, load tests and kiosks running
+  offline. Data lives as long as the process. TTL indexes are accepted but
+  nothing expires, and there are no transactions: start_session() fails with
+  the same error as a standalone mongod, so callers use their fallback path.
+  Capped collections keep their `max` newest documents and can be followed with
+  tailable cursors (CursorType.TAILABLE_AWAIT); unlike mongod, a tailable cursor
+  on an empty capped collection stays alive.
+"""
+import asyncio
+import copy
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import CursorType, ReturnDocument
+from pymongo.errors import BulkWriteError, CollectionInvalid, DuplicateKeyError, OperationFailure
+from pymongo.results import (BulkWriteResult, DeleteResult, InsertManyResult, InsertOneResult,
+                             UpdateResult)
+
+COLLECTION_API = (
+    "find", "find_one", "insert_one", "insert_many", "update_one", "update_many", "find_one_and_update",
+    "bulk_write", "delete_many", "count_documents", "create_indexes", "index_information", "drop",
+)
+
+_MISSING = object()
+TAIL_AWAIT_S = 1.0  # how long a tailable cursor waits for new documents, like maxAwaitTimeMS
+
+
+def create_client(mongo_url: Optional[str] = None, backend: Optional[str] = None, event_listeners=()):
+    """Motor client for MongoDB, or a MemoryClient when backend (default: STORAGE) is "memory".
+
+    The memory store is never picked for a missing MONGO_URL: that is an error,
+    so a misconfigured server or script does not run on an empty store.
+    event_listeners are pymongo monitoring listeners; the memory store sends no commands.
+    """
+    mongo_url = mongo_url if mongo_url is not None else os.environ.get("MONGO_URL")
+    backend = backend or os.environ.get("STORAGE") or "mongo"
+    if backend == "memory":
+        return MemoryClient()
+    if backend != "mongo":
+        raise ValueError(f"Unknown STORAGE backend: {backend}")
+    if not mongo_url:
+        raise ValueError("MONGO_URL is not set (STORAGE=memory selects the in-process store)")
+    from motor.motor_asyncio import AsyncIOMotorClient
+    return AsyncIOMotorClient(mongo_url, tz_aware=True, uuidRepresentation="standard",
+                              event_listeners=list(event_listeners))
+
+
+def require_mongo(client) -> None:
+    """For maintenance scripts: stop when `client` is the in-process store, which holds none of the data."""
+    if isinstance(client, MemoryClient):
+        raise SystemExit("This script works on MongoDB data: set MONGO_URL and unset STORAGE=memory")
+
+
+# BSON comparison order across types
+def _rank(value: Any) -> int:
+    if value is None or value is _MISSING:
+        return 1
+    if isinstance(value, bool):
+        return 8
+    if isinstance(value, (int, float)):
+        return 2
+    if isinstance(value, str):
+        return 3
+    if isinstance(value, dict):
+        return 4
+    if isinstance(value, (list, tuple)):
+        return 5
+    if isinstance(value, (bytes, uuid.UUID)):
+        return 6
+    if isinstance(value, ObjectId):
+        return 7
+    if isinstance(value, datetime):
+        return 9
+    return 10
+
+
+def _sort_key(value: Any) -> Tuple:
+    rank = _rank(value)
+    if rank == 1:
+        return (rank, 0)
+    if isinstance(value, uuid.UUID):
+        return (rank, value.bytes)
+    if isinstance(value, ObjectId):
+        return (rank, value.binary)
+    if rank in (4, 5, 10):
+        return (rank, repr(value))
+    return (rank, value)
+
+
+def _get(doc: Any, path: str) -> Any:
+    for part in path.split("."):
+        if isinstance(doc, dict) and part in doc:
+            doc = doc[part]
+        else:
+            return _MISSING
+    return doc
+
+
+def _set(doc: Dict[str, Any], path: str, value: Any) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def _unset(doc: Dict[str, Any], path: str) -> None:
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(leaf, None)
+
+
+def _equals(value: Any, expected: Any) -> bool:
+    if expected is None:
+        return value is None or value is _MISSING
+    if isinstance(value, list) and not isinstance(expected, list):
+        return any(_equals(v, expected) for v in value)
+    return value is not _MISSING and _rank(value) == _rank(expected) and value == expected
+
+
+def _compare(value: Any, expected: Any, op: str) -> bool:
+    if value is _MISSING or _rank(value) != _rank(expected):
+        return False
+    a, b = _sort_key(value), _sort_key(expected)
+    try:
+        return {"$gt": a > b, "$gte": a >= b, "$lt": a < b, "$lte": a <= b}[op]
+    except TypeError:
+        return False
+
+
+def _match_condition(value: Any, condition: Any) -> bool:
+    if not (isinstance(condition, dict) and condition and all(k.startswith("$") for k in condition)):
+        return _equals(value, condition)
+    for op, arg in condition.items():
+        if op == "$eq":
+            ok = _equals(value, arg)
+        elif op == "$ne":
+            ok = not _equals(value, arg)
+        elif op == "$in":
+            ok = any(_equals(value, a) for a in arg)
+        elif op == "$nin":
+            ok = not any(_equals(value, a) for a in arg)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = _compare(value, arg, op)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(arg)
+        elif op == "$not":
+            ok = not _match_condition(value, arg)
+        else:
+            raise OperationFailure(f"unknown operator: {op}", code=2)
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: Dict[str, Any], query: Optional[Dict[str, Any]]) -> bool:
+    for key, condition in (query or {}).items():
+        if key == "$or":
+            if not any(matches(doc, q) for q in condition):
+                return False
+        elif key == "$and":
+            if not all(matches(doc, q) for q in condition):
+                return False
+        elif key == "$nor":
+            if any(matches(doc, q) for q in condition):
+                return False
+        elif not _match_condition(_get(doc, key), condition):
+            return False
+    return True
+
+
+def project(doc: Dict[str, Any], projection: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    doc = copy.deepcopy(doc)
+    if not projection:
+        return doc
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out: Dict[str, Any] = {}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        for path in include:
+            value = _get(doc, path)
+            if value is not _MISSING:
+                _set(out, path, value)
+        return out
+    for path, keep in projection.items():
+        if not keep:
+            _unset(doc, path)
+    return doc
+
+
+def _sort_spec(key_or_list: Any, direction: Optional[int] = None) -> List[Tuple[str, int]]:
+    if isinstance(key_or_list, str):
+        return [(key_or_list, direction or 1)]
+    return [(k, d) for k, d in key_or_list]
+
+
+def sort_docs(docs: List[Dict[str, Any]], spec: Iterable[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    for key, direction in reversed(list(spec)):
+        docs.sort(key=lambda d: _sort_key(_get(d, key)), reverse=direction < 0)
+    return docs
+
+
+def _apply_update(doc: Dict[str, Any], update: Dict[str, Any], inserting: bool) -> None:
+    if not any(k.startswith("$") for k in update):  # replacement
+        _id = doc.get("_id")
+        doc.clear()
+        doc.update(copy.deepcopy(update))
+        if _id is not None:
+            doc.setdefault("_id", _id)
+        return
+    for op, fields in update.items():
+        if op == "$setOnInsert" and not inserting:
+            continue
+        for path, value in fields.items():
+            if op in ("$set", "$setOnInsert"):
+                _set(doc, path, copy.deepcopy(value))
+            elif op == "$unset":
+                _unset(doc, path)
+            elif op == "$inc":
+                current = _get(doc, path)
+                _set(doc, path, (0 if current is _MISSING else current) + value)
+            else:
+                raise OperationFailure(f"unknown update operator: {op}", code=9)
+
+
+class MemoryCursor:
+    def __init__(self, collection: "MemoryCollection", query, projection, cursor_type=CursorType.NON_TAILABLE):
+        self._collection = collection
+        self._query = query
+        self._projection = projection
+        self._sort: List[Tuple[str, int]] = []
+        self._skip = 0
+        self._limit = 0
+        self._tailable = cursor_type in (CursorType.TAILABLE, CursorType.TAILABLE_AWAIT)
+        self._await_data = cursor_type == CursorType.TAILABLE_AWAIT
+        self._last_seq = 0
+        self.alive = True
+        if self._tailable and collection._capped_max is None:
+            raise OperationFailure(f"tailable cursor requested on non capped collection {collection.name}", code=2)
+
+    def sort(self, key_or_list, direction=None) -> "MemoryCursor":
+        self._sort = _sort_spec(key_or_list, direction)
+        return self
+
+    def skip(self, n: int) -> "MemoryCursor":
+        self._skip = n
+        return self
+
+    def limit(self, n: int) -> "MemoryCursor":
+        self._limit = n
+        return self
+
+    def batch_size(self, n: int) -> "MemoryCursor":
+        return self
+
+    def _results(self) -> List[Dict[str, Any]]:
+        docs = sort_docs(self._collection._select(self._query), self._sort)[self._skip:]
+        if self._limit:
+            docs = docs[:self._limit]
+        return [project(d, self._projection) for d in docs]
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = self._results()
+        return docs if length is None else docs[:length]
+
+    def _tail(self) -> List[Dict[str, Any]]:
+        coll = self._collection
+        return [d for k, d in coll._docs.items() if coll._seq[k] > self._last_seq and matches(d, self._query)]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self._results():
+                yield doc
+            self.alive = False
+
+        async def tail():
+            # one batch in insertion order, like one getMore; the cursor stays alive
+            docs = self._tail()
+            if not docs and self._await_data:
+                await self._collection._wait_insert(TAIL_AWAIT_S)
+                docs = self._tail()
+            for doc in docs:
+                self._last_seq = max(self._last_seq, self._collection._seq.get(self._collection._key(doc["_id"]), 0))
+                yield project(doc, self._projection)
+
+        return tail() if self._tailable else iterate()
+
+
+class MemoryCollection:
+    def __init__(self, database: "MemoryDatabase", name: str):
+        self.database = database
+        self.name = name
+        self._docs: Dict[Any, Dict[str, Any]] = {}  # _id (hashable) -> document, in insertion order
+        self._seq: Dict[Any, int] = {}  # _id (hashable) -> insertion number, for tailable cursors
+        self._next_seq = 0
+        self._indexes: Dict[str, Dict[str, Any]] = {}
+        self._capped_max: Optional[int] = None
+        self._inserted: Optional[asyncio.Event] = None
+
+    # -- helpers
+    @staticmethod
+    def _key(_id: Any) -> Any:
+        return repr(_id) if isinstance(_id, (dict, list)) else (type(_id).__name__, _id)
+
+    def _select(self, query) -> List[Dict[str, Any]]:
+        return [d for d in self._docs.values() if matches(d, query)]
+
+    def _check_unique(self, doc: Dict[str, Any], ignore: Any = _MISSING) -> None:
+        for name, index in self._indexes.items():
+            if not index.get("unique"):
+                continue
+            partial = index.get("partialFilterExpression")
+            if partial and not matches(doc, partial):
+                continue
+            fields = [k for k, _ in index["key"]]
+            values = [_get(doc, f) for f in fields]
+            for other in self._docs.values():
+                if other.get("_id") == ignore or (partial and not matches(other, partial)):
+                    continue
+                if all(_equals(_get(other, f), None if v is _MISSING else v) for f, v in zip(fields, values)):
+                    raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: {name}",
+                                            11000, {"keyValue": dict(zip(fields, values))})
+
+    def _insert(self, doc: Dict[str, Any]) -> Any:
+        doc = copy.deepcopy(doc)
+        doc.setdefault("_id", ObjectId())
+        key = self._key(doc["_id"])
+        if key in self._docs:
+            raise DuplicateKeyError(f"E11000 duplicate key error collection: {self.name} index: _id_",
+                                    11000, {"keyValue": {"_id": doc["_id"]}})
+        self._check_unique(doc)
+        self._docs[key] = doc
+        self._next_seq += 1
+        self._seq[key] = self._next_seq
+        if self._capped_max is not None:
+            while len(self._docs) > self._capped_max:
+                self._remove(next(iter(self._docs)))
+        if self._inserted is not None:
+            self._inserted.set()
+            self._inserted = None
+        return doc["_id"]
+
+    def _remove(self, key: Any) -> None:
+        del self._docs[key]
+        del self._seq[key]
+
+    async def _wait_insert(self, timeout: float) -> None:
+        if self._inserted is None:
+            self._inserted = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._inserted.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _update(self, query, update, upsert: bool, multi: bool) -> Dict[str, Any]:
+        targets = self._select(query)
+        if not multi:
+            targets = targets[:1]
+        for doc in targets:
+            changed = copy.deepcopy(doc)
+            _apply_update(changed, update, inserting=False)
+            if changed.get("_id") != doc.get("_id"):
+                raise OperationFailure("Performing an update on the path '_id' would modify the immutable field '_id'",
+                                       code=66)
+            self._check_unique(changed, ignore=doc["_id"])
+            doc.clear()
+            doc.update(changed)
+        if targets or not upsert:
+            return {"n": len(targets), "nModified": len(targets)}
+        new = {k: copy.deepcopy(v) for k, v in (query or {}).items()
+               if not k.startswith("$") and not (isinstance(v, dict) and any(o.startswith("$") for o in v))}
+        expanded: Dict[str, Any] = {}
+        for path, value in new.items():
+            _set(expanded, path, value)
+        _apply_update(expanded, update, inserting=True)
+        return {"n": 1, "nModified": 0, "upserted": self._insert(expanded)}
+
+    # -- Motor-compatible API
+    def find(self, filter=None, projection=None, sort=None, limit=0, skip=0,
+             cursor_type=CursorType.NON_TAILABLE, **kwargs) -> MemoryCursor:
+        cursor = MemoryCursor(self, filter, projection, cursor_type)
+        if sort:
+            cursor.sort(sort)
+        return cursor.limit(limit).skip(skip)
+
+    async def find_one(self, filter=None, projection=None, sort=None, **kwargs) -> Optional[Dict[str, Any]]:
+        if filter is not None and not isinstance(filter, dict):
+            filter = {"_id": filter}
+        docs = await self.find(filter, projection, sort=sort, limit=1).to_list(1)
+        return docs[0] if docs else None
+
+    async def insert_one(self, document, session=None, **kwargs) -> InsertOneResult:
+        return InsertOneResult(self._insert(document), True)
+
+    async def insert_many(self, documents, ordered=True, session=None, **kwargs) -> InsertManyResult:
+        ids, errors = [], []
+        for index, doc in enumerate(documents):
+            try:
+                ids.append(self._insert(doc))
+            except DuplicateKeyError as e:
+                errors.append({"index": index, "code": 11000, "errmsg": str(e), "op": doc})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(ids), "writeConcernErrors": [],
+                                  "nUpserted": 0, "nMatched": 0, "nModified": 0, "nRemoved": 0, "upserted": []})
+        return InsertManyResult(ids, True)
+
+    async def update_one(self, filter, update, upsert=False, session=None, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, multi=False), True)
+
+    async def update_many(self, filter, update, upsert=False, session=None, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, update, upsert, multi=True), True)
+
+    async def replace_one(self, filter, replacement, upsert=False, session=None, **kwargs) -> UpdateResult:
+        return UpdateResult(self._update(filter, replacement, upsert, multi=False), True)
+
+    async def find_one_and_update(self, filter, update, projection=None, sort=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE, session=None, **kwargs):
+        targets = sort_docs(self._select(filter), _sort_spec(sort) if sort else [])
+        before = copy.deepcopy(targets[0]) if targets else None
+        query = {"_id": targets[0]["_id"]} if targets else filter
+        raw = self._update(query, update, upsert, multi=False)
+        if return_document == ReturnDocument.BEFORE:
+            return project(before, projection) if before else None
+        _id = targets[0]["_id"] if targets else raw.get("upserted")
+        if _id is None:
+            return None
+        return project(self._docs[self._key(_id)], projection)
+
+    async def delete_one(self, filter, session=None, **kwargs) -> DeleteResult:
+        docs = self._select(filter)[:1]
+        for doc in docs:
+            self._remove(self._key(doc["_id"]))
+        return DeleteResult({"n": len(docs)}, True)
+
+    async def delete_many(self, filter, session=None, **kwargs) -> DeleteResult:
+        docs = self._select(filter)
+        for doc in docs:
+            self._remove(self._key(doc["_id"]))
+        return DeleteResult({"n": len(docs)}, True)
+
+    async def bulk_write(self, requests, ordered=True, session=None, **kwargs) -> BulkWriteResult:
+        result = {"writeErrors": [], "writeConcernErrors": [], "nInserted": 0, "nUpserted": 0, "nMatched": 0,
+                  "nModified": 0, "nRemoved": 0, "upserted": []}
+        for index, op in enumerate(requests):
+            try:
+                kind = type(op).__name__
+                if kind == "InsertOne":
+                    self._insert(op._doc)
+                    result["nInserted"] += 1
+                elif kind in ("UpdateOne", "UpdateMany", "ReplaceOne"):
+                    raw = self._update(op._filter, op._doc, op._upsert, multi=kind == "UpdateMany")
+                    if "upserted" in raw:
+                        result["nUpserted"] += 1
+                        result["upserted"].append({"index": index, "_id": raw["upserted"]})
+                    else:
+                        result["nMatched"] += raw["n"]
+                        result["nModified"] += raw["nModified"]
+                elif kind in ("DeleteOne", "DeleteMany"):
+                    deleted = await (self.delete_many if kind == "DeleteMany" else self.delete_one)(op._filter)
+                    result["nRemoved"] += deleted.deleted_count
+                else:
+                    raise OperationFailure(f"unsupported bulk operation: {kind}")
+            except DuplicateKeyError as e:
+                result["writeErrors"].append({"index": index, "code": 11000, "errmsg": str(e)})
+                if ordered:
+                    break
+        if result["writeErrors"]:
+            raise BulkWriteError(result)
+        return BulkWriteResult(result, True)
+
+    async def count_documents(self, filter, **kwargs) -> int:
+        return len(self._select(filter))
+
+    async def estimated_document_count(self, **kwargs) -> int:
+        return len(self._docs)
+
+    async def create_indexes(self, indexes, **kwargs) -> List[str]:
+        names = []
+        for model in indexes:
+            spec = dict(model.document)
+            spec["key"] = list(spec["key"].items())
+            if spec.get("unique"):
+                # like mongod, refuse a unique index the data already violates
+                docs, self._docs = list(self._docs.values()), {}
+                try:
+                    self._indexes[spec["name"]] = spec
+                    for doc in docs:
+                        self._check_unique(doc)
+                        self._docs[self._key(doc["_id"])] = doc
+                except DuplicateKeyError:
+                    del self._indexes[spec["name"]]
+                    self._docs = {self._key(d["_id"]): d for d in docs}
+                    raise
+            self._indexes[spec["name"]] = spec
+            names.append(spec["name"])
+        return names
+
+    async def index_information(self) -> Dict[str, Dict[str, Any]]:
+        info = {"_id_": {"key": [("_id", 1)], "v": 2}}
+        for name, spec in self._indexes.items():
+            info[name] = {k: v for k, v in spec.items() if k != "name"}
+        return info
+
+    async def drop_indexes(self) -> None:
+        self._indexes.clear()
+
+    async def drop(self) -> None:
+        self._docs.clear()
+        self._seq.clear()
+        self._indexes.clear()
+        self._capped_max = None
+        self.database._created.discard(self.name)
+
+
+class MemoryDatabase:
+    def __init__(self, client: "MemoryClient", name: str):
+        self.client = client
+        self.name = name
+        self._collections: Dict[str, MemoryCollection] = {}
+        self._created: set = set()  # collections that exist without documents (create_collection, indexes)
+
+    def __getitem__(self, name: str) -> MemoryCollection:
+        if name not in self._collections:
+            self._collections[name] = MemoryCollection(self, name)
+        return self._collections[name]
+
+    def __getattr__(self, name: str) -> MemoryCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+    async def list_collection_names(self) -> List[str]:
+        return [name for name, coll in self._collections.items()
+                if coll._docs or coll._indexes or name in self._created]
+
+    async def create_collection(self, name: str, capped: bool = False, size: Optional[int] = None,
+                                max: Optional[int] = None, **kwargs) -> MemoryCollection:
+        if name in await self.list_collection_names():
+            raise CollectionInvalid(f"collection {name} already exists")
+        coll = self[name]
+        # the memory store has no byte accounting: `max` documents bounds it (default 1000)
+        coll._capped_max = (max or 1000) if capped else None
+        self._created.add(name)
+        return coll
+
+    async def command(self, name, *args, **kwargs):
+        raise OperationFailure(f"command {name} is not supported by the memory backend", code=59)
+
+
+class MemoryClient:
+    def __init__(self):
+        self._databases: Dict[str, MemoryDatabase] = {}
+
+    def __getitem__(self, name: str) -> MemoryDatabase:
+        if name not in self._databases:
+            self._databases[name] = MemoryDatabase(self, name)
+        return self._databases[name]
+
+    async def start_session(self, **kwargs):
+        raise OperationFailure("Transaction numbers are only allowed on a replica set member or mongos", code=20)
+
+    async def drop_database(self, name: str) -> None:
+        self._databases.pop(getattr(name, "name", name), None)
+
+    def close(self) -> None:
+        pass
@@ -0,0 +1,195 @@
+"""
+What-if analysis: replay historical scans against candidate rules.
+
+    cd backend
+    MONGO_URL=... DB_NAME=... python whatif_rules.py --airline JSM --since 2026-01-01 --until 2026-04-01 \\
+        --candidate max_weight_kg=8 --candidate max_linear_cm=110,max_weight_kg=8
+
+The scans of the airline's sessions in [since, until) are streamed into NumPy
+columns (dimensions and weight only). --since is required, and the filter runs
+in MongoDB: the airline's sessions opened from --session-hours before since are
+read by created_at, then their scans in the window by session_id, --chunk ids
+per $in query, so only the airline's scans leave the server.
+
+The current rules of the airline and every candidate are then evaluated over
+all rows at once, and the report compares the compliance rate and the fee
+revenue the same bags would have produced: overweight_fee_per_kg per kg over
+the limit, plus oversize_fee_flat when any dimension or the linear sum is over.
+A candidate overrides Rules fields; `length`, `width` and `height` set the
+dims_cm entries.
+
+--synthetic N skips MongoDB and evaluates N random bags instead (timing check;
+run it with STORAGE=memory).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import server  # noqa: E402
+from storage import require_mongo  # noqa: E402
+
+COLUMNS = ("length", "width", "height", "weight_kg")
+DIMS = ("length", "width", "height")
+
+
+def parse_candidate(text):
+    update, dims = {}, {}
+    for part in filter(None, text.split(",")):
+        key, _, value = part.partition("=")
+        key = key.strip()
+        if key in DIMS:
+            dims[key] = float(value)
+        elif key in server.Rules.model_fields and key not in ("id", "airline_code", "currency", "updated_at"):
+            update[key] = float(value)
+        else:
+            raise argparse.ArgumentTypeError(f"unknown rules field: {key}")
+    return update, dims
+
+
+def apply_candidate(rules, candidate):
+    update, dims = candidate
+    return rules.model_copy(update={**update, "dims_cm": {**rules.dims_cm, **dims}})
+
+
+def describe(candidate):
+    update, dims = candidate
+    return ", ".join(f"{k}={v:g}" for k, v in {**update, **dims}.items())
+
+
+async def load_scans(db, airline, since, until, session_age=timedelta(hours=24), batch=50_000, chunk=1000):
+    """DataFrame with one row per scan of the airline's sessions in [since, until).
+
+    Sessions opened up to `session_age` before `since` can still scan inside the window.
+    """
+    window = {"created_at": {"$gte": since, "$lt": until}}
+    projection = {"_id": 0, "dims_cm": 1, "weight_kg": 1}
+    chunks = []
+    rows = {c: [] for c in COLUMNS}
+
+    async def add_scans(session_ids):
+        nonlocal rows
+        cursor = db.scans.find({"session_id": {"$in": session_ids}, **window}, projection)
+        async for doc in cursor.batch_size(batch):
+            dims = doc.get("dims_cm") or {}
+            for c in DIMS:
+                rows[c].append(dims.get(c, np.nan))
+            rows["weight_kg"].append(doc.get("weight_kg", np.nan))
+            if len(rows["weight_kg"]) >= batch:
+                chunks.append(pd.DataFrame({c: np.asarray(v, dtype=np.float32) for c, v in rows.items()}))
+                rows = {c: [] for c in COLUMNS}
+
+    session_ids = []
+    sessions = db.sessions.find({"airline_code": airline, "created_at": {"$gte": since - session_age, "$lt": until}},
+                                {"_id": 1})
+    async for doc in sessions.batch_size(chunk):
+        session_ids.append(str(doc["_id"]))
+        if len(session_ids) >= chunk:
+            await add_scans(session_ids)
+            session_ids = []
+    if session_ids:
+        await add_scans(session_ids)
+    chunks.append(pd.DataFrame({c: np.asarray(v, dtype=np.float32) for c, v in rows.items()}))
+    return pd.concat(chunks, ignore_index=True).dropna()
+
+
+def synthetic_scans(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "length": rng.normal(50, 4, n).astype(np.float32),
+        "width": rng.normal(31, 3, n).astype(np.float32),
+        "height": rng.normal(21, 2.5, n).astype(np.float32),
+        "weight_kg": rng.gamma(16, 0.5, n).astype(np.float32),
+    })
+
+
+def evaluate(scans, rules):
+    """Compliance and fees of every bag under `rules`, computed column-wise."""
+    length, width, height = (scans[c].to_numpy() for c in DIMS)
+    weight = scans["weight_kg"].to_numpy()
+    oversize = ((length > rules.dims_cm["length"]) | (width > rules.dims_cm["width"])
+                | (height > rules.dims_cm["height"]) | (length + width + height > rules.max_linear_cm))
+    excess_kg = np.clip(weight - rules.max_weight_kg, 0, None)
+    overweight = excess_kg > 0
+    compliant = ~(oversize | overweight)
+    overweight_fees = excess_kg.astype(np.float64) * rules.overweight_fee_per_kg
+    oversize_fees = oversize * rules.oversize_fee_flat
+    n = len(scans)
+    return {
+        "scans": n,
+        "compliance_rate": float(compliant.mean()) if n else 0.0,
+        "overweight": int(overweight.sum()),
+        "oversize": int(oversize.sum()),
+        "overweight_revenue": float(overweight_fees.sum()),
+        "oversize_revenue": float(oversize_fees.sum()),
+        "revenue": float(overweight_fees.sum() + oversize_fees.sum()),
+    }
+
+
+def report(baseline, results, currency):
+    print(f"\n{'rules':<38}{'compliant':>10}{'Δ pts':>8}{'overweight':>12}{'oversize':>10}"
+          f"{'revenue':>14}{'Δ revenue':>14}")
+    for label, r in [("current", baseline)] + results:
+        d_rate = (r["compliance_rate"] - baseline["compliance_rate"]) * 100
+        d_rev = r["revenue"] - baseline["revenue"]
+        print(f"{label[:37]:<38}{r['compliance_rate'] * 100:>9.1f}%{d_rate:>+8.1f}{r['overweight']:>12}"
+              f"{r['oversize']:>10}{r['revenue']:>14,.0f}{d_rev:>+14,.0f}")
+    print(f"revenue in {currency}")
+
+
+async def main(args):
+    t0 = time.perf_counter()
+    if args.synthetic:
+        scans = synthetic_scans(args.synthetic)
+        rules = server.Rules(airline_code=args.airline)
+    else:
+        require_mongo(server.client)
+        doc = await server.db.rules.find_one({"airline_code": args.airline})
+        if doc is None:
+            sys.exit(f"no rules for airline {args.airline}")
+        rules = server.Rules(**server.from_mongo(doc))
+        scans = await load_scans(server.db, args.airline, args.since, args.until,
+                                 timedelta(hours=args.session_hours), chunk=args.chunk)
+    loaded = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    baseline = evaluate(scans, rules)
+    results = [(describe(c), evaluate(scans, apply_candidate(rules, c))) for c in args.candidate]
+    evaluated = time.perf_counter() - t0
+
+    if args.json:
+        print(json.dumps({"current": baseline, "candidates": dict(results)}, indent=2))
+    else:
+        print(f"{len(scans)} scans loaded in {loaded:.2f}s, {1 + len(results)} rule sets evaluated in {evaluated:.3f}s")
+        report(baseline, results, rules.currency)
+
+    server.client.close()
+
+
+def utc_date(text):
+    return datetime.fromisoformat(text).replace(tzinfo=timezone.utc)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay historical scans against candidate rules")
+    parser.add_argument("--airline", default="JSM")
+    parser.add_argument("--since", type=utc_date, help="first day of scans to replay (required unless --synthetic)")
+    parser.add_argument("--until", type=utc_date, default=datetime.now(timezone.utc))
+    parser.add_argument("--session-hours", type=float, default=24,
+                        help="how long before --since a session may have opened and still scan in the window")
+    parser.add_argument("--chunk", type=int, default=1000, help="session ids per $in query")
+    parser.add_argument("--candidate", type=parse_candidate, action="append", default=[],
+                        help="comma-separated overrides, e.g. max_weight_kg=8,length=50")
+    parser.add_argument("--synthetic", type=int, default=0, help="evaluate N random bags instead of MongoDB")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    if args.since is None and not args.synthetic:
+        parser.error("--since is required")
+    asyncio.run(main(args))
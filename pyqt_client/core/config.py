@@ -8,8 +8,8 @@ from typing import Dict, Any, Optional
 
 
 class ConfigManager:
-    def __init__(self):
-        self.config_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
+    def __init__(self, config_dir: Optional[str] = None):
+        self.config_dir = config_dir or os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config')
         self.setup_file = os.path.join(self.config_dir, 'setup.json')
         self.app_file = os.path.join(self.config_dir, 'app.json')
         
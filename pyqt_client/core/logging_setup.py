@@ -0,0 +1,31 @@
+"""
+Asynchronous structured logging for the kiosk application
+
+Services log through the standard ``logging`` module; the queue, JSON-lines
+file, gzip rotation and rate limiting are the shared implementation in
+shared/logging_setup.py. This module sets the kiosk's log directory and file.
+"""
+
+import logging
+import os
+import sys
+from logging.handlers import QueueListener
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if ROOT not in sys.path:
+    sys.path.append(ROOT)  # for shared/
+
+from shared import logging_setup as _shared  # noqa: E402
+from shared.logging_setup import JsonFormatter, RateLimitFilter, shutdown_logging  # noqa: E402,F401
+
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+
+
+def setup_logging(log_dir: str = DEFAULT_LOG_DIR, level: int = logging.INFO,
+                  filename: str = 'kiosk.jsonl', **kwargs) -> QueueListener:
+    """
+    Route the root logger through a queue to logs/kiosk.jsonl (and stderr).
+    Calling it again returns the running listener.
+    """
+    return _shared.setup_logging(log_dir, filename, level=level, **kwargs)
@@ -0,0 +1,324 @@
+"""
+Application-wide theme for the kiosk application
+
+The whole look of the kiosk is compiled once into a single stylesheet that is
+installed on the QApplication. Screens never call setStyleSheet themselves:
+they tag widgets with an objectName, a ``role``/``variant`` property, or a
+``state`` property, and switch states with ``set_state`` which only re-polishes
+the affected widget instead of re-parsing a stylesheet.
+"""
+
+from string import Template
+from typing import Any, Dict, Optional
+
+from PyQt5.QtWidgets import QApplication, QWidget
+
+
+# Same keys as ``Airline.palette`` in the backend (primary, accent, bg), plus
+# the secondary colors used by the kiosk screens.
+DEFAULT_PALETTE = {
+    "primary": "#1E3F8A",
+    "primary_hover": "#2D4F9A",
+    "primary_tint": "#F2F5FF",
+    "primary_tint_pressed": "#E6EDFF",
+    "accent": "#E20C18",
+    "accent_hover": "#C70A15",
+    "accent_pressed": "#A00812",
+    "bg": "#F7FAFF",
+    "surface": "#FFFFFF",
+    "text_muted": "#666666",
+    "success": "#28a745",
+    "success_hover": "#218838",
+    "danger": "#dc3545",
+    "warning": "#ffc107",
+    "warning_hover": "#e0a800",
+    "info": "#17a2b8",
+    "info_hover": "#138496",
+    "info_pressed": "#0f6674",
+    "muted": "#6c757d",
+    "muted_hover": "#5a6268",
+    "muted_pressed": "#495057",
+    "hero_start": "#87CEEB",
+    "hero_end": "#4682B4",
+}
+
+# (base, derived, factor): derived colors follow an overridden base color
+# unless the palette overrides them explicitly as well.
+_DERIVED = [
+    ("primary", "primary_hover", 1.15),
+    ("accent", "accent_hover", 0.88),
+    ("accent", "accent_pressed", 0.71),
+]
+
+
+_QSS = Template("""
+QWidget {
+    background-color: $bg;
+    font-family: Arial, sans-serif;
+}
+QPushButton {
+    padding: 10px 20px;
+    font-size: 16px;
+    font-weight: bold;
+    border: 2px solid $primary;
+    border-radius: 8px;
+    background-color: $surface;
+    color: $primary;
+}
+QPushButton:hover { background-color: $primary_tint; }
+QPushButton:pressed { background-color: $primary_tint_pressed; }
+QComboBox, QLineEdit {
+    padding: 8px;
+    font-size: 14px;
+    border: 2px solid $primary;
+    border-radius: 4px;
+    background-color: $surface;
+}
+QLabel {
+    color: $primary;
+    font-size: 14px;
+}
+
+/* Shared roles */
+QFrame[role="hero"] {
+    background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
+        stop: 0 $hero_start, stop: 1 $hero_end);
+}
+QFrame[role="hero"] QLabel {
+    background: transparent;
+    color: white;
+}
+QFrame[role="card"] {
+    background-color: $surface;
+    border-radius: 10px;
+    padding: 20px;
+}
+QFrame[role="card"] QLabel { background: transparent; }
+QLabel[role="title"] {
+    font-size: 28px;
+    font-weight: bold;
+    color: $primary;
+    margin-bottom: 30px;
+}
+QLabel[role="hero_title"] {
+    font-size: 48px;
+    font-weight: bold;
+    margin-bottom: 20px;
+}
+QLabel[role="value"] {
+    font-weight: bold;
+    font-size: 16px;
+}
+QLabel[role="hotspot"] {
+    background-color: transparent;
+    border: none;
+}
+
+/* Button variants */
+QPushButton[variant="primary"] { background-color: $primary; color: white; border: none; }
+QPushButton[variant="primary"]:hover { background-color: $primary_hover; }
+QPushButton[variant="accent"] { background-color: $accent; color: white; border: none; }
+QPushButton[variant="accent"]:hover { background-color: $accent_hover; }
+QPushButton[variant="accent"]:pressed { background-color: $accent_pressed; }
+QPushButton[variant="success"] { background-color: $success; color: white; border: none; }
+QPushButton[variant="success"]:hover { background-color: $success_hover; }
+QPushButton[variant="info"] { background-color: $info; color: white; border: none; }
+QPushButton[variant="info"]:hover { background-color: $info_hover; }
+QPushButton[variant="info"]:pressed { background-color: $info_pressed; }
+QPushButton[variant="muted"] { background-color: $muted; color: white; border: none; }
+QPushButton[variant="muted"]:hover { background-color: $muted_hover; }
+QPushButton[variant="muted"]:pressed { background-color: $muted_pressed; }
+QPushButton[variant="warning"] { background-color: $warning; color: black; border: none; }
+QPushButton[variant="warning"]:hover { background-color: $warning_hover; }
+QPushButton[size="large"] {
+    font-size: 18px;
+    padding: 15px 30px;
+}
+QPushButton[size="hero"] {
+    font-size: 24px;
+    border-radius: 10px;
+}
+
+/* Scan screen */
+QLabel#cam_view {
+    border: 2px solid $primary;
+    border-radius: 10px;
+    background-color: black;
+}
+QLabel#lbl_bagdata_title {
+    font-size: 18px;
+    font-weight: bold;
+    margin-bottom: 20px;
+}
+QLabel#lbl_calibration_status { color: green; font-weight: bold; }
+QLabel#lbl_last_weight { color: $warning; font-weight: bold; margin-top: 15px; }
+QPushButton#btn_demo_weight { margin-left: 8px; }
+
+/* Validate screen */
+QFrame#frm_result { padding: 30px; margin: 20px; }
+QLabel#lbl_result {
+    font-size: 32px;
+    font-weight: bold;
+    padding: 20px;
+    border-radius: 10px;
+    margin-bottom: 20px;
+}
+QLabel#lbl_result[state="ok"] { background-color: $success; color: white; }
+QLabel#lbl_result[state="fail"] { background-color: $accent; color: white; }
+QLabel#lbl_message { font-size: 18px; margin-bottom: 20px; }
+QLabel#lbl_reasons { font-size: 16px; font-weight: bold; margin-bottom: 10px; }
+QListWidget#lst_reasons {
+    border: 1px solid #ccc;
+    border-radius: 5px;
+    background-color: #f9f9f9;
+    color: $accent;
+    font-weight: bold;
+    padding: 10px;
+    margin-bottom: 20px;
+}
+
+/* Tariffs screen */
+QFrame#frm_pricing { padding: 30px; }
+QLabel#out_total {
+    font-weight: bold;
+    font-size: 20px;
+    color: $accent;
+    border-top: 2px solid $primary;
+    padding-top: 10px;
+    margin-top: 10px;
+}
+
+/* Payment screen */
+QFrame#frm_payment_status { padding: 40px; margin: 20px; }
+QLabel#lbl_payment_status {
+    font-size: 24px;
+    font-weight: bold;
+    padding: 20px;
+    border-radius: 10px;
+    margin-bottom: 30px;
+}
+QLabel#lbl_payment_status[state="processing"] { background-color: $warning; color: black; }
+QLabel#lbl_payment_status[state="approved"] { background-color: $success; color: white; }
+QLabel#lbl_payment_status[state="declined"] { background-color: $danger; color: white; }
+QLabel#lbl_processing { font-size: 18px; color: $text_muted; margin-bottom: 20px; }
+
+/* Goodbye screen */
+QLabel#lbl_goodbye_title {
+    font-size: 32px;
+    font-weight: bold;
+    margin-bottom: 40px;
+    padding: 0 50px;
+}
+QLabel#lbl_countdown { font-size: 18px; margin-bottom: 20px; }
+QLabel#lbl_progress { font-size: 24px; }
+
+/* Welcome / start screens */
+QLabel#lbl_subtitle { font-size: 24px; margin-bottom: 40px; }
+QLabel#lbl_start_title { margin-bottom: 40px; }
+
+/* Free weigh screen */
+QFrame#frm_weight {
+    border: 3px solid $primary;
+    border-radius: 15px;
+    padding: 60px;
+    margin: 40px;
+}
+QLabel#out_weight_free {
+    font-size: 120px;
+    font-weight: bold;
+    color: $accent;
+    margin-bottom: 20px;
+}
+QLabel#lbl_units_free { font-size: 36px; font-weight: bold; color: $primary; }
+QLabel#lbl_scale_status { font-size: 16px; color: $text_muted; margin-top: 20px; }
+QLabel#lbl_scale_status[state="connected"] { color: green; }
+QLabel#lbl_scale_status[state="simulated"] { color: orange; }
+QLabel#lbl_scale_status[state="error"] { color: red; }
+QPushButton#btn_back_free_weigh, QPushButton#btn_tare { font-size: 18px; }
+
+/* Demo weight dialog */
+QLabel#lbl_demo_weight_title {
+    font-size: 20px;
+    font-weight: bold;
+    color: $primary;
+    margin-bottom: 20px;
+}
+QFrame#frm_demo_weight {
+    background-color: #f8f9fa;
+    border: 2px solid $primary;
+    border-radius: 10px;
+    padding: 20px;
+    margin: 10px 0;
+}
+QLabel#out_demo_weight {
+    font-size: 48px;
+    font-weight: bold;
+    color: $accent;
+    margin: 10px 0;
+}
+QLabel#lbl_demo_units { font-size: 18px; color: $text_muted; }
+QPushButton#btn_cancel_weight, QPushButton#btn_set_weight {
+    font-size: 14px;
+    border-radius: 6px;
+    padding: 8px 16px;
+}
+""")
+
+
+def _shade(color: str, factor: float) -> str:
+    """Lighten (factor > 1) or darken (factor < 1) a #RRGGBB color"""
+    value = color.lstrip('#')
+    channels = [int(value[i:i + 2], 16) for i in (0, 2, 4)]
+    channels = [max(0, min(255, int(round(c * factor)))) for c in channels]
+    return '#' + ''.join(f'{c:02X}' for c in channels)
+
+
+def set_state(widget: QWidget, value: str, name: str = "state"):
+    """
+    Switch a widget between themed states through a dynamic property.
+    Only the widget is re-polished; the application stylesheet is not re-parsed.
+    """
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+
+
+class ThemeManager:
+    def __init__(self, config=None):
+        self.palette = dict(DEFAULT_PALETTE)
+        self._stylesheet: Optional[str] = None
+        self._applied: Optional[str] = None
+
+        # Airline palette from app config (same shape as the backend Airline.palette)
+        if config is not None:
+            self.set_palette(config.get_app_setting('palette', {}) or {})
+
+    def set_palette(self, overrides: Dict[str, Any]):
+        """Merge an airline palette over the defaults"""
+        palette = dict(DEFAULT_PALETTE)
+        palette.update({k: str(v) for k, v in overrides.items() if k in DEFAULT_PALETTE})
+        for base, derived, factor in _DERIVED:
+            if base in overrides and derived not in overrides:
+                palette[derived] = _shade(palette[base], factor)
+
+        if palette != self.palette:
+            self.palette = palette
+            self._stylesheet = None
+
+    def stylesheet(self) -> str:
+        """Get the compiled application stylesheet"""
+        if self._stylesheet is None:
+            self._stylesheet = _QSS.substitute(self.palette)
+        return self._stylesheet
+
+    def apply(self, app: Optional[QApplication] = None):
+        """Install the stylesheet on the application (no-op if unchanged)"""
+        app = app or QApplication.instance()
+        stylesheet = self.stylesheet()
+        if app is None or stylesheet == self._applied:
+            return
+        app.setStyleSheet(stylesheet)
+        self._applied = stylesheet
@@ -0,0 +1,130 @@
+"""
+Event-loop lag watchdog for the kiosk application
+
+A heartbeat QTimer on the GUI thread stamps the time on every tick, and a
+background thread checks the stamp. If the GUI thread misses its heartbeat
+for longer than the threshold, the watchdog captures the main thread's Python
+stack while it is still blocked and writes it to a rotating log. The blocking
+call (a serial read, a model load...) is therefore in the log.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Optional
+
+from PyQt5.QtCore import QObject, QTimer
+
+
+DEFAULT_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'logs')
+
+
+class EventLoopWatchdog(QObject):
+    def __init__(self, threshold_ms: int = 500, interval_ms: int = 100,
+                 log_path: Optional[str] = None, max_bytes: int = 1024 * 1024,
+                 backup_count: int = 5, parent: Optional[QObject] = None):
+        super().__init__(parent)
+        self.threshold = threshold_ms / 1000.0
+        self.interval = interval_ms / 1000.0
+        self.log_path = log_path or os.path.join(DEFAULT_LOG_DIR, 'stalls.log')
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+
+        self.metrics: Dict[str, Any] = {
+            'beats': 0,
+            'stalls': 0,
+            'max_lag_ms': 0.0,
+            'last_stall_ms': 0.0,
+        }
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._in_stall = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._main_ident = threading.main_thread().ident
+        self._logger: Optional[logging.Logger] = None
+        self._handler: Optional[logging.Handler] = None
+
+        # Heartbeat lives on the GUI thread: if the event loop blocks, it stops ticking
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setInterval(interval_ms)
+        self.heartbeat.timeout.connect(self._beat)
+
+    def start(self):
+        """Start the heartbeat and the watchdog thread"""
+        if self._thread is not None:
+            return
+        self._main_ident = threading.get_ident()
+        self._open_log()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self.heartbeat.start()
+        self._thread = threading.Thread(target=self._watch, name='event-loop-watchdog', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop watching (safe to call more than once)"""
+        self.heartbeat.stop()
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2 * self.interval + 1)
+            self._thread = None
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get a copy of the lag metrics"""
+        with self._lock:
+            return dict(self.metrics)
+
+    def _beat(self):
+        """Heartbeat tick on the GUI thread: record how late it was"""
+        now = time.monotonic()
+        with self._lock:
+            lag_ms = max(0.0, (now - self._last_beat - self.interval) * 1000.0)
+            self._last_beat = now
+            self.metrics['beats'] += 1
+            self.metrics['max_lag_ms'] = max(self.metrics['max_lag_ms'], round(lag_ms, 1))
+            stalled = self._in_stall
+            self._in_stall = False
+            if stalled:
+                self.metrics['last_stall_ms'] = round(lag_ms, 1)
+        if stalled:
+            self._logger.warning("Event loop resumed after %.0f ms", lag_ms)
+
+    def _watch(self):
+        """Watchdog thread: capture the GUI thread stack while it is blocked"""
+        while not self._stop.wait(self.interval / 2):
+            with self._lock:
+                late = time.monotonic() - self._last_beat - self.interval
+                if late < self.threshold or self._in_stall:
+                    continue
+                # One capture per stall; the heartbeat clears the flag when it resumes
+                self._in_stall = True
+                self.metrics['stalls'] += 1
+            self._logger.warning("Event loop stalled for %.0f ms, main thread stack:\n%s",
+                                late * 1000.0, self._main_stack())
+
+    def _main_stack(self) -> str:
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return "  <main thread not found>"
+        return ''.join(traceback.format_stack(frame))
+
+    def _open_log(self):
+        """Dedicated logger writing to the rotating stall log"""
+        if self._handler is None:
+            self._logger = logging.getLogger('kiosk.watchdog')
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            self._handler = RotatingFileHandler(self.log_path, maxBytes=self.max_bytes,
+                                                backupCount=self.backup_count, encoding='utf-8')
+            self._handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(message)s'))
+            self._logger.addHandler(self._handler)
@@ -15,6 +15,9 @@ sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from core.config import ConfigManager
 from core.i18n import I18nManager
+from core.logging_setup import setup_logging
+from core.theme import ThemeManager
+from core.watchdog import EventLoopWatchdog
 from ui.welcome_screen import WelcomeScreen
 from ui.setup_screen import SetupScreen
 from ui.start_screen import StartScreen
@@ -35,6 +38,17 @@ class KioskMainWindow(QMainWindow):
         # Initialize managers
         self.config = ConfigManager()
         self.i18n = I18nManager()
+        self.theme = ThemeManager(self.config)
+        
+        # Install the compiled theme once for the whole application
+        self.theme.apply()
+        
+        # Log the GUI thread stack whenever the event loop stalls
+        self.watchdog = EventLoopWatchdog(
+            threshold_ms=self.config.get_app_setting('stall_threshold_ms', 500),
+            parent=self
+        )
+        self.watchdog.start()
         
         # Create stacked widget for navigation
         self.stacked_widget = QStackedWidget()
@@ -115,6 +129,12 @@ class KioskMainWindow(QMainWindow):
         """Navigate to a specific screen"""
         if screen_name in self.screens:
             screen = self.screens[screen_name]
+            
+            # Let the screen being left release its camera, timers, etc.
+            current = self.stacked_widget.currentWidget()
+            if current is not None and current is not screen and hasattr(current, 'on_exit'):
+                current.on_exit()
+            
             self.stacked_widget.setCurrentWidget(screen)
             
             # Update screen content when entering
@@ -126,6 +146,11 @@ class KioskMainWindow(QMainWindow):
         self.screens['validate'].set_result(result)
         self.goto_screen('validate')
     
+    def closeEvent(self, event):
+        """Stop background watchers before the window goes away"""
+        self.watchdog.stop()
+        super().closeEvent(event)
+    
     def handle_language_change(self, language):
         """Handle language change across all screens"""
         self.i18n.set_language(language)
@@ -137,6 +162,9 @@ class KioskMainWindow(QMainWindow):
 
 
 def main():
+    # Services log through a queue: file I/O never runs on the camera/GUI threads
+    setup_logging()
+    
     app = QApplication(sys.argv)
     
     # Set application font
@@ -2,10 +2,13 @@
 Scale service for weight measurement via serial connection
 """
 
+import logging
 import time
 import random
 from typing import Optional
 
+logger = logging.getLogger(__name__)
+
 
 class ScaleService:
     def __init__(self, port: str = "COM3", baudrate: int = 9600):
@@ -27,12 +30,12 @@ class ScaleService:
                 timeout=1
             )
             self.simulation_mode = False
-            print(f"Connected to scale on {self.port}")
+            logger.info("Connected to scale on %s", self.port)
         except ImportError:
-            print("Warning: pyserial not available, using simulation mode")
+            logger.warning("pyserial not available, using simulation mode")
             self.simulation_mode = True
         except Exception as e:
-            print(f"Could not connect to scale: {e}, using simulation mode")
+            logger.warning("Could not connect to scale on %s: %s, using simulation mode", self.port, e)
             self.simulation_mode = True
     
     def read_weight(self) -> float:
@@ -70,7 +73,7 @@ class ScaleService:
             # Fallback to simulation if reading fails
             return self._simulate_weight()
         except Exception as e:
-            print(f"Error reading from scale: {e}")
+            logger.error("Error reading from scale: %s", e)
             return self._simulate_weight()
     
     def _simulate_weight(self) -> float:
@@ -93,7 +96,7 @@ class ScaleService:
                 response = self.serial_connection.readline().decode('utf-8').strip()
                 return 'OK' in response or 'TARE' in response
         except Exception as e:
-            print(f"Error taring scale: {e}")
+            logger.error("Error taring scale: %s", e)
         
         return False
     
@@ -111,7 +114,7 @@ class ScaleService:
             try:
                 self.serial_connection.close()
             except Exception as e:
-                print(f"Error closing serial connection: {e}")
+                logger.error("Error closing serial connection: %s", e)
             finally:
                 self.serial_connection = None
     
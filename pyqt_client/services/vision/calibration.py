@@ -3,9 +3,12 @@ Camera calibration service for pixel to centimeter conversion
 """
 
 import cv2
+import logging
 import numpy as np
 from typing import Tuple, Optional
 
+logger = logging.getLogger(__name__)
+
 
 class CalibrationService:
     def __init__(self, px_per_cm: float = 10.0, homography_matrix: Optional[np.ndarray] = None):
@@ -62,7 +65,7 @@ class CalibrationService:
             
             return round(width_cm, 1), round(length_cm, 1)
         except Exception as e:
-            print(f"Error in homography conversion: {e}")
+            logger.error("Error in homography conversion: %s", e)
             return self._convert_simple(w, h)
     
     def set_px_per_cm(self, px_per_cm: float):
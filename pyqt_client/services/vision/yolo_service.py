@@ -3,10 +3,13 @@ YOLOv8 object detection service for luggage detection
 """
 
 import cv2
+import logging
 import numpy as np
 from typing import Dict, List, Optional, Tuple
 import os
 
+logger = logging.getLogger(__name__)
+
 
 class YOLOService:
     def __init__(self, model_path: Optional[str] = None):
@@ -24,10 +27,10 @@ class YOLOService:
             from ultralytics import YOLO
             self.model = YOLO(self.model_path)
         except ImportError:
-            print("Warning: ultralytics not available, using simulation mode")
+            logger.warning("ultralytics not available, using simulation mode")
             self.model = None
         except Exception as e:
-            print(f"Error loading YOLO model: {e}")
+            logger.exception("Error loading YOLO model %s", self.model_path)
             self.model = None
     
     def detect(self, frame_bgr: np.ndarray) -> List[Dict]:
@@ -71,7 +74,7 @@ class YOLOService:
             
             return detections
         except Exception as e:
-            print(f"Error in YOLO detection: {e}")
+            logger.error("Error in YOLO detection: %s", e)
             return self._simulate_detection(frame_bgr)
     
     def _simulate_detection(self, frame_bgr: np.ndarray) -> List[Dict]:
@@ -15,12 +15,7 @@ class DemoHotspot(QLabel):
         
         # Setup invisible hotspot
         self.setFixedSize(36, 36)
-        self.setStyleSheet("""
-            QLabel {
-                background-color: transparent;
-                border: none;
-            }
-        """)
+        self.setProperty("role", "hotspot")
         self.setToolTip("Technical area (tap 5 times)")
         
         # Tap counting
@@ -52,7 +47,7 @@ class DemoHotspot(QLabel):
     def activate_demo_mode(self):
         """Activate demo mode and show confirmation"""
         # Import here to avoid circular imports
-        from ..core.demo_manager import demo_manager
+        from core.demo_manager import demo_manager
         
         demo_manager.set_demo_mode(True)
         
@@ -2,12 +2,16 @@
 Free Weighing screen - Scale-only mode for simple weight measurement
 """
 
+import logging
+
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
                              QLabel, QFrame)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont
 from .base_screen import BaseScreen
-from ..services.devices.scale_service import ScaleService
+from services.devices.scale_service import ScaleService
+
+logger = logging.getLogger(__name__)
 
 
 class FreeWeighScreen(BaseScreen):
@@ -40,26 +44,12 @@ class FreeWeighScreen(BaseScreen):
         # Title
         self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet("""
-            QLabel {
-                font-size: 28px;
-                font-weight: bold;
-                color: #1E3F8A;
-                margin-bottom: 40px;
-            }
-        """)
+        self.title_label.setProperty("role", "title")
         
         # Weight display frame
         weight_frame = QFrame()
-        weight_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border: 3px solid #1E3F8A;
-                border-radius: 15px;
-                padding: 60px;
-                margin: 40px;
-            }
-        """)
+        weight_frame.setObjectName("frm_weight")
+        weight_frame.setProperty("role", "card")
         
         weight_layout = QVBoxLayout(weight_frame)
         weight_layout.setAlignment(Qt.AlignCenter)
@@ -67,25 +57,12 @@ class FreeWeighScreen(BaseScreen):
         # Large weight display
         self.weight_display = QLabel("0.0")
         self.weight_display.setAlignment(Qt.AlignCenter)
-        self.weight_display.setStyleSheet("""
-            QLabel {
-                font-size: 120px;
-                font-weight: bold;
-                color: #E20C18;
-                margin-bottom: 20px;
-            }
-        """)
+        self.weight_display.setObjectName("out_weight_free")
         
         # Units label
         self.units_label = QLabel("kg")
         self.units_label.setAlignment(Qt.AlignCenter)
-        self.units_label.setStyleSheet("""
-            QLabel {
-                font-size: 36px;
-                font-weight: bold;
-                color: #1E3F8A;
-            }
-        """)
+        self.units_label.setObjectName("lbl_units_free")
         
         weight_layout.addWidget(self.weight_display)
         weight_layout.addWidget(self.units_label)
@@ -93,13 +70,7 @@ class FreeWeighScreen(BaseScreen):
         # Scale status indicator
         self.status_label = QLabel()
         self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setStyleSheet("""
-            QLabel {
-                font-size: 16px;
-                color: #666;
-                margin-top: 20px;
-            }
-        """)
+        self.status_label.setObjectName("lbl_scale_status")
         
         # Back button
         button_layout = QHBoxLayout()
@@ -107,44 +78,14 @@ class FreeWeighScreen(BaseScreen):
         self.back_button = QPushButton()
         self.back_button.setObjectName("btn_back_free_weigh")
         self.back_button.setFixedSize(150, 60)
-        self.back_button.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-                border: none;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-            QPushButton:pressed {
-                background-color: #495057;
-            }
-        """)
+        self.back_button.setProperty("variant", "muted")
         self.back_button.clicked.connect(self.go_back)
         
         # Tare button (if scale supports it)
         self.tare_button = QPushButton("TARA")
         self.tare_button.setObjectName("btn_tare")
         self.tare_button.setFixedSize(150, 60)
-        self.tare_button.setStyleSheet("""
-            QPushButton {
-                background-color: #17a2b8;
-                color: white;
-                font-size: 18px;
-                font-weight: bold;
-                border: none;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #138496;
-            }
-            QPushButton:pressed {
-                background-color: #0f6674;
-            }
-        """)
+        self.tare_button.setProperty("variant", "info")
         self.tare_button.clicked.connect(self.tare_scale)
         
         button_layout.addStretch()
@@ -182,14 +123,14 @@ class FreeWeighScreen(BaseScreen):
             # Update status
             if self.scale_service.is_connected():
                 self.status_label.setText("Balanza conectada")
-                self.status_label.setStyleSheet(self.status_label.styleSheet() + "color: green;")
+                self.set_state(self.status_label, "connected")
             else:
                 self.status_label.setText("Modo simulación")
-                self.status_label.setStyleSheet(self.status_label.styleSheet() + "color: orange;")
+                self.set_state(self.status_label, "simulated")
                 
         except Exception as e:
             self.status_label.setText(f"Error en balanza: {e}")
-            self.status_label.setStyleSheet(self.status_label.styleSheet() + "color: red;")
+            self.set_state(self.status_label, "error")
             self.weight_display.setText("---")
     
     def update_status(self):
@@ -197,23 +138,11 @@ class FreeWeighScreen(BaseScreen):
         if self.scale_service.is_connected():
             status_text = "Balanza conectada" if self.i18n.get_language() == 'es' else "Scale connected"
             self.status_label.setText(status_text)
-            self.status_label.setStyleSheet("""
-                QLabel {
-                    font-size: 16px;
-                    color: green;
-                    margin-top: 20px;
-                }
-            """)
+            self.set_state(self.status_label, "connected")
         else:
             status_text = "Modo simulación" if self.i18n.get_language() == 'es' else "Simulation mode"
             self.status_label.setText(status_text)
-            self.status_label.setStyleSheet("""
-                QLabel {
-                    font-size: 16px;
-                    color: orange;
-                    margin-top: 20px;
-                }
-            """)
+            self.set_state(self.status_label, "simulated")
     
     def tare_scale(self):
         """Tare (zero) the scale"""
@@ -230,7 +159,7 @@ class FreeWeighScreen(BaseScreen):
                 self.tare_button.setText("ERROR")
                 QTimer.singleShot(1000, lambda: self.tare_button.setText(original_text))
         except Exception as e:
-            print(f"Error during tare: {e}")
+            logger.error("Error during tare: %s", e)
     
     def go_back(self):
         """Handle back button click"""
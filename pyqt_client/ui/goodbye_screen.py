@@ -38,12 +38,7 @@ class GoodbyeScreen(BaseScreen):
         
         # Main content
         main_frame = QFrame()
-        main_frame.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #87CEEB, stop: 1 #4682B4);
-            }
-        """)
+        main_frame.setProperty("role", "hero")
         
         main_layout = QVBoxLayout(main_frame)
         main_layout.setAlignment(Qt.AlignCenter)
@@ -52,36 +47,17 @@ class GoodbyeScreen(BaseScreen):
         self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignCenter)
         self.title_label.setWordWrap(True)
-        self.title_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 32px;
-                font-weight: bold;
-                margin-bottom: 40px;
-                padding: 0 50px;
-            }
-        """)
+        self.title_label.setObjectName("lbl_goodbye_title")
         
         # Countdown message
         self.countdown_label = QLabel()
         self.countdown_label.setAlignment(Qt.AlignCenter)
-        self.countdown_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 18px;
-                margin-bottom: 20px;
-            }
-        """)
+        self.countdown_label.setObjectName("lbl_countdown")
         
         # Progress indicator (simple text)
         self.progress_label = QLabel("●●●")
         self.progress_label.setAlignment(Qt.AlignCenter)
-        self.progress_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 24px;
-            }
-        """)
+        self.progress_label.setObjectName("lbl_progress")
         
         main_layout.addWidget(self.title_label)
         main_layout.addWidget(self.countdown_label)
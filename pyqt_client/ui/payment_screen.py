@@ -6,8 +6,11 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
                              QLabel, QFrame)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from .base_screen import BaseScreen
+import logging
 import random
 
+logger = logging.getLogger(__name__)
+
 
 class PaymentScreen(BaseScreen):
     finish_clicked = pyqtSignal()
@@ -36,51 +39,24 @@ class PaymentScreen(BaseScreen):
         
         # Title
         self.title_label = QLabel()
-        self.title_label.setStyleSheet("""
-            QLabel {
-                font-size: 28px;
-                font-weight: bold;
-                color: #1E3F8A;
-                margin-bottom: 30px;
-            }
-        """)
+        self.title_label.setProperty("role", "title")
         
         # Payment status card
         self.status_frame = QFrame()
-        self.status_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 40px;
-                margin: 20px;
-            }
-        """)
+        self.status_frame.setObjectName("frm_payment_status")
+        self.status_frame.setProperty("role", "card")
         
         status_layout = QVBoxLayout(self.status_frame)
         
         # Status message
         self.status_label = QLabel()
         self.status_label.setAlignment(Qt.AlignCenter)
-        self.status_label.setStyleSheet("""
-            QLabel {
-                font-size: 24px;
-                font-weight: bold;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 30px;
-            }
-        """)
+        self.status_label.setObjectName("lbl_payment_status")
         
         # Processing message
         self.processing_label = QLabel("Procesando pago...")
         self.processing_label.setAlignment(Qt.AlignCenter)
-        self.processing_label.setStyleSheet("""
-            QLabel {
-                font-size: 18px;
-                color: #666;
-                margin-bottom: 20px;
-            }
-        """)
+        self.processing_label.setObjectName("lbl_processing")
         
         status_layout.addWidget(self.status_label)
         status_layout.addWidget(self.processing_label)
@@ -90,38 +66,30 @@ class PaymentScreen(BaseScreen):
         
         self.print_receipt_button = QPushButton()
         self.print_receipt_button.setObjectName("btn_print_receipt")
-        self.print_receipt_button.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                font-size: 16px;
-                padding: 12px 24px;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
+        self.print_receipt_button.setProperty("variant", "muted")
         self.print_receipt_button.clicked.connect(self.print_receipt)
         self.print_receipt_button.hide()
         
         self.finish_button = QPushButton()
         self.finish_button.setObjectName("btn_finish_payment")
-        self.finish_button.setStyleSheet("""
-            QPushButton {
-                background-color: #28a745;
-                color: white;
-                font-size: 18px;
-                padding: 15px 30px;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #218838;
-            }
-        """)
+        self.finish_button.setProperty("variant", "success")
+        self.finish_button.setProperty("size", "large")
         self.finish_button.clicked.connect(self.finish_clicked.emit)
         self.finish_button.hide()
         
+        # Buttons are laid out once; results only toggle their visibility
+        self.button_layout.addWidget(self.print_receipt_button)
+        self.button_layout.addStretch()
+        self.button_layout.addWidget(self.finish_button)
+        
+        # Simulated payment processing delays
+        self.payment_timer = QTimer()
+        self.payment_timer.setSingleShot(True)
+        self.payment_timer.timeout.connect(self.payment_completed)
+        self.finish_timer = QTimer()
+        self.finish_timer.setSingleShot(True)
+        self.finish_timer.timeout.connect(self.show_finish_button)
+        
         status_layout.addLayout(self.button_layout)
         
         # Add to main layout
@@ -142,14 +110,15 @@ class PaymentScreen(BaseScreen):
         self.payment_processed = False
         self.processing_label.show()
         self.status_label.setText("Procesando pago...")
-        self.status_label.setStyleSheet(self.status_label.styleSheet() + "background-color: #ffc107; color: black;")
+        self.set_state(self.status_label, "processing")
         
         # Hide buttons
         self.print_receipt_button.hide()
         self.finish_button.hide()
         
         # Simulate payment processing delay
-        QTimer.singleShot(3000, self.payment_completed)
+        self.finish_timer.stop()
+        self.payment_timer.start(3000)
     
     def payment_completed(self):
         """Handle payment completion"""
@@ -160,33 +129,27 @@ class PaymentScreen(BaseScreen):
         
         if self.payment_approved:
             self.status_label.setText(self.i18n.t('payment.approved'))
-            self.status_label.setStyleSheet(self.status_label.styleSheet() + "background-color: #28a745; color: white;")
+            self.set_state(self.status_label, "approved")
             
             # Show buttons
-            self.button_layout.addWidget(self.print_receipt_button)
-            self.button_layout.addStretch()
-            self.button_layout.addWidget(self.finish_button)
-            
             self.print_receipt_button.show()
             self.finish_button.show()
         else:
             self.status_label.setText(self.i18n.t('payment.declined'))
-            self.status_label.setStyleSheet(self.status_label.styleSheet() + "background-color: #dc3545; color: white;")
+            self.set_state(self.status_label, "declined")
             
             # For declined payments, you might want to add retry options
             # For now, we'll just show a finish button after a delay
-            QTimer.singleShot(3000, self.show_finish_button)
+            self.finish_timer.start(3000)
     
     def show_finish_button(self):
         """Show finish button for declined payments"""
-        self.button_layout.addStretch()
-        self.button_layout.addWidget(self.finish_button)
         self.finish_button.show()
     
     def print_receipt(self):
         """Handle receipt printing (stub)"""
         # This is a stub for POS integration
-        print("Printing receipt...")
+        logger.info("Printing receipt")
         
         # In a real implementation, this would interface with a POS printer
         # For now, we'll just show a message
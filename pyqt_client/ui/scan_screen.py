@@ -7,11 +7,14 @@ from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer, QThread, pyqtSlot
 from PyQt5.QtGui import QPixmap, QImage, QPainter, QPen, QColor
 import cv2
+import logging
 import numpy as np
 from .base_screen import BaseScreen
-from ..services.vision.yolo_service import YOLOService
-from ..services.vision.calibration import CalibrationService
-from ..services.devices.scale_service import ScaleService
+from services.vision.yolo_service import YOLOService
+from services.vision.calibration import CalibrationService
+from services.devices.scale_service import ScaleService
+
+logger = logging.getLogger(__name__)
 
 
 class CameraThread(QThread):
@@ -28,11 +31,12 @@ class CameraThread(QThread):
             self.camera = cv2.VideoCapture(0)
             if not self.camera.isOpened():
                 # Use a dummy frame if no camera available
+                logger.warning("Camera not available, using simulated frames")
                 self.camera = None
             self.running = True
             self.start()
         except Exception as e:
-            print(f"Error starting camera: {e}")
+            logger.error("Error starting camera: %s", e)
             self.camera = None
             self.running = True
             self.start()
@@ -125,20 +129,13 @@ class ScanScreen(BaseScreen):
         self.camera_label = QLabel()
         self.camera_label.setObjectName("cam_view")
         self.camera_label.setFixedSize(800, 600)
-        self.camera_label.setStyleSheet("""
-            QLabel {
-                border: 2px solid #1E3F8A;
-                border-radius: 10px;
-                background-color: black;
-            }
-        """)
         self.camera_label.setScaledContents(True)
         
         # Hidden setup hotspot (top-left corner)
         self.hidden_setup = QLabel()
         self.hidden_setup.setObjectName("hidden_area_setup")
         self.hidden_setup.setFixedSize(60, 60)
-        self.hidden_setup.setStyleSheet("background-color: transparent;")
+        self.hidden_setup.setProperty("role", "hotspot")
         self.hidden_setup.mousePressEvent = self.hidden_setup_clicked
         
         # Buttons
@@ -150,50 +147,20 @@ class ScanScreen(BaseScreen):
         
         self.free_weigh_button = QPushButton()
         self.free_weigh_button.setObjectName("btn_free_weigh")
-        self.free_weigh_button.setStyleSheet("""
-            QPushButton {
-                background-color: #17a2b8;
-                color: white;
-                font-size: 16px;
-                padding: 12px 24px;
-            }
-            QPushButton:hover {
-                background-color: #138496;
-            }
-        """)
+        self.free_weigh_button.setProperty("variant", "info")
         self.free_weigh_button.clicked.connect(self.go_free_weigh)
         
         # Demo weight button (only visible in demo mode)
         self.demo_weight_button = QPushButton()
         self.demo_weight_button.setObjectName("btn_demo_weight")
-        self.demo_weight_button.setStyleSheet("""
-            QPushButton {
-                background-color: #ffc107;
-                color: black;
-                font-size: 16px;
-                padding: 12px 24px;
-                margin-left: 8px;
-            }
-            QPushButton:hover {
-                background-color: #e0a800;
-            }
-        """)
+        self.demo_weight_button.setProperty("variant", "warning")
         self.demo_weight_button.clicked.connect(self.show_demo_weight_dialog)
         self.demo_weight_button.hide()  # Hidden by default
         
         self.continue_button = QPushButton()
         self.continue_button.setObjectName("btn_continue_scan")
-        self.continue_button.setStyleSheet("""
-            QPushButton {
-                background-color: #1E3F8A;
-                color: white;
-                font-size: 18px;
-                padding: 15px 30px;
-            }
-            QPushButton:hover {
-                background-color: #2D4F9A;
-            }
-        """)
+        self.continue_button.setProperty("variant", "primary")
+        self.continue_button.setProperty("size", "large")
         self.continue_button.clicked.connect(self.process_scan)
         
         button_layout.addWidget(self.back_button)
@@ -209,26 +176,14 @@ class ScanScreen(BaseScreen):
         # Right side - Bag data
         data_frame = QFrame()
         data_frame.setFixedWidth(300)
-        data_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 20px;
-            }
-        """)
+        data_frame.setObjectName("frm_bagdata")
+        data_frame.setProperty("role", "card")
         
         data_layout = QVBoxLayout(data_frame)
         
         # Title
         self.bagdata_title = QLabel()
         self.bagdata_title.setObjectName("lbl_bagdata_title")
-        self.bagdata_title.setStyleSheet("""
-            QLabel {
-                font-size: 18px;
-                font-weight: bold;
-                margin-bottom: 20px;
-            }
-        """)
         
         # Measurements grid
         measurements_grid = QGridLayout()
@@ -238,26 +193,26 @@ class ScanScreen(BaseScreen):
         self.width_label.setObjectName("lbl_width")
         self.width_value = QLabel("0.0")
         self.width_value.setObjectName("out_width_cm")
-        self.width_value.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self.width_value.setProperty("role", "value")
         
         # Length
         self.length_label = QLabel()
         self.length_label.setObjectName("lbl_length")
         self.length_value = QLabel("0.0")
         self.length_value.setObjectName("out_length_cm")
-        self.length_value.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self.length_value.setProperty("role", "value")
         
         # Weight
         self.weight_label = QLabel()
         self.weight_label.setObjectName("lbl_weight")
         self.weight_value = QLabel("0.0")
         self.weight_value.setObjectName("out_weight_kg")
-        self.weight_value.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self.weight_value.setProperty("role", "value")
         
         # Calibration status
         self.calibration_label = QLabel()
         self.calibration_status = QLabel()
-        self.calibration_status.setStyleSheet("color: green; font-weight: bold;")
+        self.calibration_status.setObjectName("lbl_calibration_status")
         
         # Add to grid
         measurements_grid.addWidget(self.width_label, 0, 0)
@@ -271,7 +226,7 @@ class ScanScreen(BaseScreen):
         
         # Last demo weight display (only visible when demo weight has been set)
         self.last_weight_label = QLabel()
-        self.last_weight_label.setStyleSheet("color: #ffc107; font-weight: bold; margin-top: 15px;")
+        self.last_weight_label.setObjectName("lbl_last_weight")
         self.last_weight_label.hide()
         
         data_layout.addWidget(self.bagdata_title)
@@ -294,7 +249,7 @@ class ScanScreen(BaseScreen):
     
     def update_demo_mode_ui(self):
         """Update UI elements based on demo mode status"""
-        from ..core.demo_manager import demo_manager
+        from core.demo_manager import demo_manager
         
         is_demo_mode = demo_manager.get_demo_mode()
         self.demo_weight_button.setVisible(is_demo_mode)
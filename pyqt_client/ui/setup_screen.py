@@ -36,24 +36,11 @@ class SetupScreen(BaseScreen):
         
         # Title
         self.title_label = QLabel()
-        self.title_label.setStyleSheet("""
-            QLabel {
-                font-size: 28px;
-                font-weight: bold;
-                color: #1E3F8A;
-                margin-bottom: 30px;
-            }
-        """)
+        self.title_label.setProperty("role", "title")
         
         # Form
         form_frame = QFrame()
-        form_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 20px;
-            }
-        """)
+        form_frame.setProperty("role", "card")
         
         form_layout = QFormLayout(form_frame)
         form_layout.setSpacing(20)
@@ -104,17 +91,8 @@ class SetupScreen(BaseScreen):
         
         self.save_button = QPushButton()
         self.save_button.setObjectName("btn_save_setup")
-        self.save_button.setStyleSheet("""
-            QPushButton {
-                background-color: #1E3F8A;
-                color: white;
-                font-size: 18px;
-                padding: 15px 30px;
-            }
-            QPushButton:hover {
-                background-color: #2D4F9A;
-            }
-        """)
+        self.save_button.setProperty("variant", "primary")
+        self.save_button.setProperty("size", "large")
         self.save_button.clicked.connect(self.save_setup)
         
         self.back_button = QPushButton()
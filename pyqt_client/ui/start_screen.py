@@ -47,7 +47,7 @@ class StartScreen(BaseScreen):
         self.hidden_setup_right = QLabel()
         self.hidden_setup_right.setObjectName("hidden_area_setup_right")
         self.hidden_setup_right.setFixedSize(60, 60)
-        self.hidden_setup_right.setStyleSheet("background-color: transparent;")
+        self.hidden_setup_right.setProperty("role", "hotspot")
         self.hidden_setup_right.mousePressEvent = self.hidden_setup_right_clicked
         
         lang_layout.addStretch()
@@ -62,12 +62,7 @@ class StartScreen(BaseScreen):
         
         # Main content
         main_frame = QFrame()
-        main_frame.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #87CEEB, stop: 1 #4682B4);
-            }
-        """)
+        main_frame.setProperty("role", "hero")
         
         main_layout = QVBoxLayout(main_frame)
         main_layout.setAlignment(Qt.AlignCenter)
@@ -76,41 +71,21 @@ class StartScreen(BaseScreen):
         self.hidden_setup = QLabel()
         self.hidden_setup.setObjectName("hidden_area_setup")
         self.hidden_setup.setFixedSize(60, 60)
-        self.hidden_setup.setStyleSheet("background-color: transparent;")
+        self.hidden_setup.setProperty("role", "hotspot")
         self.hidden_setup.mousePressEvent = self.hidden_setup_clicked
         
         # Title
         self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 48px;
-                font-weight: bold;
-                margin-bottom: 40px;
-            }
-        """)
+        self.title_label.setObjectName("lbl_start_title")
+        self.title_label.setProperty("role", "hero_title")
         
         # Start scan button
         self.go_scan_button = QPushButton()
         self.go_scan_button.setObjectName("btn_go_scan")
         self.go_scan_button.setFixedSize(300, 80)
-        self.go_scan_button.setStyleSheet("""
-            QPushButton {
-                background-color: #E20C18;
-                color: white;
-                font-size: 24px;
-                font-weight: bold;
-                border: none;
-                border-radius: 10px;
-            }
-            QPushButton:hover {
-                background-color: #C70A15;
-            }
-            QPushButton:pressed {
-                background-color: #A00812;
-            }
-        """)
+        self.go_scan_button.setProperty("variant", "accent")
+        self.go_scan_button.setProperty("size", "hero")
         self.go_scan_button.clicked.connect(self.go_scan_clicked.emit)
         
         # Position hidden setup area at top-left
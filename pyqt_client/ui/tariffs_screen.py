@@ -36,24 +36,12 @@ class TariffsScreen(BaseScreen):
         
         # Title
         self.title_label = QLabel()
-        self.title_label.setStyleSheet("""
-            QLabel {
-                font-size: 28px;
-                font-weight: bold;
-                color: #1E3F8A;
-                margin-bottom: 30px;
-            }
-        """)
+        self.title_label.setProperty("role", "title")
         
         # Pricing breakdown
         self.pricing_frame = QFrame()
-        self.pricing_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 30px;
-            }
-        """)
+        self.pricing_frame.setObjectName("frm_pricing")
+        self.pricing_frame.setProperty("role", "card")
         
         pricing_layout = QVBoxLayout(self.pricing_frame)
         
@@ -63,24 +51,19 @@ class TariffsScreen(BaseScreen):
         # Oversize fee
         self.oversize_label = QLabel()
         self.oversize_value = QLabel("$0.00")
-        self.oversize_value.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self.oversize_value.setObjectName("out_oversize")
+        self.oversize_value.setProperty("role", "value")
         
         # Overweight fee
         self.overweight_label = QLabel()
         self.overweight_value = QLabel("$0.00")
-        self.overweight_value.setStyleSheet("font-weight: bold; font-size: 16px;")
+        self.overweight_value.setObjectName("out_overweight")
+        self.overweight_value.setProperty("role", "value")
         
         # Total
         self.total_label = QLabel()
         self.total_value = QLabel("$0.00")
-        self.total_value.setStyleSheet("""
-            font-weight: bold; 
-            font-size: 20px; 
-            color: #E20C18;
-            border-top: 2px solid #1E3F8A;
-            padding-top: 10px;
-            margin-top: 10px;
-        """)
+        self.total_value.setObjectName("out_total")
         
         # Add to grid
         self.pricing_grid.addWidget(self.oversize_label, 0, 0)
@@ -101,18 +84,8 @@ class TariffsScreen(BaseScreen):
         
         self.pay_button = QPushButton()
         self.pay_button.setObjectName("btn_pay")
-        self.pay_button.setStyleSheet("""
-            QPushButton {
-                background-color: #E20C18;
-                color: white;
-                font-size: 18px;
-                padding: 15px 30px;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #C70A15;
-            }
-        """)
+        self.pay_button.setProperty("variant", "accent")
+        self.pay_button.setProperty("size", "large")
         self.pay_button.clicked.connect(self.pay_clicked.emit)
         
         button_layout.addWidget(self.back_button)
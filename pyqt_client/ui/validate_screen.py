@@ -37,14 +37,8 @@ class ValidateScreen(BaseScreen):
         
         # Result card
         self.result_frame = QFrame()
-        self.result_frame.setStyleSheet("""
-            QFrame {
-                background-color: white;
-                border-radius: 10px;
-                padding: 30px;
-                margin: 20px;
-            }
-        """)
+        self.result_frame.setObjectName("frm_result")
+        self.result_frame.setProperty("role", "card")
         
         result_layout = QVBoxLayout(self.result_frame)
         
@@ -52,52 +46,18 @@ class ValidateScreen(BaseScreen):
         self.result_label = QLabel()
         self.result_label.setObjectName("lbl_result")
         self.result_label.setAlignment(Qt.AlignCenter)
-        self.result_label.setStyleSheet("""
-            QLabel {
-                font-size: 32px;
-                font-weight: bold;
-                padding: 20px;
-                border-radius: 10px;
-                margin-bottom: 20px;
-            }
-        """)
         
         # Result message
         self.message_label = QLabel()
         self.message_label.setAlignment(Qt.AlignCenter)
-        self.message_label.setStyleSheet("""
-            QLabel {
-                font-size: 18px;
-                margin-bottom: 20px;
-            }
-        """)
+        self.message_label.setObjectName("lbl_message")
         
         # Reasons list (for failures)
         self.reasons_label = QLabel()
         self.reasons_label.setObjectName("lbl_reasons")
-        self.reasons_label.setStyleSheet("""
-            QLabel {
-                font-size: 16px;
-                font-weight: bold;
-                margin-bottom: 10px;
-            }
-        """)
         
         self.reasons_list = QListWidget()
-        self.reasons_list.setStyleSheet("""
-            QListWidget {
-                border: 1px solid #ccc;
-                border-radius: 5px;
-                background-color: #f9f9f9;
-                padding: 10px;
-                margin-bottom: 20px;
-            }
-            QListWidgetItem {
-                color: #E20C18;
-                font-weight: bold;
-                padding: 5px;
-            }
-        """)
+        self.reasons_list.setObjectName("lst_reasons")
         
         result_layout.addWidget(self.result_label)
         result_layout.addWidget(self.message_label)
@@ -109,36 +69,24 @@ class ValidateScreen(BaseScreen):
         
         self.continue_ok_button = QPushButton()
         self.continue_ok_button.setObjectName("btn_continue_validate_ok")
-        self.continue_ok_button.setStyleSheet("""
-            QPushButton {
-                background-color: #28a745;
-                color: white;
-                font-size: 18px;
-                padding: 15px 30px;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #218838;
-            }
-        """)
+        self.continue_ok_button.setProperty("variant", "success")
+        self.continue_ok_button.setProperty("size", "large")
         self.continue_ok_button.clicked.connect(self.continue_ok_clicked.emit)
         
         self.continue_to_payment_button = QPushButton()
         self.continue_to_payment_button.setObjectName("btn_continue_to_payment")
-        self.continue_to_payment_button.setStyleSheet("""
-            QPushButton {
-                background-color: #E20C18;
-                color: white;
-                font-size: 18px;
-                padding: 15px 30px;
-                border-radius: 8px;
-            }
-            QPushButton:hover {
-                background-color: #C70A15;
-            }
-        """)
+        self.continue_to_payment_button.setProperty("variant", "accent")
+        self.continue_to_payment_button.setProperty("size", "large")
         self.continue_to_payment_button.clicked.connect(self.continue_to_payment_clicked.emit)
         
+        # Both buttons live in the layout; update_display only toggles visibility
+        self.button_layout.addStretch()
+        self.button_layout.addWidget(self.continue_ok_button)
+        self.button_layout.addWidget(self.continue_to_payment_button)
+        self.button_layout.addStretch()
+        self.continue_ok_button.hide()
+        self.continue_to_payment_button.hide()
+        
         result_layout.addLayout(self.button_layout)
         
         # Add to main layout
@@ -199,14 +147,10 @@ class ValidateScreen(BaseScreen):
         if not self.validation_result:
             return
         
-        # Clear button layout
-        for i in reversed(range(self.button_layout.count())):
-            self.button_layout.itemAt(i).widget().setParent(None)
-        
         if self.validation_result['compliant']:
             # Show OK result
             self.result_label.setText(self.i18n.t('validate.ok'))
-            self.result_label.setStyleSheet(self.result_label.styleSheet() + "background-color: #28a745; color: white;")
+            self.set_state(self.result_label, "ok")
             self.message_label.setText(self.i18n.t('validate.ok_message'))
             
             # Hide reasons
@@ -214,14 +158,13 @@ class ValidateScreen(BaseScreen):
             self.reasons_list.hide()
             
             # Show continue button
-            self.button_layout.addStretch()
-            self.button_layout.addWidget(self.continue_ok_button)
-            self.button_layout.addStretch()
+            self.continue_to_payment_button.hide()
+            self.continue_ok_button.show()
             
         else:
             # Show FAIL result
             self.result_label.setText(self.i18n.t('validate.fail'))
-            self.result_label.setStyleSheet(self.result_label.styleSheet() + "background-color: #E20C18; color: white;")
+            self.set_state(self.result_label, "fail")
             self.message_label.setText("")
             
             # Show reasons
@@ -234,9 +177,8 @@ class ValidateScreen(BaseScreen):
                 self.reasons_list.addItem(item)
             
             # Show payment button
-            self.button_layout.addStretch()
-            self.button_layout.addWidget(self.continue_to_payment_button)
-            self.button_layout.addStretch()
+            self.continue_ok_button.hide()
+            self.continue_to_payment_button.show()
         
         self.update_texts()
     
@@ -38,26 +38,11 @@ class WeightDemoDialog(QDialog):
         # Title
         self.title_label = QLabel()
         self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet("""
-            QLabel {
-                font-size: 20px;
-                font-weight: bold;
-                color: #1E3F8A;
-                margin-bottom: 20px;
-            }
-        """)
+        self.title_label.setObjectName("lbl_demo_weight_title")
         
         # Weight display frame
         weight_frame = QFrame()
-        weight_frame.setStyleSheet("""
-            QFrame {
-                background-color: #f8f9fa;
-                border: 2px solid #1E3F8A;
-                border-radius: 10px;
-                padding: 20px;
-                margin: 10px 0;
-            }
-        """)
+        weight_frame.setObjectName("frm_demo_weight")
         
         weight_layout = QVBoxLayout(weight_frame)
         weight_layout.setAlignment(Qt.AlignCenter)
@@ -65,24 +50,12 @@ class WeightDemoDialog(QDialog):
         # Large weight display
         self.weight_display = QLabel("0.0")
         self.weight_display.setAlignment(Qt.AlignCenter)
-        self.weight_display.setStyleSheet("""
-            QLabel {
-                font-size: 48px;
-                font-weight: bold;
-                color: #E20C18;
-                margin: 10px 0;
-            }
-        """)
+        self.weight_display.setObjectName("out_demo_weight")
         
         # Units label
         self.units_label = QLabel("kg")
         self.units_label.setAlignment(Qt.AlignCenter)
-        self.units_label.setStyleSheet("""
-            QLabel {
-                font-size: 18px;
-                color: #666;
-            }
-        """)
+        self.units_label.setObjectName("lbl_demo_units")
         
         weight_layout.addWidget(self.weight_display)
         weight_layout.addWidget(self.units_label)
@@ -95,23 +68,7 @@ class WeightDemoDialog(QDialog):
         self.read_button = QPushButton()
         self.read_button.setObjectName("btn_read_weight")
         self.read_button.setFixedHeight(50)
-        self.read_button.setStyleSheet("""
-            QPushButton {
-                background-color: #17a2b8;
-                color: white;
-                font-size: 16px;
-                font-weight: bold;
-                border: none;
-                border-radius: 8px;
-                padding: 10px;
-            }
-            QPushButton:hover {
-                background-color: #138496;
-            }
-            QPushButton:pressed {
-                background-color: #0f6674;
-            }
-        """)
+        self.read_button.setProperty("variant", "info")
         self.read_button.clicked.connect(self.read_weight)
         
         # Bottom buttons row
@@ -121,39 +78,14 @@ class WeightDemoDialog(QDialog):
         self.cancel_button = QPushButton()
         self.cancel_button.setObjectName("btn_cancel_weight")
         self.cancel_button.setFixedHeight(45)
-        self.cancel_button.setStyleSheet("""
-            QPushButton {
-                background-color: #6c757d;
-                color: white;
-                font-size: 14px;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #5a6268;
-            }
-        """)
+        self.cancel_button.setProperty("variant", "muted")
         self.cancel_button.clicked.connect(self.reject)
         
         # Set weight button
         self.set_button = QPushButton()
         self.set_button.setObjectName("btn_set_weight")
         self.set_button.setFixedHeight(45)
-        self.set_button.setStyleSheet("""
-            QPushButton {
-                background-color: #28a745;
-                color: white;
-                font-size: 14px;
-                font-weight: bold;
-                border: none;
-                border-radius: 6px;
-                padding: 8px 16px;
-            }
-            QPushButton:hover {
-                background-color: #218838;
-            }
-        """)
+        self.set_button.setProperty("variant", "success")
         self.set_button.clicked.connect(self.set_weight)
         
         bottom_buttons.addWidget(self.cancel_button)
@@ -35,12 +35,7 @@ class WelcomeScreen(BaseScreen):
         
         # Main content
         main_frame = QFrame()
-        main_frame.setStyleSheet("""
-            QFrame {
-                background: qlineargradient(x1: 0, y1: 0, x2: 1, y2: 1,
-                    stop: 0 #87CEEB, stop: 1 #4682B4);
-            }
-        """)
+        main_frame.setProperty("role", "hero")
         
         main_layout = QVBoxLayout(main_frame)
         main_layout.setAlignment(Qt.AlignCenter)
@@ -48,46 +43,19 @@ class WelcomeScreen(BaseScreen):
         # Title
         self.title_label = QLabel("JetSMART")
         self.title_label.setAlignment(Qt.AlignCenter)
-        self.title_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 48px;
-                font-weight: bold;
-                margin-bottom: 20px;
-            }
-        """)
+        self.title_label.setProperty("role", "hero_title")
         
         # Subtitle
         self.subtitle_label = QLabel()
         self.subtitle_label.setAlignment(Qt.AlignCenter)
-        self.subtitle_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-size: 24px;
-                margin-bottom: 40px;
-            }
-        """)
+        self.subtitle_label.setObjectName("lbl_subtitle")
         
         # Start button
         self.start_button = QPushButton()
         self.start_button.setObjectName("btn_start")
         self.start_button.setFixedSize(200, 80)
-        self.start_button.setStyleSheet("""
-            QPushButton {
-                background-color: #E20C18;
-                color: white;
-                font-size: 24px;
-                font-weight: bold;
-                border: none;
-                border-radius: 10px;
-            }
-            QPushButton:hover {
-                background-color: #C70A15;
-            }
-            QPushButton:pressed {
-                background-color: #A00812;
-            }
-        """)
+        self.start_button.setProperty("variant", "accent")
+        self.start_button.setProperty("size", "hero")
         self.start_button.clicked.connect(self.start_clicked.emit)
         
         main_layout.addWidget(self.title_label)
@@ -3,7 +3,8 @@ from pathlib import Path
 from PyQt5 import QtCore, QtGui, QtWidgets
 
 from i18n import STRINGS
-from services import config_service
+from services import config_service, log_service, theme_service
+from services.navigation import RouteStack, RouteSnapshot, SESSION_ROUTES
 
 BASE = Path(__file__).resolve().parent
 ASSETS = BASE / "assets" / "ui"
@@ -71,23 +72,14 @@ class MainWindow(QtWidgets.QMainWindow):
         }
 
         self.instances = {}
-        self.history = []
+        self.history = RouteStack()
+        self.current = None  # RouteSnapshot de la pantalla visible
         self.navigate("inicio")
         self.apply_styles()
 
     def apply_styles(self):
-        self.setStyleSheet(
-            """
-            QWidget { font-family: 'Segoe UI', sans-serif; font-size: 16px; }
-            QPushButton { padding: 12px 16px; border-radius: 18px; }
-            .Primary { color: #1E3F8A; border: 2px solid #1E3F8A; background: #fff; }
-            .Primary:hover { background: #F2F5FF; }
-            .Secondary { color: #fff; background: #1E3F8A; }
-            .Danger { color: #fff; background: #E51937; }
-            .Card { background: #fff; border-radius: 20px; }
-            .Shadow { box-shadow: 0px 12px 30px rgba(0,0,0,0.1); }
-            """
-        )
+        # Una sola hoja de estilos para toda la app, compilada desde theme.json
+        theme_service.apply_theme(QtWidgets.QApplication.instance())
 
     def set_language(self, lang: str):
         self.lang = lang
@@ -97,8 +89,12 @@ class MainWindow(QtWidgets.QMainWindow):
     def navigate(self, route: str, payload: dict = None, push_history: bool = True):
         if route not in self.routes:
             return
-        if push_history and self.stack.currentWidget():
-            self.history.append(self.stack.currentWidget())
+        payload = payload or {}
+        if route in SESSION_ROUTES:
+            # nueva sesión de pasajero: el historial anterior ya no aplica
+            self.history.clear()
+        elif push_history and self.current is not None:
+            self.history.push(self.current.route, self.current.payload)
         if route not in self.instances:
             widget = self.routes[route](self)
             self.instances[route] = widget
@@ -106,14 +102,16 @@ class MainWindow(QtWidgets.QMainWindow):
             self.stack.addWidget(widget)
         else:
             widget = self.instances[route]
-        widget.on_enter(payload or {})
+        widget.on_enter(payload)
         widget.set_strings(self.lang)
         self.stack.setCurrentWidget(widget)
+        self.current = RouteSnapshot(route, dict(payload))
 
     def handle_back(self):
-        if self.history:
-            w = self.history.pop()
-            self.stack.setCurrentWidget(w)
+        snap = self.history.pop()
+        if snap is not None:
+            # se re-entra con el payload guardado para restaurar el estado
+            self.navigate(snap.route, snap.payload, push_history=False)
         else:
             # desde inicio ignoramos
             pass
@@ -134,6 +132,7 @@ def bootstrap_configs():
 
 
 def main():
+    log_service.setup_logging()
     bootstrap_configs()
     app = QtWidgets.QApplication(sys.argv)
     win = MainWindow(); win.show()
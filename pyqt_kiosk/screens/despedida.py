@@ -1,5 +1,5 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card
+from widgets.common import Card
 
 
 class PantallaDespedida(QtWidgets.QWidget):
@@ -12,7 +12,7 @@ class PantallaDespedida(QtWidgets.QWidget):
         cv = QtWidgets.QVBoxLayout(card); cv.setContentsMargins(24,24,24,24)
 
         self.title = QtWidgets.QLabel("¡Buen viaje!")
-        self.title.setStyleSheet("font-size:48px;font-weight:900;color:#1E3F8A;")
+        self.title.setObjectName("FarewellTitle")
         self.title.setAlignment(QtCore.Qt.AlignCenter)
         self.subtitle = QtWidgets.QLabel("Gracias por usar el kiosco.")
         self.subtitle.setAlignment(QtCore.Qt.AlignCenter)
@@ -1,5 +1,5 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card, PrimaryButton
+from widgets.common import Card, PrimaryButton
 
 
 class PantallaDetalleNoCumple(QtWidgets.QWidget):
@@ -11,7 +11,7 @@ class PantallaDetalleNoCumple(QtWidgets.QWidget):
         card = Card(); card.setMaximumSize(900,620)
         cv = QtWidgets.QVBoxLayout(card); cv.setContentsMargins(24,24,24,24)
 
-        self.title = QtWidgets.QLabel("¿Por qué no cumple?"); self.title.setStyleSheet("font-size:24px;font-weight:800;color:#1E3F8A")
+        self.title = QtWidgets.QLabel("¿Por qué no cumple?"); self.title.setObjectName("ScreenTitle")
         cv.addWidget(self.title)
         self.txt = QtWidgets.QTextEdit(); self.txt.setReadOnly(True)
         cv.addWidget(self.txt, 1)
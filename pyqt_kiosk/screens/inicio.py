@@ -29,7 +29,7 @@ class PantallaInicio(QtWidgets.QWidget):
         toprow.addStretch(1)
         self.btnHidden = QtWidgets.QPushButton("")
         self.btnHidden.setFixedSize(80, 56)
-        self.btnHidden.setStyleSheet("background:transparent;border:none;")
+        self.btnHidden.setObjectName("Hotspot")
         self.btnHidden.clicked.connect(self._hidden_tap)
         toprow.addWidget(self.btnHidden, 0, QtCore.Qt.AlignRight)
         cv.addLayout(toprow)
@@ -37,7 +37,7 @@ class PantallaInicio(QtWidgets.QWidget):
         # Hero placeholder
         hero = QtWidgets.QLabel()
         hero.setFixedHeight(260)
-        hero.setStyleSheet("border-radius:16px;background:#e9eef7;")
+        hero.setObjectName("Hero")
         hero.setAlignment(QtCore.Qt.AlignCenter)
         hero.setText("HERO JETSMART")
         cv.addWidget(hero)
@@ -46,7 +46,7 @@ class PantallaInicio(QtWidgets.QWidget):
         badge = QtWidgets.QLabel()
         badge.setFixedSize(120, 120)
         badge.setAlignment(QtCore.Qt.AlignCenter)
-        badge.setStyleSheet("background:#fff;border:2px solid #eef2ff;border-radius:60px;margin-top:-60px;")
+        badge.setObjectName("Badge")
         badge.setText("LOGO")
         cv.addWidget(badge, 0, QtCore.Qt.AlignHCenter)
 
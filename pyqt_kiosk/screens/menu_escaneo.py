@@ -1,6 +1,6 @@
 from PyQt5 import QtCore, QtWidgets
-from ..i18n import STRINGS
-from ..widgets.common import Card, PrimaryButton, SecondaryButton
+from i18n import STRINGS
+from widgets.common import Card, PrimaryButton, SecondaryButton
 
 
 class PantallaMenuEscaneo(QtWidgets.QWidget):
@@ -10,7 +10,7 @@ class PantallaMenuEscaneo(QtWidgets.QWidget):
         v = QtWidgets.QVBoxLayout(self); v.setContentsMargins(24,24,24,24)
         card = Card(); card.setMaximumSize(900,620)
         cv = QtWidgets.QVBoxLayout(card); cv.setContentsMargins(24,24,24,24)
-        title = QtWidgets.QLabel("Validación de equipaje"); title.setStyleSheet("font-weight:800;font-size:22px;color:#1E3F8A")
+        title = QtWidgets.QLabel("Validación de equipaje"); title.setObjectName("ScreenTitle")
         cv.addWidget(title)
 
         btnScan = SecondaryButton("ESCANEAR"); btnScan.clicked.connect(lambda: self.app.navigate("escaneo"))
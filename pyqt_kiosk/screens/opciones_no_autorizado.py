@@ -1,5 +1,5 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card, PrimaryButton
+from widgets.common import Card, PrimaryButton
 
 
 class PantallaOpcionesNoAutorizado(QtWidgets.QWidget):
@@ -1,6 +1,6 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card
-from ..services.scale_service import ScaleService
+from widgets.common import Card
+from services.scale_service import ScaleService
 
 
 class PantallaPesajeLibre(QtWidgets.QWidget):
@@ -11,7 +11,7 @@ class PantallaPesajeLibre(QtWidgets.QWidget):
         card = Card(); card.setMaximumSize(900,620)
         cv = QtWidgets.QVBoxLayout(card); cv.setContentsMargins(24,24,24,24)
 
-        self.lbl = QtWidgets.QLabel("0.0 kg"); self.lbl.setStyleSheet("font-size:64px;font-weight:800;"); self.lbl.setAlignment(QtCore.Qt.AlignCenter)
+        self.lbl = QtWidgets.QLabel("0.0 kg"); self.lbl.setObjectName("WeightDisplay"); self.lbl.setAlignment(QtCore.Qt.AlignCenter)
         cv.addWidget(self.lbl, 1)
 
         v.addWidget(card, 0, QtCore.Qt.AlignHCenter)
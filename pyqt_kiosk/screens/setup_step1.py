@@ -1,6 +1,6 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
-from ..services import config_service
+from widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
+from services import config_service
 
 
 class PantallaSetupPaso1(QtWidgets.QWidget):
@@ -1,5 +1,5 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
+from widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
 
 
 class PantallaSetupPaso2(QtWidgets.QWidget):
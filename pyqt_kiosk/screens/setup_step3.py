@@ -1,6 +1,6 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
-from ..services.config_service import get_devices, save_devices
+from widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
+from services.config_service import get_devices, save_devices
 
 
 class PantallaSetupPaso3(QtWidgets.QWidget):
@@ -1,6 +1,6 @@
 from PyQt5 import QtCore, QtWidgets
-from ..widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
-from ..services.config_service import save_rules
+from widgets.common import Card, PrimaryButton, SecondaryButton, ProgressWizard
+from services.config_service import save_rules
 
 
 class PantallaSetupPaso4(QtWidgets.QWidget):
@@ -2,6 +2,7 @@ from PyQt5 import QtCore, QtWidgets
 from widgets.common import Card, PrimaryButton, SecondaryButton
 from services.config_service import get_rules
 from services.validation import validate
+from services.theme_service import set_state
 
 
 class PantallaValidacion(QtWidgets.QWidget):
@@ -14,11 +15,11 @@ class PantallaValidacion(QtWidgets.QWidget):
         self.card = Card(); self.card.setMaximumSize(900,620)
         cv = QtWidgets.QVBoxLayout(self.card); cv.setContentsMargins(24,24,24,24)
 
-        self.title = QtWidgets.QLabel("Resultado"); self.title.setStyleSheet("font-size:28px;font-weight:800;")
+        self.title = QtWidgets.QLabel("Resultado"); self.title.setObjectName("ResultTitle")
         cv.addWidget(self.title)
 
         self.details = QtWidgets.QLabel("")
-        self.details.setStyleSheet("color:#374151"); self.details.setWordWrap(True)
+        self.details.setObjectName("ResultDetails"); self.details.setWordWrap(True)
         cv.addWidget(self.details)
 
         actions = QtWidgets.QHBoxLayout()
@@ -40,13 +41,13 @@ class PantallaValidacion(QtWidgets.QWidget):
         self.result = validate(self.measure, rules)
         if self.result["authorized"]:
             self.title.setText("AUTORIZADO")
-            self.title.setStyleSheet("font-size:38px;font-weight:900;color:#10b981;")
+            set_state(self.title, "authorized")
             self.btnOptions.setEnabled(False)
             self.btnWhy.setEnabled(False)
             self.btnFinish.setEnabled(True)
         else:
             self.title.setText("NO AUTORIZADO")
-            self.title.setStyleSheet("font-size:38px;font-weight:900;color:#ef4444;")
+            set_state(self.title, "denied")
             self.btnOptions.setEnabled(True)
             self.btnWhy.setEnabled(True)
             self.btnFinish.setEnabled(False)
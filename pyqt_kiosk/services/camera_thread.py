@@ -1,8 +1,12 @@
+import logging
+
 from PyQt5 import QtCore
 import numpy as np
 import cv2
 from . import config_service
 
+logger = logging.getLogger(__name__)
+
 
 class CameraThread(QtCore.QThread):
     frameReady = QtCore.pyqtSignal(object)  # emits ndarray (BGR)
@@ -25,9 +29,11 @@ class CameraThread(QtCore.QThread):
             try:
                 self.cap = cv2.VideoCapture(cam_index)
                 if not self.cap.isOpened():
+                    logger.warning("No se pudo abrir la cámara %s. Simulando...", cam_index)
                     self.error.emit("No se pudo abrir la cámara. Simulando...")
                     simulate = True
             except Exception as e:
+                logger.exception("Error abriendo la cámara %s", cam_index)
                 self.error.emit(str(e))
                 simulate = True
 
@@ -37,6 +43,8 @@ class CameraThread(QtCore.QThread):
             else:
                 ret, frame = self.cap.read()
                 if not ret:
+                    # cada frame fallido pasa por el rate-limit del log, no por stdout
+                    logger.warning("Lectura de cámara fallida, usando frame sintético")
                     frame = self._synthetic_frame()
             self.frameReady.emit(frame)
             self.msleep(delay)
@@ -45,7 +53,7 @@ class CameraThread(QtCore.QThread):
             try:
                 self.cap.release()
             except Exception:
-                pass
+                logger.exception("Error liberando la cámara")
 
     def stop(self):
         self.running = False
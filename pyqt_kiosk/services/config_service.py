@@ -1,7 +1,10 @@
 import json
+import logging
 from pathlib import Path
 from typing import Any, Dict
 
+logger = logging.getLogger(__name__)
+
 BASE = Path(__file__).resolve().parent.parent
 CONFIG = BASE / "config"
 CONFIG.mkdir(parents=True, exist_ok=True)
@@ -12,7 +15,8 @@ def _read_json(path: Path) -> Dict[str, Any]:
         return {}
     try:
         return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
+    except Exception as e:
+        logger.error("Config ilegible %s: %s", path, e)
         return {}
 
 
@@ -0,0 +1,20 @@
+import logging
+import sys
+from logging.handlers import QueueListener
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[2]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))  # para shared/
+
+# cola, JSON-lines, rotación con gzip y límite de mensajes repetidos: shared/logging_setup.py
+from shared import logging_setup as _shared  # noqa: E402
+from shared.logging_setup import JsonFormatter, RateLimitFilter, shutdown_logging  # noqa: E402,F401
+
+LOG_DIR = Path(__file__).resolve().parent.parent / "logs"
+
+
+def setup_logging(log_dir: Path = LOG_DIR, level: int = logging.INFO, filename: str = "kiosco.jsonl",
+                  **kwargs) -> QueueListener:
+    """Logging asíncrono: QueueHandler en la app, escritura JSON-lines en un hilo aparte."""
+    return _shared.setup_logging(log_dir, filename, level=level, **kwargs)
@@ -0,0 +1,41 @@
+from collections import deque
+from typing import Any, Deque, Dict, NamedTuple, Optional
+
+# Pasos máximos que recuerda el botón "atrás"; el flujo más largo
+# (setup1..setup4 -> inicio) cabe holgado.
+HISTORY_LIMIT = 16
+
+# Rutas que marcan el inicio de una sesión de pasajero: al entrar se
+# descarta el historial de la sesión anterior.
+SESSION_ROUTES = ("inicio", "menu")
+
+
+class RouteSnapshot(NamedTuple):
+    route: str
+    payload: Dict[str, Any]
+
+
+class RouteStack:
+    """Historial acotado de navegación: guarda ruta + payload, nunca widgets."""
+
+    def __init__(self, maxlen: int = HISTORY_LIMIT):
+        self._items: Deque[RouteSnapshot] = deque(maxlen=maxlen)
+
+    def push(self, route: str, payload: Optional[Dict[str, Any]] = None) -> None:
+        self._items.append(RouteSnapshot(route, dict(payload or {})))
+
+    def pop(self) -> Optional[RouteSnapshot]:
+        return self._items.pop() if self._items else None
+
+    def peek(self) -> Optional[RouteSnapshot]:
+        return self._items[-1] if self._items else None
+
+    def clear(self) -> None:
+        self._items.clear()
+
+    @property
+    def maxlen(self) -> int:
+        return self._items.maxlen
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,89 @@
+from functools import lru_cache
+from string import Template
+from typing import Any, Dict, Optional
+
+from PyQt5 import QtWidgets
+
+from . import config_service
+
+# Colores por defecto; theme.json puede sobreescribir "primary" y "accent"
+# (mismas claves que Airline.palette en el backend).
+DEFAULTS = {
+    "primary": "#1E3F8A",
+    "accent": "#E51937",
+    "bg": "#FFFFFF",
+    "surface": "#FFFFFF",
+    "muted_bg": "#e9eef7",
+    "border": "#eef1f8",
+    "tint": "#F2F5FF",
+    "dot": "#e5e9f8",
+    "text": "#374151",
+    "ok": "#10b981",
+    "error": "#ef4444",
+}
+
+_QSS = Template("""
+QWidget { font-family: 'Segoe UI', sans-serif; font-size: 16px; }
+QPushButton { padding: 12px 16px; border-radius: 18px; }
+
+QFrame#Card { background: $surface; border-radius: 20px; border: 1px solid $border; }
+QPushButton#Primary { color: $primary; border: 2px solid $primary; background: $surface; border-radius: 16px; padding: 14px 18px; }
+QPushButton#Primary:hover { background: $tint; }
+QPushButton#Secondary { color: #fff; background: $primary; border: none; border-radius: 16px; padding: 14px 18px; }
+QPushButton#Danger { color: #fff; background: $accent; border: none; border-radius: 16px; padding: 14px 18px; }
+
+QLabel#Video { background: $muted_bg; border-radius: 16px; }
+QFrame#WizardDot { border-radius: 4px; background: $dot; }
+QFrame#WizardDot[state="current"] { background: $primary; }
+
+QWidget#TopBar QPushButton { border-radius: 12px; padding: 6px 10px; border: 1px solid #e6e8f2; background: #fff; }
+QLabel#TopBarTitle { color: $primary; font-weight: 700; }
+
+QPushButton#Hotspot { background: transparent; border: none; }
+QLabel#Hero { border-radius: 16px; background: $muted_bg; }
+QLabel#Badge { background: #fff; border: 2px solid #eef2ff; border-radius: 60px; margin-top: -60px; }
+
+QLabel#ScreenTitle { font-size: 24px; font-weight: 800; color: $primary; }
+QLabel#FarewellTitle { font-size: 48px; font-weight: 900; color: $primary; }
+QLabel#WeightDisplay { font-size: 64px; font-weight: 800; }
+
+QLabel#ResultTitle { font-size: 28px; font-weight: 800; }
+QLabel#ResultTitle[state="authorized"] { font-size: 38px; font-weight: 900; color: $ok; }
+QLabel#ResultTitle[state="denied"] { font-size: 38px; font-weight: 900; color: $error; }
+QLabel#ResultDetails { color: $text; }
+""")
+
+
+def get_palette(theme: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    theme = config_service.get_theme() if theme is None else theme
+    palette = dict(DEFAULTS)
+    palette.update({k: str(v) for k, v in theme.items() if k in DEFAULTS})
+    return palette
+
+
+@lru_cache(maxsize=8)
+def _compile(items: tuple) -> str:
+    return _QSS.substitute(dict(items))
+
+
+def build_stylesheet(theme: Optional[Dict[str, Any]] = None) -> str:
+    return _compile(tuple(sorted(get_palette(theme).items())))
+
+
+def apply_theme(app: Optional[QtWidgets.QApplication] = None, theme: Optional[Dict[str, Any]] = None) -> None:
+    """Instala la hoja de estilos a nivel de aplicación; no re-parsea si no cambió."""
+    app = app or QtWidgets.QApplication.instance()
+    if app is None:
+        return
+    qss = build_stylesheet(theme)
+    if app.styleSheet() != qss:
+        app.setStyleSheet(qss)
+
+
+def set_state(widget: QtWidgets.QWidget, value: str, name: str = "state") -> None:
+    """Cambia el estado visual vía propiedad dinámica (re-polish sólo del widget)."""
+    if widget.property(name) == value:
+        return
+    widget.setProperty(name, value)
+    widget.style().unpolish(widget)
+    widget.style().polish(widget)
@@ -6,21 +6,18 @@ class Card(QtWidgets.QFrame):
     def __init__(self, *a, **k):
         super().__init__(*a, **k)
         self.setObjectName("Card")
-        self.setStyleSheet("QFrame#Card{background:#fff;border-radius:20px;border:1px solid #eef1f8;}")
 
 
 class PrimaryButton(QtWidgets.QPushButton):
     def __init__(self, text: str):
         super().__init__(text)
         self.setObjectName("Primary")
-        self.setStyleSheet(".Primary{color:#1E3F8A;border:2px solid #1E3F8A;background:#fff;border-radius:16px;padding:14px 18px;} .Primary:hover{background:#F2F5FF}")
 
 
 class SecondaryButton(QtWidgets.QPushButton):
     def __init__(self, text: str):
         super().__init__(text)
         self.setObjectName("Secondary")
-        self.setStyleSheet(".Secondary{color:#fff;background:#1E3F8A;border:none;border-radius:16px;padding:14px 18px;}")
 
 
 class VideoWidget(QtWidgets.QLabel):
@@ -28,7 +25,7 @@ class VideoWidget(QtWidgets.QLabel):
         super().__init__()
         self.setMinimumSize(640, 360)
         self.setAlignment(QtCore.Qt.AlignCenter)
-        self.setStyleSheet("background:#e9eef7;border-radius:16px;")
+        self.setObjectName("Video")
 
     def set_frame(self, frame_bgr):
         h, w = frame_bgr.shape[:2]
@@ -74,10 +71,10 @@ class ProgressWizard(QtWidgets.QWidget):
         h.setSpacing(6)
         for i in range(1, steps + 1):
             dot = QtWidgets.QFrame()
+            dot.setObjectName("WizardDot")
             dot.setFixedHeight(8)
-            dot.setStyleSheet("border-radius:4px;background:#e5e9f8;")
             w = 28 if i == current else 10
             dot.setFixedWidth(w)
             if i == current:
-                dot.setStyleSheet("border-radius:4px;background:#1E3F8A;")
+                dot.setProperty("state", "current")
             h.addWidget(dot)
\ No newline at end of file
@@ -9,6 +9,7 @@ class TopBar(QtWidgets.QWidget):
     def __init__(self, lang: str = "es"):
         super().__init__()
         self.lang = lang
+        self.setObjectName("TopBar")
         self.setFixedHeight(56)
 
         h = QtWidgets.QHBoxLayout(self)
@@ -21,7 +22,7 @@ class TopBar(QtWidgets.QWidget):
         h.addWidget(self.btnBack, 0)
 
         self.title = QtWidgets.QLabel(STRINGS[self.lang]["app_title"])
-        self.title.setStyleSheet("color:#1E3F8A;font-weight:700")
+        self.title.setObjectName("TopBarTitle")
         self.title.setAlignment(QtCore.Qt.AlignCenter)
         h.addWidget(self.title, 1)
 
@@ -41,8 +42,6 @@ class TopBar(QtWidgets.QWidget):
         rh.addWidget(self.btnEn)
         h.addWidget(right, 0)
 
-        self.setStyleSheet("QPushButton{border-radius:12px;padding:6px 10px;border:1px solid #e6e8f2;background:#fff;}")
-
     def _set_lang(self, lang: str):
         if self.lang != lang:
             self.lang = lang
@@ -0,0 +1 @@
+# Code shared by the backend and the PyQt5 kiosk applications
@@ -0,0 +1,165 @@
+"""
+Asynchronous structured logging, shared by the backend and both kiosk apps
+
+The root logger gets a ``QueueHandler``, so the event loop, camera or GUI thread
+only pays for a rate-limit check and a queue put. A ``QueueListener`` thread
+does the formatting and file I/O, writing JSON lines to a size-rotated file
+whose backups are gzip-compressed, plus readable lines to stderr.
+
+Repeated messages (same logger, level and message template) are rate limited,
+so a broken device that fails on every frame does not flood the log. The next
+record that gets through reports how many similar records were suppressed.
+
+Each application wraps setup_logging() with its own log directory and file
+name: backend/logging_setup.py, pyqt_client/core/logging_setup.py and
+pyqt_kiosk/services/log_service.py.
+"""
+
+import atexit
+import copy
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Dict, Optional, Tuple, Union
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+
+class RateLimitFilter(logging.Filter):
+    """Let through at most ``burst`` similar records per ``interval`` seconds"""
+
+    def __init__(self, burst: int = 5, interval: float = 60.0):
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self._lock = threading.Lock()
+        # key -> [window start, records in window, suppressed]
+        self._windows: Dict[Tuple, list] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        # keyed by the message template, not its arguments
+        key = (record.name, record.levelno, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.interval:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 1024:
+                    self._evict(now)
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+    def _evict(self, now: float):
+        for key in [k for k, w in self._windows.items() if now - w[0] >= self.interval]:
+            del self._windows[key]
+
+
+class _RecordQueueHandler(QueueHandler):
+    """QueueHandler that keeps the traceback apart from the message"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge args and render the traceback now: they may not outlive the caller
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName,
+        }
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def _gzip_namer(name: str) -> str:
+    return name + '.gz'
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def setup_logging(log_dir: Union[str, os.PathLike], filename: str, level: Union[int, str] = logging.INFO,
+                  max_bytes: int = 5 * 1024 * 1024, backup_count: int = 10, burst: int = 5,
+                  interval: float = 60.0, console: bool = True) -> QueueListener:
+    """
+    Route the root logger through a queue to a JSON-lines file (and stderr).
+    Calling it again returns the running listener.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return _listener
+
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = RotatingFileHandler(os.path.join(log_dir, filename), maxBytes=max_bytes,
+                                       backupCount=backup_count, encoding='utf-8')
+    file_handler.namer = _gzip_namer
+    file_handler.rotator = _gzip_rotator
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+
+    if console:
+        console_handler = logging.StreamHandler(sys.stderr)
+        console_handler.setFormatter(logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
+        handlers.append(console_handler)
+
+    _queue_handler = _RecordQueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(RateLimitFilter(burst, interval))
+
+    root = logging.getLogger()
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+
+    _listener = QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Flush pending records, stop the listener thread and take the queue handler off the root logger"""
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    logging.getLogger().removeHandler(_queue_handler)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener = None
+    _queue_handler = None
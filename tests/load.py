@@ -0,0 +1,271 @@
+"""
+Load generator for the backend: a fleet of virtual kiosks running the passenger flow.
+
+Each virtual kiosk loops over passengers: create a session, scan one to three
+bags (with ``weight_kg`` and dimensions), pay for a fraction of them, with think
+times between the steps. The fleet grows stage by stage and every stage reports
+throughput, latency percentiles per route and error rates:
+
+    python -m tests.load --kiosks 10,50,200 --duration 2m --think-scale 0.05
+    python -m tests.load --url http://localhost:8001 --kiosks 20 --duration 10m --json load.json
+
+Without ``--url`` the app runs in-process (``backend/server.py`` through the
+ASGI transport, startup and shutdown handlers included) on whatever storage
+MONGO_URL/STORAGE select; without either it sets STORAGE=memory itself, and
+the report names the store it ran on. In-process numbers
+include the load generator itself, which shares the event loop with the app;
+use a local server for sizing and in-process runs to catch regressions.
+
+Think times are drawn around ``THINK_S`` (seconds, a real passenger) and
+multiplied by ``--think-scale``: 1.0 is real time, smaller values pack more
+passengers per kiosk into a stage. A non-zero exit status means a stage went
+over ``--max-error-rate`` or ``--max-p95-ms``.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import httpx
+
+from tests.soak import parse_duration
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# step -> mean think time in seconds before it
+THINK_S = {
+    "session": 20.0,  # between passengers
+    "scan": 8.0,  # placing the bag
+    "payment": 15.0,  # reading the fees, presenting the card
+}
+BAGS = (1, 1, 1, 2, 2, 3)
+
+
+# ---------------------------------------------------------------------------
+# Statistics
+# ---------------------------------------------------------------------------
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (q in 0-100); 0.0 when empty."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+class Recorder:
+    """Latencies (ms) and errors per route label, e.g. ``POST /api/scan``."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, route: str, ms: float, ok: bool):
+        self.latencies.setdefault(route, []).append(ms)
+        self.errors[route] = self.errors.get(route, 0) + (not ok)
+
+    def summary(self, elapsed: float) -> Dict:
+        routes = {}
+        for route, values in sorted(self.latencies.items()):
+            routes[route] = {
+                "requests": len(values),
+                "rps": round(len(values) / elapsed, 2) if elapsed else 0.0,
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(max(values), 2),
+                "error_rate": round(self.errors[route] / len(values), 4),
+            }
+        total = sum(len(v) for v in self.latencies.values())
+        errors = sum(self.errors.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 2) if elapsed else 0.0,
+            "error_rate": round(errors / total, 4) if total else 0.0,
+            "routes": routes,
+        }
+
+
+# ---------------------------------------------------------------------------
+# Virtual kiosk
+# ---------------------------------------------------------------------------
+
+async def think(step: str, scale: float, rng: random.Random):
+    if scale > 0:
+        # exponential around the mean, capped so one passenger cannot stall a stage
+        await asyncio.sleep(min(rng.expovariate(1 / THINK_S[step]), 4 * THINK_S[step]) * scale)
+
+
+async def timed(http: httpx.AsyncClient, recorder: Recorder, method: str, path: str, route: str, **kwargs):
+    t0 = time.perf_counter()
+    try:
+        resp = await http.request(method, path, **kwargs)
+        ok = resp.status_code < 400
+    except httpx.HTTPError:
+        resp, ok = None, False
+    recorder.add(f"{method} {route}", (time.perf_counter() - t0) * 1000, ok)
+    return resp if ok else None
+
+
+async def kiosk(http: httpx.AsyncClient, recorder: Recorder, kiosk_id: str, deadline: float,
+                airline: str, pay_ratio: float, think_scale: float, rng: random.Random) -> int:
+    """Run passengers until `deadline`; returns the number of passengers served."""
+    passengers = 0
+    while time.monotonic() < deadline:
+        await think("session", think_scale, rng)
+        resp = await timed(http, recorder, "POST", "/api/sessions", "/api/sessions",
+                           json={"airline_code": airline, "language": rng.choice(("es", "en")), "kiosk_id": kiosk_id})
+        if resp is None:
+            continue
+        session_id = resp.json()["id"]
+        for _ in range(rng.choice(BAGS)):
+            await think("scan", think_scale, rng)
+            await timed(http, recorder, "POST", "/api/scan", "/api/scan", json={
+                "session_id": session_id,
+                "weight_kg": round(rng.uniform(6, 14), 1),
+                "dims_cm": {"length": round(rng.uniform(45, 60), 1), "width": round(rng.uniform(25, 38), 1),
+                            "height": round(rng.uniform(18, 27), 1)},
+            })
+        if rng.random() < pay_ratio:
+            await think("payment", think_scale, rng)
+            await timed(http, recorder, "POST", "/api/payments/simulate", "/api/payments/simulate",
+                        json={"session_id": session_id, "total": round(rng.uniform(15, 60), 2), "method": "card"})
+        passengers += 1
+    return passengers
+
+
+async def run_stage(http: httpx.AsyncClient, kiosks: int, duration: float, airline: str = "JSM",
+                    pay_ratio: float = 0.4, think_scale: float = 1.0, seed: int = 0) -> Dict:
+    recorder = Recorder()
+    t0 = time.monotonic()
+    served = await asyncio.gather(*(
+        kiosk(http, recorder, f"load-{kiosks}-{i}", t0 + duration, airline, pay_ratio, think_scale,
+              random.Random(seed * 100003 + i))
+        for i in range(kiosks)
+    ))
+    result = recorder.summary(time.monotonic() - t0)
+    result.update(kiosks=kiosks, passengers=sum(served))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Targets: local server or in-process app
+# ---------------------------------------------------------------------------
+
+class Lifespan:
+    """Run the ASGI app's startup handlers on enter and its shutdown handlers on exit."""
+
+    def __init__(self, app):
+        self.app = app
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._outbox: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    async def _event(self, name: str):
+        await self._inbox.put({"type": f"lifespan.{name}"})
+        message = await self._outbox.get()
+        if message["type"] != f"lifespan.{name}.complete":
+            raise RuntimeError(f"{name} failed: {message.get('message')}")
+
+    async def __aenter__(self):
+        scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+        self._task = asyncio.ensure_future(self.app(scope, self._inbox.get, self._outbox.put))
+        await self._event("startup")
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._event("shutdown")
+        await self._task
+
+
+def load_app():
+    """backend/server.py, imported in this process (on the in-memory store unless MONGO_URL/STORAGE say otherwise)."""
+    if not os.environ.get("MONGO_URL"):
+        os.environ.setdefault("STORAGE", "memory")
+    if str(ROOT / "backend") not in sys.path:
+        sys.path.insert(0, str(ROOT / "backend"))
+    import server
+    return server
+
+
+async def run(kiosk_counts: List[int], duration: float, url: Optional[str] = None, **stage_kwargs) -> Dict:
+    limits = httpx.Limits(max_connections=max(kiosk_counts), max_keepalive_connections=max(kiosk_counts))
+    stages = []
+    if url:
+        async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as http:
+            for i, n in enumerate(kiosk_counts):
+                stages.append(await run_stage(http, n, duration, seed=i, **stage_kwargs))
+        return {"target": url, "stages": stages}
+
+    server = load_app()
+    async with Lifespan(server.app):
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load", timeout=30) as http:
+            for i, n in enumerate(kiosk_counts):
+                stages.append(await run_stage(http, n, duration, seed=i, **stage_kwargs))
+    return {"target": f"in-process ({type(server.client).__name__})", "stages": stages}
+
+
+def check(report: Dict, max_error_rate: float, max_p95_ms: Optional[float]) -> List[str]:
+    failures = []
+    for stage in report["stages"]:
+        for route, r in stage["routes"].items():
+            if r["error_rate"] > max_error_rate:
+                failures.append(f"{stage['kiosks']} kiosks, {route}: error rate {r['error_rate']:.2%}")
+            if max_p95_ms is not None and r["p95_ms"] > max_p95_ms:
+                failures.append(f"{stage['kiosks']} kiosks, {route}: p95 {r['p95_ms']:.1f} ms")
+    return failures
+
+
+def format_report(report: Dict) -> str:
+    lines = [f"target: {report['target']}"]
+    for stage in report["stages"]:
+        lines.append(f"\n{stage['kiosks']} kiosks, {stage['elapsed_s']:.0f}s: {stage['passengers']} passengers, "
+                     f"{stage['requests']} requests, {stage['rps']:.1f} req/s, errors {stage['error_rate']:.2%}")
+        lines.append(f"  {'route':<30}{'req':>8}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}")
+        for route, r in stage["routes"].items():
+            lines.append(f"  {route:<30}{r['requests']:>8}{r['rps']:>9.1f}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}"
+                         f"{r['p99_ms']:>9.1f}{r['error_rate']:>9.2%}")
+    for failure in report.get("failures", []):
+        lines.append(f"FAIL {failure}")
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--kiosks", default="10,50,100",
+                        help="comma-separated fleet sizes, one stage each")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("1m"),
+                        help="per stage, e.g. 90s, 10m")
+    parser.add_argument("--url", help="base URL of a running backend (default: in-process app)")
+    parser.add_argument("--airline", default="JSM")
+    parser.add_argument("--pay-ratio", type=float, default=0.4, help="fraction of passengers who pay")
+    parser.add_argument("--think-scale", type=float, default=1.0, help="think time multiplier (0: none)")
+    parser.add_argument("--max-error-rate", type=float, default=0.01)
+    parser.add_argument("--max-p95-ms", type=float, default=None)
+    parser.add_argument("--json", help="write the full report to this file")
+    args = parser.parse_args(argv)
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)  # one INFO line per request otherwise
+    kiosk_counts = [int(n) for n in args.kiosks.split(",") if n.strip()]
+    report = asyncio.run(run(kiosk_counts, args.duration, args.url, airline=args.airline,
+                             pay_ratio=args.pay_ratio, think_scale=args.think_scale))
+    report["failures"] = check(report, args.max_error_rate, args.max_p95_ms)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,464 @@
+"""
+Long-run soak harness for the two PyQt kiosk apps.
+
+Drives the full passenger flow of ``pyqt_kiosk`` and ``pyqt_client`` headless
+(offscreen Qt, simulated camera and scale) at accelerated speed, samples the
+process while it runs and fails when resources keep growing:
+
+    python -m tests.soak --app both --duration 4h
+    python -m tests.soak --app client --duration 30m --json soak.json
+
+Both apps use the same top-level module names (``main``, ``services`` ...), so
+each one is driven in its own child process. Every sample is taken at the same
+point of the flow (back on the start screen, after ``gc.collect()``) so that
+screen state does not show up as growth.
+
+Metrics and checks:
+
+* ``rss_mb``, ``traced_mb`` (tracemalloc) and ``gc_objects`` are checked as a
+  least-squares growth slope per hour, once the measured window is long enough
+  for a slope to mean anything (``--min-slope-window``).
+* ``threads``, ``fds`` and ``camera_handles`` (capture devices opened and not
+  released) are discrete: their net growth over the measured window must stay
+  within the tolerance.
+"""
+
+import argparse
+import gc
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from functools import partial
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+APPS = ("kiosk", "client")
+
+# metric -> (kind, default threshold)
+#   slope: max growth per hour; growth: max net growth over the window
+THRESHOLDS = {
+    "rss_mb": ("slope", 16.0),
+    "traced_mb": ("slope", 4.0),
+    "gc_objects": ("slope", 20000.0),
+    "threads": ("growth", 0),
+    "fds": ("growth", 0),
+    "camera_handles": ("growth", 0),
+}
+
+
+# ---------------------------------------------------------------------------
+# Sampling
+# ---------------------------------------------------------------------------
+
+def _rss_mb() -> float:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+
+
+def _thread_count() -> int:
+    """OS threads, so QThreads and native camera/driver threads are included"""
+    try:
+        import psutil
+        return psutil.Process().num_threads()
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/status") as f:
+            match = re.search(r"^Threads:\s+(\d+)", f.read(), re.M)
+        return int(match.group(1))
+    except (OSError, AttributeError):
+        return threading.active_count()
+
+
+def _fd_count() -> int:
+    try:
+        import psutil
+        proc = psutil.Process()
+        return proc.num_handles() if os.name == "nt" else proc.num_fds()
+    except ImportError:
+        pass
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return -1
+
+
+class Sampler:
+    def __init__(self, extra=None):
+        self.extra = extra or {}
+        self.samples: List[Dict[str, float]] = []
+        self._first_snapshot = None
+
+    def sample(self, elapsed: float, cycles: int):
+        gc.collect()
+        row = {
+            "t": round(elapsed, 3),
+            "cycles": cycles,
+            "rss_mb": round(_rss_mb(), 3),
+            "traced_mb": round(tracemalloc.get_traced_memory()[0] / 2 ** 20, 3),
+            "gc_objects": len(gc.get_objects()),
+            "threads": _thread_count(),
+            "fds": _fd_count(),
+        }
+        for name, fn in self.extra.items():
+            row[name] = fn()
+        self.samples.append(row)
+
+    def mark_baseline(self):
+        """Snapshot used to point at the source lines that grew"""
+        self._first_snapshot = tracemalloc.take_snapshot()
+
+    def top_growth(self, limit: int = 10) -> List[str]:
+        if self._first_snapshot is None:
+            return []
+        stats = tracemalloc.take_snapshot().compare_to(self._first_snapshot, "lineno")
+        return [str(stat) for stat in stats[:limit] if stat.size_diff > 0]
+
+
+def slope_per_hour(points: List[tuple]) -> float:
+    """Least-squares slope of (seconds, value) points, per hour"""
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mean_t = sum(t for t, _ in points) / n
+    mean_v = sum(v for _, v in points) / n
+    var = sum((t - mean_t) ** 2 for t, _ in points)
+    if var == 0:
+        return 0.0
+    cov = sum((t - mean_t) * (v - mean_v) for t, v in points)
+    return cov / var * 3600.0
+
+
+def analyze(samples: List[Dict[str, float]], warmup: float, thresholds: Dict[str, tuple],
+            min_slope_window: float) -> List[Dict]:
+    """Per-metric verdicts over the samples taken after the warm-up"""
+    window = [s for s in samples if s["t"] >= warmup] or samples[-1:]
+    span = window[-1]["t"] - window[0]["t"] if window else 0.0
+    results = []
+    for metric, (kind, limit) in thresholds.items():
+        if not window or metric not in window[0]:
+            continue
+        first, last = window[0][metric], window[-1][metric]
+        slope = slope_per_hour([(s["t"], s[metric]) for s in window])
+        if kind == "slope":
+            checked = span >= min_slope_window and len(window) >= 3
+            ok = not checked or slope <= limit
+        else:
+            checked = len(window) >= 2
+            ok = not checked or last - first <= limit
+        results.append({
+            "metric": metric, "kind": kind, "limit": limit,
+            "start": first, "end": last, "slope_per_hour": round(slope, 3),
+            "checked": checked, "ok": ok,
+        })
+    return results
+
+
+# ---------------------------------------------------------------------------
+# Drivers (run inside the child process)
+# ---------------------------------------------------------------------------
+
+def pump(ms: int):
+    """Run the Qt event loop for ``ms`` milliseconds (frames, timers, signals)"""
+    from PyQt5 import QtCore
+    loop = QtCore.QEventLoop()
+    QtCore.QTimer.singleShot(max(0, int(ms)), loop.quit)
+    loop.exec_()
+
+
+def fast_forward(timer):
+    """Fire a running QTimer until it stops itself, instead of waiting for it"""
+    for _ in range(100):
+        if not timer.isActive():
+            return
+        timer.timeout.emit()
+
+
+class SimulatedCamera:
+    """Stand-in for ``cv2.VideoCapture`` that counts handles not released"""
+    open_handles = 0
+
+    def __init__(self, index=0, *args):
+        import numpy as np
+        self._np = np
+        self._tick = 0
+        self._open = True
+        SimulatedCamera.open_handles += 1
+
+    def isOpened(self):
+        return self._open
+
+    def read(self):
+        if not self._open:
+            return False, None
+        self._tick += 1
+        frame = self._np.full((480, 640, 3), 60, dtype=self._np.uint8)
+        x = 100 + self._tick % 200
+        frame[120:360, x:x + 200] = (40, 90, 200)
+        return True, frame
+
+    def release(self):
+        if self._open:
+            self._open = False
+            SimulatedCamera.open_handles -= 1
+
+
+class KioskDriver:
+    """pyqt_kiosk: inicio -> escaneo -> validacion -> despedida -> menu"""
+    app_dir = ROOT / "pyqt_kiosk"
+
+    def __init__(self, workdir: Path, think_ms: int):
+        from PyQt5 import QtWidgets
+        self.qapp = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        sys.path.insert(0, str(self.app_dir))
+        import main as kiosk_main
+        from services import config_service
+
+        config_service.CONFIG = workdir
+        kiosk_main.bootstrap_configs()
+        devices = config_service.get_devices()
+        devices["simulate"] = True
+        config_service.save_devices(devices)
+
+        self.win = kiosk_main.MainWindow()
+        self.think_ms = think_ms
+        self.extra_metrics = {}
+
+    def cycle(self, i: int):
+        win = self.win
+        win.navigate("inicio", {"start_mode": True})
+        win.instances["inicio"].btnMain.click()
+        scan = win.instances["escaneo"]
+        pump(self.think_ms)
+        for _ in range(20):
+            if scan.measure:
+                break
+            pump(50)
+        scan.btnContinue.click()
+
+        val = win.instances["validacion"]
+        if val.result and val.result.get("authorized"):
+            val.btnFinish.click()
+        else:
+            val.btnWhy.click()
+            win.handle_back()
+            val.btnOptions.click()
+            win.navigate("despedida")
+        fast_forward(win.instances["despedida"].timer)
+
+        if i % 7 == 6:
+            win.navigate("pesaje")
+            pump(self.think_ms // 2)
+            win.navigate("menu")
+        self.qapp.processEvents()
+
+    def close(self):
+        for screen in self.win.instances.values():
+            cam = getattr(screen, "cam", None)
+            if cam is not None:
+                cam.stop()
+        self.win.close()
+
+
+class ClientDriver:
+    """pyqt_client: start -> scan -> validate -> [tariffs -> payment] -> goodbye"""
+    app_dir = ROOT / "pyqt_client"
+
+    def __init__(self, workdir: Path, think_ms: int):
+        from PyQt5 import QtWidgets
+        self.qapp = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        sys.path.insert(0, str(self.app_dir))
+
+        # simulated devices: synthetic capture and a scale in simulation mode
+        import cv2
+        cv2.VideoCapture = SimulatedCamera
+        from services.devices.scale_service import ScaleService
+
+        def _simulated_scale(service):
+            service.serial_connection = None
+            service.simulation_mode = True
+        ScaleService._init_serial_connection = _simulated_scale
+
+        # work on a copy of the config so the soak never touches the repo files
+        shutil.copytree(self.app_dir / "config", workdir, dirs_exist_ok=True)
+        import main as client_main
+        from core.config import ConfigManager
+        client_main.ConfigManager = partial(ConfigManager, config_dir=str(workdir))
+
+        self.win = client_main.KioskMainWindow()
+        self.think_ms = think_ms
+        self.extra_metrics = {"camera_handles": lambda: SimulatedCamera.open_handles}
+
+    def cycle(self, i: int):
+        win = self.win
+        screens = win.screens
+        win.goto_screen("start")
+        screens["start"].go_scan_button.click()
+        pump(self.think_ms)
+
+        if i % 5 == 4:
+            # passenger walks away: back to welcome and a new setup
+            screens["scan"].back_button.click()
+            screens["welcome"].start_button.click()
+            screens["setup"].save_button.click()
+            return
+        if i % 7 == 6:
+            screens["scan"].free_weigh_button.click()
+            pump(self.think_ms // 2)
+            screens["free_weigh"].back_button.click()
+            pump(self.think_ms // 2)
+
+        screens["scan"].continue_button.click()
+        validate = screens["validate"]
+        if validate.validation_result["compliant"]:
+            validate.continue_ok_button.click()
+        else:
+            validate.continue_to_payment_button.click()
+            screens["tariffs"].pay_button.click()
+            payment = screens["payment"]
+            fast_forward(payment.payment_timer)
+            fast_forward(payment.finish_timer)
+            payment.finish_button.click()
+        fast_forward(screens["goodbye"].countdown_timer)
+        self.qapp.processEvents()
+
+    def close(self):
+        self.win.goto_screen("welcome")
+        self.win.close()
+
+
+DRIVERS = {"kiosk": KioskDriver, "client": ClientDriver}
+
+
+def run_child(app: str, duration: float, sample_every: float, think_ms: int) -> Dict:
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    tracemalloc.start(10)
+    with tempfile.TemporaryDirectory(prefix=f"soak-{app}-") as tmp:
+        driver = DRIVERS[app](Path(tmp), think_ms)
+        sampler = Sampler(driver.extra_metrics)
+        start = time.monotonic()
+        next_sample = start
+        cycles = 0
+        while True:
+            driver.cycle(cycles)
+            cycles += 1
+            now = time.monotonic()
+            if now >= next_sample:
+                sampler.sample(now - start, cycles)
+                if len(sampler.samples) == 1:
+                    sampler.mark_baseline()
+                next_sample = now + sample_every
+            if now - start >= duration:
+                break
+        if sampler.samples[-1]["cycles"] != cycles:
+            sampler.sample(time.monotonic() - start, cycles)
+        top = sampler.top_growth()
+        driver.close()
+    return {"app": app, "cycles": cycles, "samples": sampler.samples, "top_growth": top}
+
+
+# ---------------------------------------------------------------------------
+# Parent: spawn one child per app, analyze, report
+# ---------------------------------------------------------------------------
+
+def parse_duration(value: str) -> float:
+    """'90', '90s', '15m', '4h' -> seconds"""
+    match = re.fullmatch(r"\s*([\d.]+)\s*([smh]?)\s*", str(value))
+    if not match:
+        raise argparse.ArgumentTypeError(f"invalid duration: {value!r}")
+    return float(match.group(1)) * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def run_app(app: str, duration: float, sample_every: float, think_ms: int,
+            timeout: Optional[float] = None) -> Dict:
+    cmd = [sys.executable, "-m", "tests.soak", "--child", app,
+           "--duration", str(duration), "--sample-every", str(sample_every),
+           "--think-ms", str(think_ms)]
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    proc = subprocess.run(cmd, cwd=str(ROOT), env=env, capture_output=True, text=True,
+                          timeout=timeout or duration * 2 + 120)
+    lines = [line for line in proc.stdout.splitlines() if line.startswith("SOAK ")]
+    if proc.returncode != 0 or not lines:
+        raise RuntimeError(f"soak child '{app}' failed ({proc.returncode}):\n{proc.stderr[-4000:]}")
+    return json.loads(lines[-1][len("SOAK "):])
+
+
+def soak(apps=APPS, duration: float = 3600, sample_every: float = 60, think_ms: int = 300,
+         warmup: Optional[float] = None, min_slope_window: float = 600,
+         thresholds: Optional[Dict[str, tuple]] = None) -> Dict:
+    """Run the soak for each app and return per-app samples and verdicts"""
+    thresholds = dict(THRESHOLDS, **(thresholds or {}))
+    warmup = duration * 0.1 if warmup is None else warmup
+    report = {"ok": True, "apps": {}}
+    for app in apps:
+        result = run_app(app, duration, sample_every, think_ms)
+        result["checks"] = analyze(result["samples"], warmup, thresholds, min_slope_window)
+        result["ok"] = all(check["ok"] for check in result["checks"])
+        report["apps"][app] = result
+        report["ok"] = report["ok"] and result["ok"]
+    return report
+
+
+def format_report(report: Dict) -> str:
+    out = []
+    for app, result in report["apps"].items():
+        out.append(f"[{app}] {result['cycles']} cycles, {len(result['samples'])} samples")
+        out.append(f"  {'metric':<16}{'start':>12}{'end':>12}{'slope/h':>12}{'limit':>10}  status")
+        for c in result["checks"]:
+            status = ("ok" if c["ok"] else "FAIL") if c["checked"] else "skipped"
+            out.append(f"  {c['metric']:<16}{c['start']:>12}{c['end']:>12}"
+                       f"{c['slope_per_hour']:>12}{c['limit']:>10}  {status}")
+        if not result["ok"] and result["top_growth"]:
+            out.append("  top allocation growth:")
+            out.extend(f"    {line}" for line in result["top_growth"])
+    out.append("PASS" if report["ok"] else "FAIL")
+    return "\n".join(out)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", choices=APPS + ("both",), default="both")
+    parser.add_argument("--duration", type=parse_duration, default=parse_duration("1h"),
+                        help="per app, e.g. 90s, 30m, 4h")
+    parser.add_argument("--sample-every", type=parse_duration, default=60.0)
+    parser.add_argument("--think-ms", type=int, default=300,
+                        help="time spent on the scan screen per passenger")
+    parser.add_argument("--warmup", type=parse_duration, default=None,
+                        help="ignored for checks (default: 10%% of the duration)")
+    parser.add_argument("--min-slope-window", type=parse_duration, default=600.0)
+    parser.add_argument("--json", help="write the full report to this file")
+    parser.add_argument("--child", choices=APPS, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = run_child(args.child, args.duration, args.sample_every, args.think_ms)
+        print("SOAK " + json.dumps(result), flush=True)
+        return 0
+
+    apps = APPS if args.app == "both" else (args.app,)
+    report = soak(apps, args.duration, args.sample_every, args.think_ms,
+                  args.warmup, args.min_slope_window)
+    print(format_report(report))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0 if report["ok"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
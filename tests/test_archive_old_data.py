@@ -0,0 +1,45 @@
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import archive_old_data  # noqa: E402
+
+
+def scan(i, day, hour=12, **fields):
+    return {"_id": f"scan-{i}", "session_id": "s1", "created_at": datetime(2026, 1, day, hour, tzinfo=timezone.utc),
+            "dims_cm": {"length": 50.0 + i, "width": 30.0, "height": 20.0}, "weight_kg": 8.0 + i, **fields}
+
+
+def test_write_batch_partitions_by_day_and_rewrites_on_rerun(tmp_path):
+    batch = [scan(1, 30, errors=["weight"]), scan(2, 30, hour=23, errors=[]), scan(3, 31, hour=0, errors=["dims"])]
+    written = archive_old_data.write_batch(tmp_path, "scans", batch)
+    assert [p.relative_to(tmp_path).as_posix() for p in written] == [
+        "scans/day=2026-01-30/part-scan-1.parquet", "scans/day=2026-01-31/part-scan-3.parquet"]
+
+    # a re-run after a crash before the delete writes the same files, not new ones
+    assert archive_old_data.write_batch(tmp_path, "scans", batch) == written
+    assert sorted(tmp_path.rglob("*.parquet")) == sorted(written) and not list(tmp_path.rglob("*.tmp"))
+
+    frame = archive_old_data.read_archive("scans", archive_dir=tmp_path)
+    assert list(frame["id"]) == ["scan-1", "scan-2", "scan-3"]
+    assert list(frame["day"]) == ["2026-01-30", "2026-01-30", "2026-01-31"]
+    assert list(frame["dims_cm.length"]) == [51.0, 52.0, 53.0]  # nested documents are flattened
+    assert [json.loads(v) for v in frame["errors"]] == [["weight"], [], ["dims"]]  # lists are JSON text
+    assert list(archive_old_data.read_archive("scans", since="2026-01-31", archive_dir=tmp_path)["id"]) == ["scan-3"]
+    assert archive_old_data.read_archive("scans", until="2026-01-30", archive_dir=tmp_path).empty
+
+
+def test_read_archive_with_columns_older_files_lack(tmp_path):
+    archive_old_data.write_batch(tmp_path, "scans", [scan(1, 10), scan(2, 10)])  # before `errors` existed
+    archive_old_data.write_batch(tmp_path, "scans", [scan(3, 11, errors=["weight"])])
+
+    frame = archive_old_data.read_archive("scans", archive_dir=tmp_path, columns=["id", "errors"])
+    assert set(frame.columns) == {"id", "errors", "day"}
+    assert list(frame["id"]) == ["scan-1", "scan-2", "scan-3"]
+    assert frame["errors"].isna().tolist() == [True, True, False]
+
+    only_new = archive_old_data.read_archive("scans", archive_dir=tmp_path, columns=["errors"])
+    assert len(only_new) == 3 and set(only_new.columns) == {"errors", "day"}
+    assert list(archive_old_data.read_archive("payments", archive_dir=tmp_path, columns=["id"]).columns) == ["id", "day"]
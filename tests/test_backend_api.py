@@ -0,0 +1,554 @@
+import importlib
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+from fastapi.testclient import TestClient
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory, monkeypatch_module):
+    """The backend app in-process on the in-memory store (no MongoDB, no MONGO_URL)."""
+    monkeypatch_module.delenv("MONGO_URL", raising=False)
+    monkeypatch_module.setenv("STORAGE", "memory")
+    monkeypatch_module.setenv("LOG_DIR", str(tmp_path_factory.mktemp("logs")))
+    monkeypatch_module.syspath_prepend(str(BACKEND_DIR))
+    root_handlers = list(logging.getLogger().handlers)
+    sys.modules.pop("server", None)
+    server = importlib.import_module("server")
+    try:
+        with TestClient(server.app) as client:
+            yield server, client
+    finally:
+        logging.getLogger().handlers[:] = root_handlers
+        sys.modules.pop("server", None)
+
+
+@pytest.fixture(scope="module")
+def monkeypatch_module():
+    with pytest.MonkeyPatch.context() as mp:
+        yield mp
+
+
+def test_seeded_config_and_upserts(api):
+    server, client = api
+    assert type(server.client).__name__ == "MemoryClient"
+    airlines = client.get("/api/config/airlines").json()
+    assert [a["code"] for a in airlines] == ["JSM"]
+    assert client.get("/api/rules/JSM").json()["max_weight_kg"] == 10.0
+    assert client.get("/api/rules/XXX").status_code == 404
+
+    # an upsert of an existing airline keeps its id
+    changed = client.post("/api/config/airlines", json={"code": "JSM", "name": "JetSMART SpA"}).json()
+    assert changed["id"] == airlines[0]["id"]
+    client.post("/api/config/airlines", json={"code": "AAA", "name": "Alpha"})
+    names = {a["code"]: a["name"] for a in client.get("/api/config/airlines").json()}
+    assert names == {"JSM": "JetSMART SpA", "AAA": "Alpha"}
+
+
+def test_storage_is_chosen_explicitly(api, monkeypatch):
+    import storage
+
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    monkeypatch.delenv("STORAGE", raising=False)
+    with pytest.raises(ValueError, match="MONGO_URL"):
+        storage.create_client()  # no silent fallback to an empty in-process store
+    with pytest.raises(ValueError, match="Unknown STORAGE"):
+        storage.create_client(backend="sqlite")
+    memory = storage.create_client(backend="memory")
+    with pytest.raises(SystemExit):
+        storage.require_mongo(memory)
+
+
+def test_redundant_index_report(api):
+    from pymongo import IndexModel
+
+    server, client = api
+    existing = {
+        "_id_": {"key": [("_id", 1)]},
+        "session_id": {"key": [("session_id", 1)]},
+        "session_id_created_at": {"key": [("session_id", 1), ("created_at", 1)]},  # covers session_id
+        "created_at_ttl": {"key": [("created_at", 1)], "expireAfterSeconds": 60},
+        "created_at": {"key": [("created_at", 1)]},  # same keys as the TTL index
+        "code_unique": {"key": [("code", 1)], "unique": True},
+        "code_name": {"key": [("code", 1), ("name", 1)]},  # the unique prefix stays
+        "kiosk": {"key": [("kiosk_id", 1)]},
+        "kiosk_active": {"key": [("kiosk_id", 1), ("at", 1)], "partialFilterExpression": {"active": True}},
+        "day": {"key": [("day", 1)]},
+        "day_again": {"key": [("day", 1)]},
+    }
+    declared = set(existing) - {"created_at", "day_again"}
+    assert server._redundant_indexes(existing, declared) == ["created_at", "day_again", "session_id"]
+    # two declared copies of the same keys: one of them goes
+    assert server._redundant_indexes({"a": {"key": [("x", 1)]}, "b": {"key": [("x", 1)]}}, {"a", "b"}) == ["b"]
+    assert server._redundant_indexes({"x": {"key": [("x", 1)]}, "x_desc": {"key": [("x", -1), ("y", 1)]}},
+                                     {"x", "x_desc"}) == []
+
+    async def bootstrap():
+        database = server.client["index_test"]
+        first = await server.ensure_indexes(database)
+        await database.scans.create_indexes([IndexModel([("session_id", 1), ("created_at", 1)], name="stray")])
+        return first, await server.ensure_indexes(database)
+
+    first, second = client.portal.call(bootstrap)
+    assert not any(r["missing"] or r["redundant"] for r in first.values())
+    assert second["scans"] == {"missing": [], "redundant": ["session_id", "stray"]}
+
+
+def test_kiosk_flow_updates_counters(api):
+    server, client = api
+    setup = {"operator_name": "op", "gate": "12", "flight_number": "JA100", "destination": "SCL"}
+    first = client.post("/api/setup", json=setup).json()
+    second = client.post("/api/setup", json={**setup, "gate": "14"}).json()
+    assert client.get("/api/setup").json()["id"] == second["id"] != first["id"]
+
+    session = client.post("/api/sessions", json={"airline_code": "JSM", "kiosk_id": "k1"}).json()
+    bag = {"length": 50, "width": 30, "height": 20}
+    ok = client.post("/api/scan", json={"session_id": session["id"], "weight_kg": 8, "dims_cm": bag}).json()
+    heavy = client.post("/api/scan", json={"session_id": session["id"], "weight_kg": 12, "dims_cm": bag}).json()
+    assert ok["compliant"] and not heavy["compliant"]
+    assert client.post("/api/scan", json={"session_id": "nope"}).status_code == 404
+
+    stats = client.get("/api/stats/flights", params={"flight_number": "JA100", "gate": "14"}).json()
+    assert stats[0]["scans"] == 2 and stats[0]["compliant"] == 1
+
+    # a payment after the setup changed still counts for the session's flight
+    client.post("/api/setup", json={**setup, "flight_number": "JA101"})
+    client.post("/api/payments/simulate", json={"session_id": session["id"], "total": 30, "method": "card"})
+    stats = client.get("/api/stats/flights", params={"flight_number": "JA100", "gate": "14"}).json()
+    assert sum(stats[0]["payments"].values()) == 1
+    assert client.get("/api/stats/flights", params={"flight_number": "JA101"}).json() == []
+
+
+def test_rebuilt_flight_stats_match_the_live_counters(api):
+    server, client = api
+    setup = {"operator_name": "op", "gate": "7", "flight_number": "RB200", "destination": "LIM"}
+    client.post("/api/setup", json=setup)
+    session = client.post("/api/sessions", json={"airline_code": "JSM", "kiosk_id": "kf"}).json()
+    bag = {"length": 50, "width": 30, "height": 20}
+    for weight, dims in ((8, bag), (12.5, bag), (9, {**bag, "length": 70})):
+        client.post("/api/scan", json={"session_id": session["id"], "weight_kg": weight, "dims_cm": dims})
+    client.post("/api/scan/batch", json={"items": [{"session_id": session["id"], "weight_kg": 7.25, "dims_cm": bag}]})
+    client.post("/api/setup", json={**setup, "gate": "8"})  # payments count for the session's setup
+    for _ in range(3):
+        client.post("/api/payments/simulate", json={"session_id": session["id"], "total": 30, "method": "card"})
+
+    try:
+        rebuild = importlib.import_module("rebuild_flight_stats")
+        docs, _, _ = client.portal.call(rebuild.recompute, server.db, 2)
+    finally:
+        sys.modules.pop("rebuild_flight_stats", None)
+    live = client.get("/api/stats/flights", params={"flight_number": "RB200"}).json()
+    rebuilt = [server.FlightStats(**d).model_dump(mode="json") for d in docs if d["flight_number"] == "RB200"]
+    assert len(live) == 1 and live[0]["scans"] == 4 and sum(live[0]["payments"].values()) == 3
+    assert rebuilt == live
+
+
+def test_failed_setup_save_keeps_the_active_setup(api, monkeypatch):
+    server, client = api
+    setup = {"operator_name": "op", "gate": "20", "flight_number": "JA400", "destination": "AQP"}
+    current = client.post("/api/setup", json=setup).json()
+    setups = server.db.kiosk_setup
+
+    def active_ids():
+        return [d["_id"] for d in client.portal.call(lambda: setups.find({"active": True}).to_list(None))]
+
+    async def broken(*args, **kwargs):
+        raise server.OperationFailure("disk full", code=8)
+
+    # the memory store has no transactions, so these go through the standalone fallback
+    monkeypatch.setattr(setups, "insert_one", broken)
+    with pytest.raises(server.OperationFailure):
+        client.post("/api/setup", json={**setup, "gate": "21"})
+    monkeypatch.undo()
+    assert active_ids() == [server.by_id(current["id"])["_id"]]
+
+    update_one = setups.update_one
+
+    async def activation_fails(filter, update, **kwargs):
+        if update == {"$set": {"active": True}} and filter.get("active") is None:
+            raise server.OperationFailure("primary stepped down", code=189)
+        return await update_one(filter, update, **kwargs)
+
+    monkeypatch.setattr(setups, "update_one", activation_fails)
+    total = client.portal.call(setups.count_documents, {})
+    with pytest.raises(server.OperationFailure):
+        client.post("/api/setup", json={**setup, "gate": "22"})
+    monkeypatch.undo()
+    assert active_ids() == [server.by_id(current["id"])["_id"]]  # reactivated
+    assert client.portal.call(setups.count_documents, {}) == total  # the half-saved setup is gone
+
+    client.portal.call(server.active_setup.reconcile)
+    assert client.get("/api/setup").json()["id"] == current["id"]
+    assert client.post("/api/setup", json={**setup, "gate": "23"}).json()["gate"] == "23"
+    assert len(active_ids()) == 1
+
+
+def test_scan_batch_results_per_item(api, monkeypatch):
+    server, client = api
+    scans = server.db.scans
+    insert_many = scans.insert_many
+    writes = []
+
+    async def counted(documents, **kwargs):
+        writes.append(len(documents))
+        return await insert_many(documents, **kwargs)
+
+    monkeypatch.setattr(scans, "insert_many", counted)
+    session = client.post("/api/sessions", json={"airline_code": "JSM", "kiosk_id": "kb"}).json()
+    no_rules = client.post("/api/sessions", json={"airline_code": "NOR", "kiosk_id": "kb"}).json()
+    bag = {"length": 50, "width": 30, "height": 20}
+    items = [
+        {"session_id": session["id"], "weight_kg": 8, "dims_cm": bag},
+        {"session_id": "missing", "weight_kg": 8, "dims_cm": bag},
+        {"session_id": session["id"], "weight_kg": 30, "dims_cm": bag},
+        {"session_id": no_rules["id"], "weight_kg": 8, "dims_cm": bag},
+    ]
+    batch = client.post("/api/scan/batch", json={"items": items}).json()
+    assert [(it["index"], it["ok"], it["error"]) for it in batch["items"]] == [
+        (0, True, None), (1, False, "Session not found"), (2, True, None), (3, False, "Rules not found")]
+    assert batch["items"][0]["result"]["compliant"] and not batch["items"][2]["result"]["compliant"]
+    assert (batch["accepted"], batch["rejected"]) == (2, 2)
+    assert writes == [2]  # every accepted scan in one insert_many
+
+    # a write the database refuses fails only its own item
+    async def racing(documents, **kwargs):
+        await insert_many([{"_id": documents[0]["_id"]}])
+        return await counted(documents, **kwargs)
+
+    monkeypatch.setattr(scans, "insert_many", racing)
+    batch = client.post("/api/scan/batch", json={"items": [items[0], items[2]]}).json()
+    assert [(it["ok"], it["error"]) for it in batch["items"]] == [(False, "Write failed"), (True, None)]
+    assert batch["items"][0]["result"] is None and (batch["accepted"], batch["rejected"]) == (1, 1)
+    assert client.portal.call(scans.count_documents, {"session_id": session["id"]}) == 3
+
+    assert client.post("/api/scan/batch", json={"items": []}).status_code == 422
+    too_many = [items[0]] * (server.SCAN_BATCH_MAX + 1)
+    assert client.post("/api/scan/batch", json={"items": too_many}).status_code == 422
+    assert writes == [2, 2]
+
+
+def test_status_pagination_is_sorted(api):
+    server, client = api
+    for i in range(5):
+        client.post("/api/status", json={"client_name": f"c{i}"})
+    page = client.get("/api/status", params={"limit": 3}).json()
+    rest = client.get("/api/status", params={"after": page[-1]["id"], "limit": 3}).json()
+    assert [s["client_name"] for s in page + rest] == [f"c{i}" for i in range(5)]
+    assert client.get("/api/status", params={"after": "missing"}).status_code == 400
+
+
+def test_dataset_listing_pages_streams_and_projects(api):
+    import json
+
+    server, client = api
+    tie, later = "2026-02-01T08:00:00+00:00", "2026-02-01T09:00:00+00:00"
+    posted = [client.post("/api/dataset/images", json={"label": f"l{i}", "file_name": f"{i}.jpg",
+                                                       "created_at": tie if i < 5 else later}).json()
+              for i in range(7)]
+    expected = [img["id"] for img in sorted(posted, key=lambda img: (img["created_at"], img["id"]))]
+
+    # keyset pages of 2 walk through the five equal created_at values without skipping or repeating
+    seen, after = [], None
+    while True:
+        page = client.get("/api/dataset/images", params={"limit": 2, **({"after": after} if after else {})}).json()
+        if not page:
+            break
+        seen += [img["id"] for img in page]
+        after = page[-1]["id"]
+    assert seen == expected
+    assert client.get("/api/dataset/images", params={"after": "missing"}).status_code == 400
+
+    stream = client.get("/api/dataset/images", params={"format": "ndjson"})
+    assert stream.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in stream.text.splitlines()]
+    assert [img["id"] for img in lines] == expected and lines[0]["created_at"] == tie
+
+    labels = client.get("/api/dataset/images", params={"fields": "label", "limit": 3}).json()
+    assert labels == [{"id": i, "label": next(p["label"] for p in posted if p["id"] == i)} for i in expected[:3]]
+    unknown = client.get("/api/dataset/images", params={"fields": "label,secret"})
+    assert unknown.status_code == 400 and "secret" in unknown.json()["detail"]
+
+
+def test_metrics_by_route_template(api):
+    server, client = api
+    client.get("/api/rules/JSM")
+    client.get("/api/rules/NOPE")
+    client.get("/api/no/such/route")
+    resp = client.get("/metrics")
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    text = resp.text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/rules/{airline_code}",status="200"}' in text
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/rules/{airline_code}",status="404"}' in text
+    assert 'route="unmatched",status="404"' in text
+    assert "/api/rules/JSM" not in text
+
+
+def test_mongo_command_timer():
+    from types import SimpleNamespace
+
+    import metrics
+
+    timer = metrics.MongoCommandTimer()
+    histogram = metrics.Histogram("t_seconds", "test", ("collection", "command"), buckets=(0.01, 0.1))
+    failures = metrics.Counter("t_failures_total", "test", ("collection", "command"))
+    timer_globals = (metrics.MONGO_LATENCY, metrics.MONGO_FAILURES)
+    metrics.MONGO_LATENCY, metrics.MONGO_FAILURES = histogram, failures
+    try:
+        for request_id, (name, command, micros, ok) in enumerate([
+            ("find", {"find": "scans"}, 5_000, True),
+            ("getMore", {"getMore": 42, "collection": "scans"}, 50_000, True),
+            ("insert", {"insert": "scans"}, 200_000, False),
+        ]):
+            timer.started(SimpleNamespace(command_name=name, command=command, connection_id=("h", 1),
+                                          request_id=request_id))
+            done = SimpleNamespace(command_name=name, connection_id=("h", 1), request_id=request_id,
+                                   duration_micros=micros)
+            (timer.succeeded if ok else timer.failed)(done)
+    finally:
+        metrics.MONGO_LATENCY, metrics.MONGO_FAILURES = timer_globals
+
+    text = metrics.render([histogram, failures])
+    assert 't_seconds_bucket{collection="scans",command="find",le="0.01"} 1' in text
+    assert 't_seconds_bucket{collection="scans",command="getMore",le="0.01"} 0' in text
+    assert 't_seconds_bucket{collection="scans",command="getMore",le="0.1"} 1' in text
+    assert 't_seconds_bucket{collection="scans",command="insert",le="+Inf"} 1' in text
+    assert 't_failures_total{collection="scans",command="insert"} 1' in text
+
+
+def test_conditional_get_of_config(api):
+    server, client = api
+    first = client.get("/api/rules/JSM")
+    etag = first.headers["etag"]
+    assert first.headers["last-modified"] and first.headers["cache-control"] == "no-cache"
+    assert first.json() == client.get("/api/rules/JSM").json()
+
+    reads = server.config_cache.misses
+    not_modified = client.get("/api/rules/JSM", headers={"If-None-Match": f'W/"x", {etag}'})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert not_modified.headers["etag"] == etag
+    assert server.config_cache.misses == reads
+    since = client.get("/api/rules/JSM", headers={"If-Modified-Since": first.headers["last-modified"]})
+    assert since.status_code == 304
+
+    # another resource changing keeps this tag; changing this one moves it
+    airlines_etag = client.get("/api/config/airlines").headers["etag"]
+    client.post("/api/rules", json={"airline_code": "AAA"})
+    reads = server.config_cache.misses
+    assert client.get("/api/rules/JSM", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/api/config/airlines", headers={"If-None-Match": airlines_etag}).status_code == 304
+    assert client.get("/api/config/airlines").status_code == 200
+    assert server.config_cache.misses == reads  # only rules:AAA was dropped
+    client.post("/api/rules", json={"airline_code": "JSM", "max_weight_kg": 9})
+    changed = client.get("/api/rules/JSM", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["etag"] != etag
+    assert changed.json()["max_weight_kg"] == 9
+
+    # sessions record the version of their airline's rules, the one in the ETag
+    session = client.post("/api/sessions", json={"airline_code": "JSM"}).json()
+    assert changed.headers["etag"] == '"rules:JSM-%d"' % session["rules_version"]
+    client.post("/api/rules", json={"airline_code": "AAA", "max_weight_kg": 5})
+    assert client.post("/api/sessions", json={"airline_code": "JSM"}).json()["rules_version"] == session["rules_version"]
+    assert client.get("/api/rules/NOPE", headers={"If-None-Match": '"rules:NOPE-0"'}).status_code == 404
+
+
+def test_kiosk_bootstrap_in_one_round_trip(api):
+    server, client = api
+    resp = client.get("/api/kiosk/bootstrap", params={"airline": "JSM", "kiosk_id": "k7"},
+                      headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200 and resp.headers["content-encoding"] == "gzip"
+    boot = resp.json()
+    assert boot["kiosk_id"] == "k7" and boot["airline"]["code"] == "JSM"
+    assert boot["rules"] == client.get("/api/rules/JSM").json()
+    assert boot["setup"] == client.get("/api/setup").json()
+    assert boot["server_time"] and resp.headers["etag"] == f'"{boot["version"]}"'
+
+    etag = resp.headers["etag"]
+    assert client.get("/api/kiosk/bootstrap", params={"airline": "JSM"},
+                      headers={"If-None-Match": etag}).status_code == 304
+    setup = {"operator_name": "op", "gate": "3", "flight_number": "JA200", "destination": "LIM"}
+    client.post("/api/setup", json=setup)
+    moved = client.get("/api/kiosk/bootstrap", params={"airline": "JSM"}, headers={"If-None-Match": etag})
+    assert moved.status_code == 200 and moved.json()["setup"]["gate"] == "3"
+    assert client.get("/api/kiosk/bootstrap", params={"airline": "ZZZ"}).status_code == 404
+
+
+def test_config_changes_are_pushed_to_subscribed_kiosks(api):
+    import asyncio
+    from types import SimpleNamespace
+
+    server, client = api
+
+    async def is_disconnected():
+        return False
+
+    async def open_stream(airline):
+        resp = await server.kiosk_events(SimpleNamespace(is_disconnected=is_disconnected), airline, "k1")
+        assert resp.media_type == "text/event-stream"
+        return resp.body_iterator
+
+    async def next_chunk(stream):
+        return await asyncio.wait_for(stream.__anext__(), 5)
+
+    jsm, aaa = client.portal.call(open_stream, "JSM"), client.portal.call(open_stream, "AAA")
+    assert client.portal.call(next_chunk, jsm) == "retry: 3000\n\n"
+    assert client.portal.call(next_chunk, aaa) == "retry: 3000\n\n"
+
+    client.post("/api/rules", json={"airline_code": "JSM", "max_weight_kg": 7})
+    event = client.portal.call(next_chunk, jsm)
+    assert "\nevent: rules\n" in event and '"max_weight_kg": 7.0' in event
+    setup = {"operator_name": "op", "gate": "9", "flight_number": "JA300", "destination": "CUZ"}
+    client.post("/api/setup", json=setup)
+    assert "\nevent: setup\n" in client.portal.call(next_chunk, jsm)
+    assert "\nevent: setup\n" in client.portal.call(next_chunk, aaa)  # JSM rules were not sent to AAA
+
+    for stream in (jsm, aaa):
+        client.portal.call(stream.aclose)
+    assert client.get("/api/cache/stats").json()["events"]["subscribers"] == 0
+
+
+def test_scale_feed_from_the_simulator(api):
+    import asyncio
+    from types import SimpleNamespace
+
+    server, client = api
+    reading = client.get("/api/scale/read").json()
+    assert reading["connected"] and isinstance(reading["stable"], bool) and "weight_kg" in reading
+    assert client.get("/api/scale/status").json()["simulated"]
+    assert client.post("/api/scale/tare").json() == {"ok": True}
+    assert client.post("/api/scale/zero").json() == {"ok": True}
+
+    async def is_disconnected():
+        return False
+
+    async def first_events(n):
+        resp = await server.scale_stream(SimpleNamespace(is_disconnected=is_disconnected))
+        stream = resp.body_iterator
+        try:
+            return [await asyncio.wait_for(stream.__anext__(), 2) for _ in range(n)]
+        finally:
+            await stream.aclose()
+
+    events = client.portal.call(first_events, 3)
+    assert all(e.startswith("event: weight\ndata: {") for e in events)
+    assert server.scale_hub.status()["subscribers"] == 0
+
+
+def test_logging_starts_with_the_app(api):
+    import os
+
+    from shared import logging_setup
+
+    assert logging_setup._listener is not None  # started by the startup handler, not on import
+    assert (Path(os.environ["LOG_DIR"]) / "server.jsonl").exists()
+
+
+def test_rollup_buckets_by_minute_and_hour(api):
+    from datetime import datetime, timezone
+
+    server, client = api
+    scan, payment = server.EVENT_CODES["scan_completed"], server.EVENT_CODES["payment_result"]
+    at = lambda minute, second: datetime(2026, 3, 1, 10, minute, second, tzinfo=timezone.utc)  # noqa: E731
+    updates = server.rollup_increments([
+        {"ev": scan, "kiosk_id": "k1", "ok": True, "ms": 4000, "created_at": at(0, 5)},
+        {"ev": scan, "kiosk_id": "k1", "ok": False, "created_at": at(0, 59)},
+        {"ev": payment, "kiosk_id": "k2", "ok": True, "ms": 9000, "created_at": at(59, 59)},
+        {"ev": server.EVENT_CODES["setup_saved"], "created_at": at(1, 0)},  # not an activity event
+    ])
+    start = at(0, 0)
+    assert updates[("m", "k1", start)] == {"scans": 2, "scans_ok": 1, "scans_ms_sum": 4000, "scans_timed": 1}
+    assert updates[("m", None, start)] == updates[("m", "k1", start)]  # the all-kiosks row
+    assert updates[("m", "k2", at(59, 0))] == {"payments": 1, "payments_ok": 1, "payments_ms_sum": 9000,
+                                                 "payments_timed": 1}
+    assert updates[("h", None, start)] == {"scans": 2, "scans_ok": 1, "scans_ms_sum": 4000, "scans_timed": 1,
+                                          "payments": 1, "payments_ok": 1, "payments_ms_sum": 9000,
+                                          "payments_timed": 1}
+    assert len(updates) == 4 + 3  # minutes: k1 and all at 10:00, k2 and all at 10:59; hour: k1, k2, all
+
+
+def test_activity_reads_rollups_within_the_range(api):
+    import time
+    from datetime import datetime, timezone
+
+    server, client = api
+    scan = server.EVENT_CODES["scan_completed"]
+    at = lambda minute, second: datetime(2026, 3, 1, 10, minute, second, tzinfo=timezone.utc)  # noqa: E731
+    events = [{"ev": scan, "kiosk_id": "ka", "ok": i % 2 == 0, "ms": 3000, "created_at": at(i, 30)} for i in range(4)]
+    client.portal.call(server.bump_rollups, events)
+    client.portal.call(server.bump_rollups, events[:1])  # a second batch $inc's the same bucket
+
+    params = {"kiosk_id": "ka", "since": at(0, 20).isoformat(), "until": at(3, 0).isoformat()}
+    minutes = client.get("/api/activity", params=params).json()
+    assert minutes["resolution"] == "m" and minutes["since"] == at(0, 0).isoformat()
+    assert [(p["t"], p["scans"]) for p in minutes["points"]] == [
+        (at(0, 0).isoformat(), 2), (at(1, 0).isoformat(), 1), (at(2, 0).isoformat(), 1)]  # 10:03 is past until
+    assert minutes["points"][0]["compliance_rate"] == 1.0 and minutes["points"][1]["compliance_rate"] == 0.0
+    assert minutes["points"][0]["avg_scan_s"] == 3.0
+    two = client.get("/api/activity", params={**params, "step": 120}).json()
+    assert [p["scans"] for p in two["points"]] == [3, 1] and two["points"][0]["scans_per_min"] == 1.5
+
+    hours = client.get("/api/activity", params={"kiosk_id": "ka", "since": at(0, 0).isoformat(),
+                                                 "until": at(59, 0).isoformat(), "step": 3600}).json()
+    assert hours["resolution"] == "h" and [p["scans"] for p in hours["points"]] == [5]
+    assert client.get("/api/activity", params={**params, "until": params["since"]}).status_code == 400
+    assert client.get("/api/activity", params={**params, "since": "2026-01-01T00:00:00Z"}).status_code == 400
+    assert client.get("/api/activity", params={**params, "step": 90}).status_code == 422
+
+    # the routes feed the rollups through the interaction writer
+    session = client.post("/api/sessions", json={"airline_code": "JSM", "kiosk_id": "kr"}).json()
+    client.post("/api/scan", json={"session_id": session["id"], "weight_kg": 8,
+                                   "dims_cm": {"length": 50, "width": 30, "height": 20}})
+    client.post("/api/payments/simulate", json={"session_id": session["id"], "total": 10, "method": "card"})
+    deadline = time.monotonic() + 5
+    while True:
+        points = client.get("/api/activity", params={"kiosk_id": "kr"}).json()["points"]
+        if sum(p["payments"] for p in points) or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert sum(p["scans"] for p in points) == 1 and sum(p["payments"] for p in points) == 1
+
+
+def test_interaction_writer_drops_on_overflow_and_drains_on_stop(api):
+    server, client = api
+
+    async def run():
+        writer = server.InteractionWriter(maxsize=3, batch_size=100, flush_interval=30)
+        writer.start()
+        for i in range(5):  # the writer task gets no turn in between: the queue fills up
+            await writer.submit(server.InteractionEvent(ev=server.EVENT_CODES["setup_saved"],
+                                                        session_id="writer-test", ms=i).to_doc())
+        queued = writer.stats()
+        await writer.stop()  # long before flush_interval
+        stored = await server.db.interactions.find({"session_id": "writer-test"}).sort("ms", 1).to_list(None)
+        return queued, writer.stats(), [doc["ms"] for doc in stored]
+
+    queued, stopped, stored = client.portal.call(run)
+    assert (queued["enqueued"], queued["dropped"], queued["queued"]) == (3, 2, 3)
+    assert (stopped["written"], stopped["batches"], stopped["queued"]) == (3, 1, 0)
+    assert stored == [0, 1, 2]
+
+
+def test_interaction_writer_writes_inline_once_its_task_died(api):
+    import asyncio
+
+    server, client = api
+
+    async def run():
+        writer = server.InteractionWriter(maxsize=10, flush_interval=30)
+        writer.start()
+        event = server.InteractionEvent(ev=server.EVENT_CODES["setup_saved"], session_id="writer-dead", ms=0)
+        await writer.submit(event.to_doc())  # queued, then the task goes away before flushing it
+        writer._task.cancel()
+        await asyncio.sleep(0)
+        await writer.submit(server.InteractionEvent(ev=event.ev, session_id="writer-dead", ms=1).to_doc())
+        stats = writer.stats()
+        await writer.stop()
+        stored = await server.db.interactions.find({"session_id": "writer-dead"}).sort("ms", 1).to_list(None)
+        return stats, writer.stats(), [doc["ms"] for doc in stored]
+
+    before_stop, stopped, stored = client.portal.call(run)
+    assert (before_stop["enqueued"], before_stop["inline"], before_stop["queued"]) == (1, 1, 1)
+    assert stopped["written"] == 1 and stored == [0, 1]  # stop() flushed what the dead task left
@@ -0,0 +1,119 @@
+import gc
+import os
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from pyqt_kiosk.services.navigation import HISTORY_LIMIT, RouteStack
+
+KIOSK_DIR = Path(__file__).resolve().parent.parent / "pyqt_kiosk"
+KIOSK_MODULES = ("main", "i18n", "services", "screens", "widgets")
+
+
+def test_route_stack_is_bounded():
+    stack = RouteStack(maxlen=4)
+    for i in range(10):
+        stack.push(f"r{i}", {"i": i})
+    assert len(stack) == 4
+    assert stack.pop().route == "r9"
+    assert stack.peek().payload == {"i": 8}
+    stack.clear()
+    assert stack.pop() is None
+
+
+def test_route_stack_snapshots_payload():
+    payload = {"weight_kg": 8.0}
+    stack = RouteStack()
+    stack.push("validacion", payload)
+    payload["weight_kg"] = 99.0
+    assert stack.pop().payload == {"weight_kg": 8.0}
+
+
+@pytest.fixture
+def kiosk(tmp_path, monkeypatch):
+    """MainWindow del kiosco en modo offscreen, con config en un tmp dir."""
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("cv2")
+    monkeypatch.setenv("QT_QPA_PLATFORM", os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    from PyQt5 import QtWidgets
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    monkeypatch.syspath_prepend(str(KIOSK_DIR))
+    import main as kiosk_main
+    from services import config_service
+
+    monkeypatch.setattr(config_service, "CONFIG", tmp_path)
+    kiosk_main.bootstrap_configs()
+    win = kiosk_main.MainWindow()
+    try:
+        yield app, win
+    finally:
+        for screen in win.instances.values():
+            cam = getattr(screen, "cam", None)
+            if cam is not None:
+                cam.stop()
+        win.close()
+        win.deleteLater()
+        app.processEvents()
+        # los módulos del kiosco son top-level: no dejarlos para otros tests
+        for name in list(sys.modules):
+            if name.split(".")[0] in KIOSK_MODULES:
+                del sys.modules[name]
+
+
+def _passenger_cycle(app, win, i):
+    win.navigate("inicio", {"start_mode": True})
+    win.navigate("escaneo")
+    measure = {"class": "maleta", "width_cm": 30.0 + i % 20, "length_cm": 50.0, "weight_kg": 8.5}
+    win.navigate("validacion", measure)
+    if i % 3 == 0:
+        win.navigate("detalle_nocumple", {"measure": measure, "reasons": []})
+        win.handle_back()
+    win.navigate("despedida")
+    win.navigate("menu")
+    app.processEvents()
+
+
+def test_navigation_soak_memory_is_flat(kiosk):
+    app, win = kiosk
+    _passenger_cycle(app, win, 0)
+    # la cámara no aporta nada a este test y sólo mete ruido en tracemalloc
+    win.instances["escaneo"].cam.stop()
+
+    for i in range(200):
+        _passenger_cycle(app, win, i)
+
+    tracemalloc.start()
+    try:
+        gc.collect()
+        before = tracemalloc.get_traced_memory()[0]
+        for i in range(3000):
+            _passenger_cycle(app, win, i)
+            assert len(win.history) <= HISTORY_LIMIT
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    assert len(win.history) == 0
+    assert after - before < 48 * 1024, f"memory grew {after - before} bytes over 3000 cycles"
+
+
+def test_back_restores_route_and_payload(kiosk):
+    app, win = kiosk
+    win.navigate("inicio", {"start_mode": True})
+    win.navigate("escaneo")
+    win.instances["escaneo"].cam.stop()
+    measure = {"class": "maleta", "width_cm": 70.0, "length_cm": 50.0, "weight_kg": 12.0}
+    win.navigate("validacion", measure)
+    win.navigate("detalle_nocumple", {"measure": measure, "reasons": ["x"]})
+
+    win.handle_back()
+    assert win.current.route == "validacion"
+    assert win.instances["validacion"].measure == measure
+    win.handle_back()
+    win.handle_back()
+    assert win.current.route == "inicio"
+    assert win.current.payload == {"start_mode": True}
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+import sys
+
+from tests.load import Recorder, check, percentile, run
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_summary_and_check():
+    recorder = Recorder()
+    for ms in (10, 20, 30, 40):
+        recorder.add("POST /api/scan", ms, ok=True)
+    recorder.add("POST /api/scan", 500, ok=False)
+    summary = recorder.summary(elapsed=2.0)
+    scan = summary["routes"]["POST /api/scan"]
+    assert scan["requests"] == 5 and scan["rps"] == 2.5
+    assert scan["p50_ms"] == 30 and scan["p99_ms"] == 500
+    assert scan["error_rate"] == 0.2
+    report = {"stages": [{"kiosks": 3, **summary}]}
+    assert len(check(report, max_error_rate=0.01, max_p95_ms=None)) == 1
+    assert len(check(report, max_error_rate=0.5, max_p95_ms=100)) == 1
+
+
+def test_short_in_process_run(monkeypatch, tmp_path):
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    monkeypatch.setenv("STORAGE", "memory")
+    monkeypatch.setenv("LOG_DIR", str(tmp_path))
+    root_handlers = list(logging.getLogger().handlers)
+    sys.modules.pop("server", None)
+    try:
+        report = asyncio.run(run([2, 4], duration=1.5, think_scale=0.002, pay_ratio=1.0))
+    finally:
+        logging.getLogger().handlers[:] = root_handlers
+        sys.modules.pop("server", None)
+
+    assert report["target"] == "in-process (MemoryClient)"
+    assert [s["kiosks"] for s in report["stages"]] == [2, 4]
+    for stage in report["stages"]:
+        assert stage["passengers"] > 0
+        assert set(stage["routes"]) == {"POST /api/sessions", "POST /api/scan", "POST /api/payments/simulate"}
+        assert stage["error_rate"] == 0.0
+    assert not check(report, max_error_rate=0.0, max_p95_ms=None)
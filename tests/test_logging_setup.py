@@ -0,0 +1,72 @@
+import gzip
+import importlib
+import json
+import logging
+
+import pytest
+
+from shared import logging_setup
+
+
+def test_queue_logging_rate_limits_and_compresses(tmp_path):
+    logging_setup.setup_logging(str(tmp_path), "kiosk.jsonl", max_bytes=2048,
+                                backup_count=10, burst=3, interval=60.0, console=False)
+    try:
+        log = logging.getLogger("services.vision.yolo_service")
+        for i in range(500):
+            log.error("Error in YOLO detection: %s", f"frame {i}")
+        for i in range(30):
+            logging.getLogger(f"devices.scale{i}").info("reading %d %s", i, "x" * 80)
+        try:
+            raise OSError("serial port gone")
+        except OSError:
+            log.exception("Error reading from scale")
+    finally:
+        logging_setup.shutdown_logging()
+
+    assert logging_setup.shutdown_logging() is None  # idempotent
+    backups = sorted(tmp_path.glob("kiosk.jsonl.*.gz"))
+    assert backups, "rotated files should be gzip-compressed"
+
+    lines = (tmp_path / "kiosk.jsonl").read_text(encoding="utf-8").splitlines()
+    for backup in backups:
+        lines += gzip.decompress(backup.read_bytes()).decode("utf-8").splitlines()
+    entries = [json.loads(line) for line in lines]
+
+    yolo = [e for e in entries if e["msg"].startswith("Error in YOLO")]
+    assert len(yolo) == 3  # 497 repeats suppressed within the window
+    failure = next(e for e in entries if e["msg"] == "Error reading from scale")
+    assert failure["level"] == "ERROR" and "serial port gone" in failure["exc"]
+
+
+def test_rate_limit_reports_suppressed_count():
+    limiter = logging_setup.RateLimitFilter(burst=1, interval=0.0)
+    record = logging.LogRecord("cam", logging.WARNING, __file__, 1, "frame failed", None, None)
+    assert limiter.filter(record)
+    assert not hasattr(record, "suppressed")
+
+    limiter = logging_setup.RateLimitFilter(burst=1, interval=60.0)
+    assert limiter.filter(logging.LogRecord("cam", logging.WARNING, __file__, 1, "frame failed", None, None))
+    for _ in range(4):
+        assert not limiter.filter(logging.LogRecord("cam", logging.WARNING, __file__, 1, "frame failed", None, None))
+    limiter.interval = 0.0
+    record = logging.LogRecord("cam", logging.WARNING, __file__, 1, "frame failed", None, None)
+    assert limiter.filter(record)
+    assert record.suppressed == 4
+
+
+@pytest.mark.parametrize("module, filename", [
+    ("backend.logging_setup", "server.jsonl"),
+    ("pyqt_client.core.logging_setup", "kiosk.jsonl"),
+    ("pyqt_kiosk.services.log_service", "kiosco.jsonl"),
+])
+def test_each_app_logs_to_its_own_file(tmp_path, module, filename):
+    app = importlib.import_module(module)
+    assert app.shutdown_logging is logging_setup.shutdown_logging
+    app.setup_logging(tmp_path, console=False)
+    try:
+        logging.getLogger("app").warning("started")
+    finally:
+        app.shutdown_logging()
+    entry = json.loads((tmp_path / filename).read_text(encoding="utf-8"))
+    assert (entry["logger"], entry["msg"]) == ("app", "started")
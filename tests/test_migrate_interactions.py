@@ -0,0 +1,108 @@
+import asyncio
+import importlib
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from bson import ObjectId
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+
+@pytest.fixture(scope="module")
+def migrate():
+    """migrate_interactions with server on the in-memory store."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("MONGO_URL", raising=False)
+        mp.setenv("STORAGE", "memory")
+        mp.syspath_prepend(str(BACKEND_DIR))
+        sys.modules.pop("server", None)
+        try:
+            yield importlib.import_module("migrate_interactions")
+        finally:
+            sys.modules.pop("migrate_interactions", None)
+            sys.modules.pop("server", None)
+
+
+async def seed(server, db):
+    """Legacy events: two setups, a scan, a payment whose document is gone and a client event."""
+    t0 = datetime(2026, 3, 1, 8, tzinfo=timezone.utc)
+    first = server.Setup(operator_name="Ana", gate="A1", flight_number="JS100", destination="LIM", created_at=t0)
+    second = first.model_copy(update={"id": server.uuid_str(), "gate": "B2", "created_at": t0 + timedelta(hours=1)})
+    scan = server.ScanResult(session_id="s1", dims_cm={"length": 50, "width": 30, "height": 20}, weight_kg=8,
+                             compliant=True, setup_id=second.id, created_at=t0 + timedelta(hours=2))
+    payment = server.Payment(session_id="s1", total=30, method="card", status="approved", created_at=t0)
+    for setup in (first, second):
+        await db.kiosk_setup.insert_one({"_id": ObjectId(), **setup.model_dump()})  # not moved to _id yet
+    await db.scans.insert_one(server.to_mongo(scan))
+
+    events = [
+        server.Interaction(event="setup_saved", setup_id=first.id, payload=first.model_dump(), created_at=t0),
+        server.Interaction(event="setup_saved", setup_id=second.id, payload=second.model_dump(),
+                           created_at=second.created_at),
+        server.Interaction(event="scan_completed", setup_id=second.id, session_id="s1", payload=scan.model_dump(),
+                           created_at=scan.created_at),
+        server.Interaction(event="payment_result", session_id="s1", payload=payment.model_dump(),
+                           created_at=t0 + timedelta(hours=3)),
+        server.Interaction(event="help_requested", session_id="s1", payload={"screen": "scan"}),
+    ]
+    await db.interactions.insert_many([{"_id": ObjectId(), **e.model_dump()} for e in events])
+    return events, scan
+
+
+async def by_event_id(db):
+    return {doc["id"]: doc async for doc in db.interactions.find({})}
+
+
+def test_migrate_compacts_events_whose_document_exists(migrate):
+    server = migrate.server
+
+    async def run():
+        db = server.client["migrate_interactions_test"]
+        events, scan = await seed(server, db)
+        before = await by_event_id(db)
+        dry = await migrate.migrate(db, batch_size=2, dry_run=True)
+        assert await by_event_id(db) == before
+        totals = await migrate.migrate(db, batch_size=2)
+        return events, scan, before, dry, totals, await by_event_id(db)
+
+    events, scan, before, dry, totals, after = asyncio.run(run())
+    first, second, scanned, paid, custom = events
+    assert (totals["compacted"], totals["kept"]) == (3, 1) == (dry["compacted"], dry["kept"])
+    assert totals["bytes_after"] < totals["bytes_before"]
+
+    for event in (first, second, scanned):
+        doc = after[event.id]
+        assert doc["_id"] == before[event.id]["_id"]
+        assert doc["created_at"] == event.created_at and doc.get("session_id") == event.session_id
+        assert doc["ev"] == server.EVENT_CODES[event.event]
+        assert "payload" not in doc and "event" not in doc
+    assert after[first.id]["setup_id"] == first.setup_id and "delta" not in after[first.id]
+    assert after[second.id]["delta"] == {"gate": "B2"}
+    assert after[scanned.id]["scan_id"] == scan.id and after[scanned.id]["setup_id"] == scan.setup_id
+
+    # the payment document is missing, and client events are not ours to rewrite
+    assert after[paid.id] == before[paid.id] and after[custom.id] == before[custom.id]
+
+
+def test_migrate_resumes_and_reruns_as_a_no_op(migrate):
+    server = migrate.server
+
+    async def run():
+        db = server.client["migrate_interactions_resume_test"]
+        events, _ = await seed(server, db)
+        # a run interrupted right after compacting the first setup event
+        first = await db.interactions.find_one({"id": events[0].id})
+        partial = {"compacted": 0, "kept": 0, "bytes_before": 0, "bytes_after": 0}
+        await migrate.migrate_batch(db, [first], False, partial, {first["_id"]: None})
+        resumed = await migrate.migrate(db, batch_size=1)
+        migrated = await by_event_id(db)
+        again = await migrate.migrate(db)
+        return events, partial, resumed, migrated, again, await by_event_id(db)
+
+    events, partial, resumed, migrated, again, after = asyncio.run(run())
+    assert partial["compacted"] == 1 and (resumed["compacted"], resumed["kept"]) == (2, 1)
+    assert migrated[events[1].id]["delta"] == {"gate": "B2"}  # from the setup the compacted event points at
+    assert (again["compacted"], again["kept"]) == (0, 1)
+    assert after == migrated
@@ -0,0 +1,66 @@
+import asyncio
+import importlib
+import sys
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from bson import ObjectId
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+
+@pytest.fixture(scope="module")
+def migrate():
+    """migrate_schema with server on the in-memory store."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("MONGO_URL", raising=False)
+        mp.setenv("STORAGE", "memory")
+        mp.syspath_prepend(str(BACKEND_DIR))
+        sys.modules.pop("server", None)
+        try:
+            yield importlib.import_module("migrate_schema")
+        finally:
+            sys.modules.pop("migrate_schema", None)
+            sys.modules.pop("server", None)
+
+
+def test_convert_moves_id_and_parses_dates(migrate):
+    session_id = str(uuid.uuid4())
+    legacy = {"_id": ObjectId(), "id": session_id, "airline_code": "JSM", "created_at": "2026-03-01T08:00:00+00:00",
+              "rules": {"max_weight_kg": 10, "updated_at": "2026-02-01T00:00:00"},
+              "payload": {"created_at": "2026-03-01T08:00:00+00:00"}, "timestamp": "not a date"}
+    doc = migrate.convert(legacy)
+    assert doc["_id"] == uuid.UUID(session_id) and "id" not in doc
+    assert doc["created_at"] == datetime(2026, 3, 1, 8, tzinfo=timezone.utc)
+    assert doc["rules"]["updated_at"] == datetime(2026, 2, 1, tzinfo=timezone.utc)  # naive means UTC
+    assert doc["payload"] == legacy["payload"] and doc["timestamp"] == "not a date"
+    assert legacy["id"] == session_id and legacy["created_at"] == "2026-03-01T08:00:00+00:00"  # copied, not mutated
+
+    assert migrate.convert({"_id": ObjectId(), "id": "JSM"})["_id"] == "JSM"  # not a uuid, kept as is
+
+
+def test_migrate_collection_converts_legacy_documents_only(migrate):
+    server = migrate.server
+    created = datetime(2026, 3, 1, 8, tzinfo=timezone.utc)
+    legacy_ids = [str(uuid.uuid4()) for _ in range(5)]
+    current = server.to_mongo(server.Session(airline_code="JSM", created_at=created))
+
+    async def run():
+        coll = server.client["migrate_schema_test"].sessions
+        await coll.insert_many([{"_id": ObjectId(), "id": i, "airline_code": "JSM", "created_at": created.isoformat()}
+                                for i in legacy_ids] + [dict(current)])
+        # a copy an interrupted run inserted before deleting the original
+        await coll.insert_one(migrate.convert(await coll.find_one({"id": legacy_ids[0]})))
+        moved = await migrate.migrate_collection(coll, batch_size=2, dry_run=False)
+        docs = {d["_id"]: d async for d in coll.find({})}
+        again = await migrate.migrate_collection(coll, batch_size=2, dry_run=False)
+        return moved, again, docs, {d["_id"]: d async for d in coll.find({})}
+
+    moved, again, docs, after = asyncio.run(run())
+    assert (moved, again) == (5, 0) and after == docs
+    assert set(docs) == {uuid.UUID(i) for i in legacy_ids} | {current["_id"]}
+    assert docs[current["_id"]] == current  # already converted, left alone
+    for i in legacy_ids:
+        assert "id" not in docs[uuid.UUID(i)] and docs[uuid.UUID(i)]["created_at"] == created
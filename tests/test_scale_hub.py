@@ -0,0 +1,93 @@
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+import scale  # noqa: E402
+
+
+def test_parse_reading_formats():
+    assert scale.parse_reading("ST,GS,+  12.50kg\r\n") == (12.5, True)
+    assert scale.parse_reading("US,NT,-0.015 kg") == (-0.015, False)
+    assert scale.parse_reading("W: 12.5 kg") == (12.5, None)
+    assert scale.parse_reading("12500 g") == (12.5, None)
+    assert scale.parse_reading("10 lb")[0] == pytest.approx(4.5359237)
+    assert scale.parse_reading("OL,GS,+999999kg") is None
+    assert scale.parse_reading("ERR") is None
+
+
+def test_stability_needs_a_quiet_window():
+    detector = scale.StabilityDetector(window=0.5, tolerance=0.02)
+    assert not detector.add(0.0, 10.0)
+    assert not detector.add(0.3, 10.01)
+    assert detector.add(0.5, 10.0)
+    assert not detector.add(0.6, 10.5)  # moved
+    assert not detector.add(0.9, 10.5)
+    assert detector.add(1.05, 10.51)
+
+
+def test_simulated_scale_honours_tare_and_zero():
+    sim = scale.SimulatedScale(rate=1000, seed=1)
+    sim._load, sim._since, sim._duration = 10.0, time.monotonic() - 5, 3600
+    weight, stable = scale.parse_reading(sim.readline().decode())
+    assert stable and weight == pytest.approx(10.0, abs=0.02)
+    sim.write(scale.TARE_COMMAND)
+    assert scale.parse_reading(sim.readline().decode())[0] == pytest.approx(0.0, abs=0.02)
+    sim.write(scale.ZERO_COMMAND)
+    assert scale.parse_reading(sim.readline().decode())[0] == pytest.approx(10.0, abs=0.02)
+
+
+class ScriptedPort:
+    def __init__(self, lines):
+        self.lines = list(lines)
+        self.written = []
+
+    def readline(self):
+        time.sleep(0.01)
+        return self.lines.pop(0).encode() if self.lines else b""
+
+    def write(self, data):
+        self.written.append(data)
+
+    def close(self):
+        pass
+
+
+def test_hub_streams_readings_and_sends_commands():
+    port = ScriptedPort(["US,GS,+3.20kg", "garbage", "ST,GS,+3.25kg", "4100 g"])
+    hub = scale.ScaleHub(port="/dev/fake")
+    hub._open = lambda: port
+
+    async def run():
+        queue = hub.subscribe()
+        readings = [await asyncio.wait_for(queue.get(), 2) for _ in range(3)]
+        await hub.tare()
+        await hub.zero()
+        status = hub.status()
+        await hub.stop()
+        return readings, status, await queue.get()
+
+    readings, status, closed = asyncio.run(run())
+    assert [(r["weight_kg"], r["stable"]) for r in readings] == [(3.2, False), (3.25, True), (4.1, False)]
+    assert port.written == [scale.TARE_COMMAND, scale.ZERO_COMMAND]
+    assert status["connected"] and not status["simulated"] and status["subscribers"] == 1
+    assert closed is None and hub.latest["weight_kg"] == 4.1
+
+
+def test_stop_ends_a_full_subscriber_queue():
+    port = ScriptedPort(["ST,GS,+1.00kg"] * 20)
+    hub = scale.ScaleHub(port="/dev/fake", queue_size=3)
+    hub._open = lambda: port
+
+    async def run():
+        queue = hub.subscribe()  # never read: a slow client
+        while hub.readings < 5:
+            await asyncio.sleep(0.01)
+        assert queue.full()
+        await hub.stop()
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == [None]
@@ -0,0 +1,36 @@
+import pytest
+
+from tests.soak import THRESHOLDS, analyze, parse_duration, slope_per_hour, soak
+
+
+def test_slope_per_hour():
+    assert slope_per_hour([(0, 10.0), (1800, 11.0), (3600, 12.0)]) == pytest.approx(2.0)
+    assert slope_per_hour([(0, 5.0)]) == 0.0
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 90
+    assert parse_duration("15m") == 900
+    assert parse_duration("4h") == 4 * 3600
+
+
+def test_analyze_flags_handle_growth_and_skips_short_slopes():
+    samples = [
+        {"t": t, "rss_mb": 100.0 + t, "threads": 3, "fds": 7 + (t >= 20)}
+        for t in range(0, 40, 5)
+    ]
+    checks = {c["metric"]: c for c in analyze(samples, warmup=5, thresholds=THRESHOLDS, min_slope_window=600)}
+    # 35 s window: the slope is reported but not enforced
+    assert not checks["rss_mb"]["checked"] and checks["rss_mb"]["ok"]
+    assert checks["threads"]["ok"]
+    assert not checks["fds"]["ok"]
+
+
+def test_short_soak_of_both_apps_has_no_handle_leaks():
+    pytest.importorskip("PyQt5")
+    pytest.importorskip("cv2")
+    report = soak(duration=8, sample_every=1, think_ms=150, warmup=2)
+    for app, result in report["apps"].items():
+        assert result["cycles"] > 5, app
+        failed = [c["metric"] for c in result["checks"] if not c["ok"]]
+        assert not failed, f"{app}: {failed}"
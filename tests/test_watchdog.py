@@ -0,0 +1,42 @@
+import os
+import time
+
+import pytest
+
+
+def _blocking_scale_read():
+    time.sleep(0.6)
+
+
+def test_stall_is_counted_and_stack_logged(tmp_path, monkeypatch):
+    pytest.importorskip("PyQt5")
+    monkeypatch.setenv("QT_QPA_PLATFORM", os.environ.get("QT_QPA_PLATFORM", "offscreen"))
+    from PyQt5 import QtCore, QtWidgets
+
+    from pyqt_client.core.watchdog import EventLoopWatchdog
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    log_path = tmp_path / "stalls.log"
+    watchdog = EventLoopWatchdog(threshold_ms=200, interval_ms=20, log_path=str(log_path))
+
+    def pump(ms):
+        loop = QtCore.QEventLoop()
+        QtCore.QTimer.singleShot(ms, loop.quit)
+        loop.exec_()
+
+    watchdog.start()
+    try:
+        pump(200)
+        assert watchdog.snapshot()["stalls"] == 0
+        QtCore.QTimer.singleShot(0, _blocking_scale_read)
+        pump(300)
+    finally:
+        watchdog.stop()
+
+    metrics = watchdog.snapshot()
+    assert metrics["stalls"] == 1
+    assert metrics["max_lag_ms"] >= 400
+    assert metrics["last_stall_ms"] >= 400
+    log = log_path.read_text(encoding="utf-8")
+    assert "_blocking_scale_read" in log
+    assert "resumed after" in log
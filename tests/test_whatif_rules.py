@@ -0,0 +1,83 @@
+import asyncio
+import importlib
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+
+@pytest.fixture(scope="module")
+def whatif():
+    """whatif_rules with server on the in-memory store."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.delenv("MONGO_URL", raising=False)
+        mp.setenv("STORAGE", "memory")
+        mp.syspath_prepend(str(BACKEND_DIR))
+        sys.modules.pop("server", None)
+        try:
+            yield importlib.import_module("whatif_rules")
+        finally:
+            sys.modules.pop("whatif_rules", None)
+            sys.modules.pop("server", None)
+
+
+def bags(*rows):
+    return pd.DataFrame(rows, columns=["length", "width", "height", "weight_kg"], dtype="float32")
+
+
+def test_evaluate_current_and_candidate_rules(whatif):
+    rules = whatif.server.Rules(airline_code="JSM", max_weight_kg=10, dims_cm={"length": 55, "width": 35, "height": 25},
+                                max_linear_cm=115, overweight_fee_per_kg=15, oversize_fee_flat=30)
+    scans = bags(
+        (50, 30, 20, 8),  # fits
+        (50, 30, 20, 12),  # 2 kg over
+        (60, 30, 20, 9),  # too long
+        (54, 34, 24, 10.5),  # linear 112 fits, 0.5 kg over
+    )
+    current = whatif.evaluate(scans, rules)
+    assert (current["scans"], current["overweight"], current["oversize"]) == (4, 2, 1)
+    assert current["compliance_rate"] == 0.25
+    assert current["overweight_revenue"] == pytest.approx(2.5 * 15)
+    assert current["revenue"] == pytest.approx(2.5 * 15 + 30)
+
+    stricter = whatif.apply_candidate(rules, whatif.parse_candidate("max_weight_kg=8,max_linear_cm=110"))
+    result = whatif.evaluate(scans, stricter)
+    assert (result["overweight"], result["oversize"], result["compliance_rate"]) == (3, 2, 0.25)
+    assert result["revenue"] == pytest.approx((4 + 1 + 2.5) * 15 + 2 * 30)
+
+    longer = whatif.apply_candidate(rules, whatif.parse_candidate("length=60"))
+    assert longer.dims_cm == {"length": 60, "width": 35, "height": 25} and rules.dims_cm["length"] == 55
+    assert whatif.evaluate(scans, longer)["oversize"] == 0
+    assert whatif.evaluate(bags(), rules)["compliance_rate"] == 0.0
+
+
+def test_load_scans_filters_by_airline_and_window(whatif):
+    server = whatif.server
+    since = datetime(2026, 3, 1, tzinfo=timezone.utc)
+
+    async def run():
+        db = server.client["whatif_test"]
+        sessions = [("JSM", since - timedelta(hours=2)), ("JSM", since + timedelta(hours=1)),
+                    ("AAA", since + timedelta(hours=1)), ("JSM", since - timedelta(days=3))]
+        ids = []
+        for airline, opened in sessions:
+            session = server.Session(airline_code=airline, created_at=opened)
+            await db.sessions.insert_one(server.to_mongo(session))
+            ids.append(session.id)
+        for i, (session_id, at) in enumerate([
+            (ids[0], since + timedelta(minutes=5)),  # opened before since, scanned inside
+            (ids[1], since + timedelta(hours=2)),
+            (ids[1], since - timedelta(minutes=1)),  # before the window
+            (ids[2], since + timedelta(hours=2)),  # another airline
+            (ids[3], since + timedelta(hours=3)),  # session older than the lookback
+        ]):
+            await db.scans.insert_one({"_id": f"s{i}", "session_id": session_id, "created_at": at,
+                                       "weight_kg": float(i), "dims_cm": {"length": 50, "width": 30, "height": 20}})
+        return await whatif.load_scans(db, "JSM", since, since + timedelta(days=1), chunk=1)
+
+    scans = asyncio.run(run())
+    assert sorted(scans["weight_kg"]) == [0.0, 1.0]